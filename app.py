@@ -1,3 +1,5 @@
+import json
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -10,7 +12,9 @@ st.set_page_config(page_title="Quant Dashboard", layout="wide")
 # ---------------------------------------------------------
 # IMPORT DES MODULES
 # ---------------------------------------------------------
-from modules.data_loader import get_live_price, get_history
+from modules.data_loader import get_history, get_panel, periods_per_year, INTERVALS
+from modules.quote_service import QuoteService
+from modules.shared_cache import get_shared_cache
 from modules.strategy_single import (
     strategy_buy_and_hold,
     strategy_sma,
@@ -18,17 +22,78 @@ from modules.strategy_single import (
     strategy_macd,
     strategy_bollinger,
     strategy_golden_cross,
-    compute_metrics
+    compute_metrics,
+    compute_metrics_matrix,
+    SingleAssetAnalyzer
+)
+from modules.plots import plot_price_with_indicators, plot_equity, downsample_frame, plot_spans, plot_rolling
+from modules.rolling import align_benchmark, rolling_metrics, ROLLING_WINDOWS
+from modules import perf
+from modules.portfolio_tools import (
+    backtest_portfolio,
+    sma_overlay,
+    correlation_matrix,
+    covariance_matrix
 )
-from modules.plots import plot_price_with_indicators, plot_equity
+
+# Indice de référence des bêtas glissants
+BENCHMARK = "^GSPC"
+ROLLING_TABS = {"Sharpe": "Sharpe", "Volatility": "Volatilité", "Sortino": "Sortino",
+                "Drawdown": "Drawdown", "Beta": f"Bêta vs {BENCHMARK}"}
 
 # ---------------------------------------------------------
 # CACHING ET RAFRAÎCHISSEMENT AUTOMATIQUE (Feature 5)
 # ---------------------------------------------------------
-@st.cache_data(ttl=300) # Rafraîchit les données toutes les 300 secondes (5 minutes)
-def load_historical_data(symbol, lookback_days):
-    """Fonction wrappée pour le caching des données historiques."""
-    return get_history(symbol, lookback_days=lookback_days)
+# Cache partagé entre sessions, workers et redémarrages (Arrow IPC mappé en mémoire,
+# rafraîchi toutes les 300 secondes) : chaque ticker est stocké et lu une seule fois.
+def load_historical_data(symbol, lookback_days, interval="1d"):
+    """Historique d'un symbole via le cache partagé (colonnes en lecture seule, sans copie)."""
+    return get_shared_cache().get_or_load(
+        ("history", symbol, lookback_days, interval),
+        lambda: get_history(symbol, lookback_days=lookback_days, interval=interval)
+    )
+
+
+def load_price_panel(symbols, lookback_days):
+    """Panel de clôtures alignées (une requête groupée pour tous les actifs)."""
+    return get_shared_cache().get_or_load(
+        ("panel", tuple(symbols), lookback_days),
+        lambda: get_panel(list(symbols), lookback_days=lookback_days)
+    )
+
+
+def load_benchmark(dates, lookback_days, interval="1d", symbol=BENCHMARK):
+    """Clôtures de l'indice de référence alignées sur les dates données (report des trous), ou None."""
+    bench = load_historical_data(symbol, lookback_days, interval)
+    if bench is None or bench.empty:
+        return None
+    return align_benchmark(bench.set_index("Date")["Close"], dates)
+
+
+def show_rolling_metrics(curves, dates, ppy, benchmark=None, key="rolling"):
+    """Onglets des métriques glissantes (toutes les courbes de `curves` en une passe)."""
+    windows = [w for w in ROLLING_WINDOWS if w < len(curves) - 1]
+    if not windows:
+        st.info("Historique trop court pour les fenêtres glissantes (63 barres minimum).")
+        return
+
+    window = st.radio("Fenêtre (barres) :", windows, horizontal=True, key=key)
+    rolling = rolling_metrics(curves, window, ppy, drawdown_window=window,
+                              benchmark=None if benchmark is None else benchmark.to_numpy())
+
+    tabs = st.tabs([ROLLING_TABS[name] for name in rolling])
+    for tab, (name, frame) in zip(tabs, rolling.items()):
+        with tab:
+            st.plotly_chart(plot_rolling(dates, frame, name, window=window),
+                            use_container_width=True)
+    if benchmark is None:
+        st.caption(f"Bêta indisponible : pas de données pour {BENCHMARK}.")
+
+
+@st.cache_resource
+def get_quote_service():
+    """Service de cotations unique, partagé par toutes les sessions."""
+    return QuoteService(ttl=60, poll_interval=30).start()
 
 # ---------------------------------------------------------
 # SIDEBAR — NAVIGATION
@@ -36,7 +101,7 @@ def load_historical_data(symbol, lookback_days):
 st.sidebar.title("📊 Quant Dashboard")
 page = st.sidebar.radio(
     "Navigation",
-    ["🏠 Accueil", "📈 Single Asset", "📊 Portfolio (bientôt)"]
+    ["🏠 Accueil", "📈 Single Asset", "📊 Portfolio"]
 )
 
 # =========================================================
@@ -56,6 +121,7 @@ if page == "🏠 Accueil":
         - Stratégies : Buy & Hold, SMA, RSI, MACD, Bandes de Bollinger, Golden Cross.
         - Visualisation : Prix + indicateurs techniques et Equity curve.
         - Indicateurs quantitatifs : Sharpe Ratio, Volatilité annualisée, Max Drawdown.
+        - Analyse glissante (63/126/252 barres) : Sharpe, volatilité, Sortino, drawdown et bêta vs S&P 500.
         """
     )
 
@@ -66,6 +132,16 @@ elif page == "📈 Single Asset":
 
     st.title("📈 Analyse d’un Actif Unique — Quant A")
 
+    # Diagnostics de performance : spans de cette exécution du script (modules/perf),
+    # enregistrés pour cette session seulement
+    show_perf = st.sidebar.checkbox("⏱️ Diagnostics de performance", value=False)
+    if show_perf:
+        perf_spans = perf.start_recording(
+            memory=st.sidebar.checkbox("Suivre les allocations (tracemalloc)", value=False)
+        )
+    else:
+        perf.stop_recording()
+
     # ------------------------------
     # Sidebar paramètres
     # ------------------------------
@@ -81,7 +157,11 @@ elif page == "📈 Single Asset":
     symbol = st.sidebar.selectbox("Ticker :", ticker_dict[categorie])
     
     # Récupération et affichage du prix live (Feature 3)
-    live_price = get_live_price(symbol)
+    # Lecture dans la table partagée ; on n'attend que la toute première cotation
+    with perf.span("app.live_price", symbol=symbol):
+        quote_service = get_quote_service()
+        quote_service.subscribe(symbol)
+        live_price = quote_service.get_price(symbol, wait=3.0)
     if live_price is not None:
         st.subheader(f"🏷️ Prix Actuel {symbol} : **{live_price:,.2f} $**")
         st.markdown("---")
@@ -106,20 +186,50 @@ elif page == "📈 Single Asset":
         short = st.sidebar.number_input("SMA courte (jours) :", 5, 100, 20)
         long = st.sidebar.number_input("SMA longue (jours) :", 20, 300, 50)
 
+    # Paramètres spécifiques RSI
+    if strategy_choice == "RSI":
+        rsi_hold = st.sidebar.checkbox("Tenir jusqu'au retour du RSI à 50", value=False)
+
     # Paramètres spécifiques Bollinger (ajout pour l'exemple)
     if strategy_choice == "Bollinger":
         bb_window = st.sidebar.number_input("Fenêtre (jours) :", 10, 100, 20)
         bb_std = st.sidebar.slider("Écarts-types :", 1.0, 3.0, 2.0, step=0.1)
+        bb_hold = st.sidebar.checkbox("Tenir jusqu'au retour à la moyenne", value=False)
+
+    # Recherche adaptative sur tout l'espace des entrées ci-dessus
+    if strategy_choice in ("SMA Momentum", "Bollinger"):
+        search_budget = st.sidebar.slider(
+            "Budget de la recherche de paramètres :", 20, 300, 60, step=20,
+            help="Nombre d'évaluations complètes équivalentes (successive halving)."
+        )
 
+    cost_bps = st.sidebar.number_input("Coûts de transaction (points de base) :", 0.0, 100.0, 0.0, step=1.0)
 
-    lookback = st.sidebar.slider(
-        "Nombre de jours d’historique",
-        min_value=100,
-        max_value=3000,
-        value=365,
-        step=50
+
+    interval = st.sidebar.selectbox(
+        "Intervalle des barres :",
+        ["1d", "1h", "15m", "5m", "1m"],
+        help="Intraday : historique limité par Yahoo (1m : 30 jours, 5m/15m : 60 jours, 1h : 730 jours)."
     )
 
+    if interval == "1d":
+        lookback = st.sidebar.slider(
+            "Nombre de jours d’historique",
+            min_value=100,
+            max_value=3000,
+            value=365,
+            step=50
+        )
+    else:
+        max_days = INTERVALS[interval]["max_days"]
+        lookback = st.sidebar.slider(
+            "Nombre de jours d’historique",
+            min_value=1,
+            max_value=max_days,
+            value=min(30, max_days)
+        )
+    ppy = periods_per_year(interval)
+
     if st.sidebar.button("🚀 Lancer l’analyse"):
         st.session_state["run_single"] = True
 
@@ -133,13 +243,17 @@ elif page == "📈 Single Asset":
     st.subheader("📡 Données historiques")
 
     # MODIFIÉ : Utiliser la fonction cachée
-    df = load_historical_data(symbol, lookback_days=lookback)
+    with perf.span("app.load_history", symbol=symbol, interval=interval):
+        df = load_historical_data(symbol, lookback_days=lookback, interval=interval)
 
     if df is None or df.empty:
         st.error(f"❌ Impossible de récupérer des données historiques pour {symbol}.")
         st.stop()
 
-    st.success(f"Données chargées pour {symbol} du {df['Date'].iloc[0].date()} au {df['Date'].iloc[-1].date()}")
+    if interval == "1d":
+        st.success(f"Données chargées pour {symbol} du {df['Date'].iloc[0].date()} au {df['Date'].iloc[-1].date()}")
+    else:
+        st.success(f"{len(df)} barres {interval} chargées pour {symbol} du {df['Date'].iloc[0]} au {df['Date'].iloc[-1]}")
     st.dataframe(df.tail(), use_container_width=True)
 
     # ------------------------------
@@ -152,29 +266,41 @@ elif page == "📈 Single Asset":
 
     # Sélection stratégie
     if strategy_choice == "Buy & Hold":
-        df_strat = df_bh.copy()
+        df_strat = strategy_buy_and_hold(df, cost_bps=cost_bps) if cost_bps else df_bh.copy()
         st.write("Stratégie utilisée : **Buy & Hold**.")
 
     elif strategy_choice == "SMA Momentum":
-        df_strat = strategy_sma(df, short=short, long=long)
+        df_strat = strategy_sma(df, short=short, long=long, cost_bps=cost_bps)
         st.write(f"SMA Momentum — courte = {short}, longue = {long}")
 
     elif strategy_choice == "RSI":
-        df_strat = strategy_rsi(df)
+        df_strat = strategy_rsi(df, hold=rsi_hold, cost_bps=cost_bps)
         
 
     elif strategy_choice == "MACD":
-        df_strat = strategy_macd(df)
+        df_strat = strategy_macd(df, cost_bps=cost_bps)
         
 
     elif strategy_choice == "Bollinger":
         # Utilisation des nouveaux paramètres
-        df_strat = strategy_bollinger(df, window=bb_window, num_std=bb_std)
+        df_strat = strategy_bollinger(df, window=bb_window, num_std=bb_std, hold=bb_hold, cost_bps=cost_bps)
         
 
     elif strategy_choice == "Golden Cross":
-        df_strat = strategy_golden_cross(df)
+        df_strat = strategy_golden_cross(df, cost_bps=cost_bps)
         
+    st.caption(f"Turnover : {df_strat.turnover:.0f} variations de position"
+               + (f" — coûts de {cost_bps:.0f} pb déduits" if cost_bps else ""))
+
+    if strategy_choice in ("SMA Momentum", "Bollinger"):
+        with st.expander("🔎 Paramètres suggérés (recherche adaptative)"):
+            analyzer = SingleAssetAnalyzer(symbol, None, None, interval=interval)
+            if analyzer.load_frame(df):
+                name = "Cross MMS" if strategy_choice == "SMA Momentum" else "Mean Reversion (BB)"
+                params, sharpe, rungs = analyzer.optimize(name, budget=search_budget,
+                                                          hold=strategy_choice == "Bollinger" and bb_hold)
+                st.write(f"**{params}** — Sharpe {sharpe:.2f} (version achat seul de la stratégie)")
+                st.caption(" → ".join(f"{r['candidates']} candidats (1 barre / {r['step']})" for r in rungs))
 
    
     # ------------------------------
@@ -183,7 +309,11 @@ elif page == "📈 Single Asset":
     st.subheader("📈 Performance — Stratégie vs Buy & Hold")
 
     fig_equity = plot_equity(df_bh, df_strat)
-    st.plotly_chart(fig_equity, use_container_width=True)
+    with perf.span("app.render_equity"):
+        st.plotly_chart(fig_equity, use_container_width=True)
+    points = fig_equity.layout.meta
+    if points["points_sent"] < points["points_raw"]:
+        st.caption(f"{points['points_sent']} points affichés sur {points['points_raw']} (sous-échantillonnage LTTB)")
 
     # =========================================================
     # 🔥 COMPARAISON MULTI-STRATÉGIES
@@ -206,33 +336,27 @@ elif page == "📈 Single Asset":
         "Golden Cross": df_gc["Strategy"]
     })
 
-    st.line_chart(df_compare)
+    st.line_chart(downsample_frame(df_compare))
 
     # =========================================================
     # 📊 TABLEAU DES METRICS POUR TOUTES LES STRATÉGIES
     # =========================================================
     st.subheader("📘 Tableau de synthèse des performances")
 
-    strategies_results = {
-        "Buy & Hold": df_bh,
-        "SMA": df_sma,
-        "RSI": df_rsi,
-        "MACD": df_macd,
-        "Bollinger": df_bb,
-        "Golden Cross": df_gc
-    }
+    # Métriques des six courbes en une seule passe vectorisée
+    metrics_all = compute_metrics_matrix(df_compare, ppy)
 
     table_stats = []
 
-    for name, df_s in strategies_results.items():
-        metrics = compute_metrics(df_s)
+    for name in df_compare.columns:
+        metrics = metrics_all.loc[name]
         table_stats.append({
             "Stratégie": name,
-            "Sharpe Ratio": metrics["Sharpe Ratio"],
-            "Sortino Ratio": metrics["Sortino"],
-            "Volatilité (ann.)": metrics["Volatility (ann.)"],
-            "Max Drawdown": metrics["Max Drawdown"],
-            "Performance totale (%)": (df_s["Strategy"].iloc[-1] - 1) * 100
+            "Sharpe Ratio": round(metrics["Sharpe Ratio"], 3),
+            "Sortino Ratio": round(metrics["Sortino"], 3),
+            "Volatilité (ann.)": round(metrics["Volatility (ann.)"], 3),
+            "Max Drawdown": round(metrics["Max Drawdown"], 3),
+            "Performance totale (%)": metrics["Total Return"] * 100
         })
 
     df_stats = (
@@ -243,15 +367,20 @@ elif page == "📈 Single Asset":
 
     st.dataframe(df_stats)
 
-
+    # =========================================================
+    # 📉 MÉTRIQUES GLISSANTES (toutes les stratégies)
+    # =========================================================
+    st.subheader("📉 Analyse glissante")
+    show_rolling_metrics(df_compare, df["Date"], ppy,
+                         benchmark=load_benchmark(df["Date"], lookback, interval), key="rolling_single")
 
     # ------------------------------
     # 4. Indicateurs de performance (Comparaison B&H)
     # ------------------------------
     st.subheader("📊 Indicateurs quantitatifs")
 
-    metrics_strat = compute_metrics(df_strat)
-    metrics_bh = compute_metrics(df_bh)
+    metrics_strat = compute_metrics(df_strat, periods_per_year=ppy)
+    metrics_bh = compute_metrics(df_bh, periods_per_year=ppy)
     
     # Calcul du gain total (la 'Strategy' est la courbe de croissance, base 1)
     total_perf_strat = df_strat["Strategy"].iloc[-1] - 1
@@ -290,25 +419,114 @@ elif page == "📈 Single Asset":
             f"{metrics_strat['Sortino']:.3f}",
             delta=f"{sortino_delta:.3f} vs B&H")
 
+    # ------------------------------
+    # 5. Diagnostics de performance
+    # ------------------------------
+    if show_perf:
+        spans = perf.stop_recording() or list(perf_spans)
+        with st.expander("⏱️ Diagnostics de performance", expanded=True):
+            st.dataframe(pd.DataFrame(perf.summary(spans)).round(2), use_container_width=True)
+            st.plotly_chart(plot_spans(spans), use_container_width=True)
+            col_json, col_trace = st.columns(2)
+            col_json.download_button("Exporter (JSON)", json.dumps(perf.report(spans), default=str),
+                                     "perf.json", "application/json")
+            col_trace.download_button("Exporter (Chrome trace)", json.dumps(perf.to_chrome_trace(spans), default=str),
+                                      "perf.trace.json", "application/json")
+
 
 
 # =========================================================
-# PAGE 3 — PORTFOLIO (PLACEHOLDER)
+# PAGE 3 — PORTFOLIO (QUANT B)
 # =========================================================
-elif page == "📊 Portfolio (bientôt)":
+elif page == "📊 Portfolio":
 
-    st.title("📊 Portfolio — Multi-Actifs (à venir)")
+    st.title("📊 Portfolio — Multi-Actifs")
 
-    st.markdown(
-        """
-        Cette section sera dédiée à la **Partie B** du projet :
+    # ------------------------------
+    # Sidebar paramètres
+    # ------------------------------
+    st.sidebar.subheader("⚙️ Paramètres du portefeuille")
 
-        - Gestion d’un portefeuille multi-actifs  
-        - Récupération de plusieurs tickers  
-        - Construction d’allocations  
-        - Corrélations, matrices de covariance  
-        - Equity curve du portefeuille  
+    universe = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA",
+                "BTC-USD", "ETH-USD", "SOL-USD", "^GSPC", "^DJI", "^IXIC"]
+    tickers = st.sidebar.multiselect("Actifs :", universe, default=["AAPL", "MSFT", "GOOGL", "AMZN"])
 
-        👉 À venir prochainement.
-        """
-    )
\ No newline at end of file
+    rebalance_label = st.sidebar.selectbox(
+        "Rééquilibrage :", ["Mensuel", "Trimestriel", "Hebdomadaire", "Quotidien", "Aucun"]
+    )
+    rebalance_rule = {"Mensuel": "M", "Trimestriel": "Q", "Hebdomadaire": "W",
+                      "Quotidien": 1, "Aucun": None}[rebalance_label]
+
+    weighting = st.sidebar.radio("Pondération :", ["Équipondérée", "Personnalisée"])
+    use_overlay = st.sidebar.checkbox(
+        "Filtre SMA par actif (20/50, long-only)",
+        help="Appliqué à chaque barre : la poche de l'actif passe en cash quand la SMA 20 est sous la SMA 50."
+    )
+    cost_bps = st.sidebar.number_input("Coûts de transaction (bps) :", 0.0, 100.0, 0.0, step=1.0)
+
+    lookback_pf = st.sidebar.slider("Nombre de jours d’historique", 100, 3000, 1000, step=50)
+
+    if len(tickers) < 2:
+        st.info("Sélectionne au moins deux actifs.")
+        st.stop()
+
+    weights = None
+    if weighting == "Personnalisée":
+        raw_weights = [st.sidebar.number_input(f"Poids {t} (%) :", 0.0, 100.0,
+                                               round(100 / len(tickers), 1), step=1.0)
+                       for t in tickers]
+        weights = [w / 100 for w in raw_weights]
+
+    # ------------------------------
+    # 1. Données (une seule requête groupée)
+    # ------------------------------
+    prices = load_price_panel(tuple(tickers), lookback_pf)
+
+    if prices.empty:
+        st.error("❌ Impossible de récupérer les données du portefeuille.")
+        st.stop()
+
+    # ------------------------------
+    # 2. Backtest
+    # ------------------------------
+    overlay = sma_overlay(prices, 20, 50) if use_overlay else None
+    weights = None if weights is None else [weights[tickers.index(c)] for c in prices.columns]
+    result = backtest_portfolio(prices, weights=weights, rebalance=rebalance_rule,
+                                overlay=overlay, cost_bps=cost_bps)
+
+    st.subheader("📈 Equity curve du portefeuille")
+    curves = (prices / prices.bfill().iloc[0]).copy()
+    curves["Portefeuille"] = result["equity"]
+    st.line_chart(downsample_frame(curves))
+
+    metrics_pf = compute_metrics(pd.DataFrame({"Strategy": result["equity"]}))
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Sharpe Ratio", f"{metrics_pf['Sharpe Ratio']:.3f}")
+    col2.metric("Volatilité (ann.)", f"{metrics_pf['Volatility (ann.)']:.2%}")
+    col3.metric("Max Drawdown", f"{metrics_pf['Max Drawdown']*100:.2f}%")
+    col4.metric("Gain Total", f"{(result['equity'].iloc[-1] - 1)*100:.2f} %")
+
+    st.caption(f"{len(result['rebalance_dates'])} rééquilibrages — "
+               f"turnover moyen {result['turnover'].mean():.2%}"
+               + (f" — filtre SMA : {(result['overlay_turnover'] > 0).sum()} changements de position"
+                  if overlay is not None else ""))
+
+    # ------------------------------
+    # 3. Métriques glissantes (actifs et portefeuille)
+    # ------------------------------
+    st.subheader("📉 Analyse glissante")
+    show_rolling_metrics(curves, curves.index, 252,
+                         benchmark=load_benchmark(curves.index, lookback_pf), key="rolling_pf")
+
+    # ------------------------------
+    # 4. Corrélations et covariance
+    # ------------------------------
+    st.subheader("🔗 Corrélations des rendements")
+    st.plotly_chart(
+        px.imshow(correlation_matrix(prices), text_auto=".2f",
+                  color_continuous_scale="RdBu_r", zmin=-1, zmax=1),
+        use_container_width=True
+    )
+
+    st.subheader("📐 Matrice de covariance (annualisée)")
+    st.dataframe(covariance_matrix(prices).round(4), use_container_width=True)
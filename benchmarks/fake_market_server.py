@@ -0,0 +1,170 @@
+# benchmarks/fake_market_server.py
+# Serveur de marché factice (HTTP/JSON, protocole de data_loader.HttpProvider) pour
+# tester la couche de récupération : latence, erreurs, limite de débit et pannes injectées.
+#
+# Exemples (depuis la racine du projet) :
+#   python -m benchmarks.fake_market_server --port 8765 --latency 0.2 --error-rate 0.3
+#   QUANT_MARKET_URL=http://127.0.0.1:8765 streamlit run app.py
+# Réglage à chaud : GET /admin?error_rate=1 (panne), /admin?error_rate=0 ; compteurs : GET /stats
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from benchmarks.synthetic import gbm
+from modules.data_loader import INTERVALS, bar_step
+
+DEFAULT_FAULTS = {
+    "latency": 0.0,        # secondes par requête
+    "jitter": 0.0,         # latence aléatoire supplémentaire, uniforme sur [0, jitter]
+    "error_rate": 0.0,     # part des requêtes en 503
+    "rate_limit": None,    # requêtes / s au-delà desquelles le serveur répond 429
+    "unknown": [],         # symboles inconnus (404)
+}
+HISTORY_DAYS = 3000
+
+
+def _bars(symbol, interval, start, end):
+    """Barres OHLCV déterministes d'un symbole (même symbole = même série)."""
+    step = bar_step(interval)
+    if interval == "1d":
+        dates = pd.bdate_range(end=end.normalize(), periods=HISTORY_DAYS)
+    else:
+        oldest = end - timedelta(days=INTERVALS[interval]["max_days"])
+        dates = pd.date_range(oldest.floor(step), end.floor(step), freq=step)
+
+    close = gbm(len(dates), periods_per_year=INTERVALS[interval]["periods_per_year"],
+                seed=zlib.crc32(f"{symbol}/{interval}".encode()))
+    keep = dates >= start
+    dates, close = dates[keep], close[keep]
+    spread = 0.005 * close
+    return [
+        {"Date": d.isoformat(), "Open": c, "High": c + s, "Low": c - s, "Close": c, "Volume": 1_000_000}
+        for d, c, s in zip(dates, close, spread)
+    ]
+
+
+class FakeMarket:
+    """État du serveur : défaillances injectées et compteurs de requêtes."""
+
+    def __init__(self, seed=0, **faults):
+        self.faults = dict(DEFAULT_FAULTS, **faults)
+        self.stats = {"requests": 0, "history": 0, "quote": 0, "errors": 0, "rate_limited": 0}
+        self._rng = random.Random(seed)
+        self._window = []
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Statut HTTP imposé à la prochaine requête de données (None = servie)."""
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 1.0] + [now]
+
+            if self.faults["rate_limit"] is not None and len(self._window) > self.faults["rate_limit"]:
+                self.stats["rate_limited"] += 1
+                return 429
+            if self._rng.random() < self.faults["error_rate"]:
+                self.stats["errors"] += 1
+                return 503
+            delay = self.faults["latency"] + self._rng.uniform(0, self.faults["jitter"])
+
+        time.sleep(delay)
+        return None
+
+
+def _handler(market):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            path = url.path.strip("/")
+
+            if path == "stats":
+                return self._send(200, market.stats)
+            if path == "admin":
+                for key, value in query.items():
+                    if key in ("latency", "jitter", "error_rate", "rate_limit"):
+                        market.faults[key] = None if value == "none" else float(value)
+                return self._send(200, market.faults)
+            if path not in ("history", "quote"):
+                return self._send(404, {"error": f"chemin inconnu : /{path}"})
+
+            status = market.admit()
+            if status is not None:
+                return self._send(status, {"error": "injectée"})
+            market.stats[path] += 1
+
+            symbols = [s for s in query.get("symbols", "").split(",") if s]
+            if any(s in market.faults["unknown"] for s in symbols):
+                return self._send(404, {"error": "symbole inconnu"})
+
+            interval = query.get("interval", "1d")
+            end = pd.Timestamp(datetime.now())
+            if path == "quote":
+                return self._send(200, {s: _bars(s, "1d", end - timedelta(days=7), end)[-1]["Close"]
+                                        for s in symbols})
+
+            if "start" in query:
+                start = pd.Timestamp(query["start"])
+            else:
+                start = end - timedelta(days=int(query.get("period", "365d").rstrip("d")))
+            self._send(200, {s: _bars(s, interval, start, end) for s in symbols})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=0, seed=0, **faults):
+    """
+    Lance le serveur dans un thread (port 0 : port libre).
+    Retourne (serveur, FakeMarket, url de base) ; serveur.shutdown() pour l'arrêter.
+    """
+    market = FakeMarket(seed=seed, **faults)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(market))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, market, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de marché factice (HTTP/JSON).")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--unknown", nargs="*", default=[])
+    args = parser.parse_args()
+
+    server, _, url = start_server(args.port, latency=args.latency, jitter=args.jitter,
+                                  error_rate=args.error_rate, rate_limit=args.rate_limit,
+                                  unknown=args.unknown)
+    print(f"Serveur de marché factice sur {url} (Ctrl+C pour arrêter)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/fetch_load.py
+# Charge concurrente sur le serveur de marché factice : fournisseur HTTP brut
+# vs ResilientProvider (fusion, limitation de débit, reprises, disjoncteur, dernier résultat connu).
+#
+# Exemples (depuis la racine du projet) :
+#   python -m benchmarks.fetch_load
+#   python -m benchmarks.fetch_load --clients 50 --symbols 5 --error-rate 0.2 --latency 0.3
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from benchmarks.fake_market_server import start_server
+from modules.data_loader import HttpProvider, ResilientProvider
+
+
+def _admin(url, **faults):
+    query = "&".join(f"{k}={v}" for k, v in faults.items())
+    urlopen(f"{url}/admin?{query}").read()
+
+
+def run_load(provider, market, clients, symbols, period="30d"):
+    """
+    `clients` appels simultanés, répartis sur `symbols` symboles.
+    Retourne {"ok", "failed", "upstream", "p50_ms", "p95_ms", "wall_s"}.
+    """
+    requests_before = market.stats["requests"]
+    tickers = [f"SYM{i}" for i in range(symbols)]
+
+    def call(i):
+        start = time.perf_counter()
+        try:
+            ok = bool(provider.download([tickers[i % symbols]], period=period))
+        except Exception:
+            ok = False
+        return ok, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(call, range(clients)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(ms for _, ms in results)
+    ok = sum(flag for flag, _ in results)
+    return {
+        "ok": ok,
+        "failed": clients - ok,
+        "upstream": market.stats["requests"] - requests_before,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "wall_s": wall,
+    }
+
+
+def _print(label, row):
+    print(f"  {label:<28} ok {row['ok']:4d}  échecs {row['failed']:4d}  requêtes source {row['upstream']:4d}"
+          f"  p50 {row['p50_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  ({row['wall_s']:.2f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge concurrente : fournisseur brut vs résilient.")
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--symbols", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--rate-limit", type=float, default=20)
+    args = parser.parse_args()
+
+    server, market, url = start_server(latency=args.latency, error_rate=args.error_rate,
+                                       rate_limit=args.rate_limit, seed=1)
+    raw = HttpProvider(url)
+    resilient = ResilientProvider(HttpProvider(url), rate=10, burst=10, base_delay=0.1, max_delay=1.0)
+
+    print(f"\n=== {args.clients} clients, {args.symbols} symboles, latence {args.latency} s, "
+          f"erreurs {args.error_rate:.0%}, limite {args.rate_limit} req/s ===")
+    _print("brut", run_load(raw, market, args.clients, args.symbols))
+    _print("résilient", run_load(resilient, market, args.clients, args.symbols))
+
+    # Panne totale : le dernier résultat connu est servi, le disjoncteur coupe la source
+    _admin(url, error_rate=1)
+    _print("brut (panne)", run_load(raw, market, args.clients, args.symbols))
+    _print("résilient (panne)", run_load(resilient, market, args.clients, args.symbols))
+    print(f"  disjoncteur : {resilient.breaker.state} ; compteurs : {resilient.stats}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
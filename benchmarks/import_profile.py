@@ -0,0 +1,109 @@
+# benchmarks/import_profile.py
+# Profil du coût de démarrage : temps d'import par module (python -X importtime),
+# mesuré dans un interpréteur neuf pour chaque cible.
+#
+# Exemples (depuis la racine du projet) :
+#   python -m benchmarks.import_profile
+#   python -m benchmarks.import_profile modules.strategy_single --top 30
+#   python -m benchmarks.import_profile --check     # échec si un backend lourd est importé
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Points d'entrée : modules importés par l'app Streamlit, le cron et le batch
+DEFAULT_TARGETS = [
+    "modules.strategy_single",
+    "modules.batch_runner",
+    "modules.plots",
+    "modules.portfolio_tools",
+    "cron.daily_report",
+]
+
+# Paquets qui ne doivent être importés qu'à la demande (modules/model_registry)
+HEAVY_PACKAGES = ("sklearn", "statsmodels", "yfinance", "scipy", "lightgbm")
+
+
+def profile_import(target):
+    """
+    Importe `target` dans un interpréteur neuf avec -X importtime.
+    Retourne une liste de {"module", "self_us", "cumulative_us", "depth"}, dans l'ordre d'import.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} : {proc.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            # L'indentation du nom donne la profondeur dans l'arbre d'import
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return rows
+
+
+def by_package(rows):
+    """Temps propre cumulé par paquet de premier niveau (sklearn, pandas, ...), en ms."""
+    totals = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        totals[package] = totals.get(package, 0) + row["self_us"] / 1000
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def report(target, rows, top=15):
+    total_ms = rows[-1]["cumulative_us"] / 1000 if rows else 0.0
+    print(f"\n=== import {target} : {total_ms:.0f} ms, {len(rows)} modules ===")
+
+    print("Par paquet (temps propre) :")
+    for package, ms in list(by_package(rows).items())[:top]:
+        print(f"  {package:<30} {ms:9.1f} ms")
+
+    print("Modules les plus coûteux (temps cumulé) :")
+    for row in sorted(rows, key=lambda r: -r["cumulative_us"])[1:top + 1]:
+        print(f"  {row['module']:<50} {row['cumulative_us'] / 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût d'import par module.")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--check", action="store_true",
+                        help="Échoue si une cible importe un paquet lourd (" + ", ".join(HEAVY_PACKAGES) + ")")
+    args = parser.parse_args()
+
+    offenders = {}
+    for target in args.targets:
+        try:
+            rows = profile_import(target)
+        except RuntimeError as e:
+            print("ERROR import_profile:", e)
+            sys.exit(1)
+
+        report(target, rows, args.top)
+        heavy = sorted({r["module"].split(".")[0] for r in rows} & set(HEAVY_PACKAGES))
+        if heavy:
+            offenders[target] = heavy
+
+    if args.check:
+        for target, heavy in offenders.items():
+            print(f"IMPORT LOURD {target} : {', '.join(heavy)}")
+        if offenders:
+            sys.exit(1)
+        print("\nAucun backend lourd importé au démarrage.")
+
+
+if __name__ == "__main__":
+    main()
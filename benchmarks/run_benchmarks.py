@@ -0,0 +1,163 @@
+# benchmarks/run_benchmarks.py
+# Benchmarks des chemins critiques : temps d'exécution et pic mémoire,
+# comparaison à une référence enregistrée.
+#
+# Exemples (depuis la racine du projet) :
+#   python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --threshold 0.2
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import gbm, jump_diffusion, to_frame
+from modules.strategy_single import (
+    strategy_buy_and_hold,
+    strategy_sma,
+    strategy_rsi,
+    strategy_macd,
+    strategy_bollinger,
+    strategy_golden_cross,
+    compute_metrics,
+    clear_indicator_cache,
+    SingleAssetAnalyzer,
+)
+from modules.monte_carlo import simulate_paths
+from modules.rolling import rolling_metrics
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+GENERATORS = {"gbm": gbm, "jump": jump_diffusion}
+
+
+def _analyzer(df):
+    analyzer = SingleAssetAnalyzer("SYNTH", None, None)
+    analyzer.load_frame(df)
+    return analyzer
+
+
+# (nom, fonction(df), taille max) : les modèles coûteux sont plafonnés
+CASES = [
+    ("strategy_buy_and_hold", lambda df: strategy_buy_and_hold(df), None),
+    ("strategy_sma", lambda df: strategy_sma(df, 20, 50), None),
+    ("strategy_rsi", lambda df: strategy_rsi(df), None),
+    ("strategy_macd", lambda df: strategy_macd(df), None),
+    ("strategy_bollinger", lambda df: strategy_bollinger(df, 20, 2), None),
+    ("strategy_golden_cross", lambda df: strategy_golden_cross(df), None),
+    ("strategy_sma.to_frame", lambda df: strategy_sma(df, 20, 50).to_frame(), None),
+    ("compute_metrics", lambda df: compute_metrics(df, column="Close"), None),
+    ("rolling_metrics[6 courbes, 252 barres]",
+     lambda df: rolling_metrics(np.tile(df["Close"].to_numpy()[:, None], 6), 252, benchmark=df["Close"]), None),
+    ("analyzer.run_strategy", lambda df: _analyzer(df).run_strategy("Cross MMS", short_w=20, long_w=50), None),
+    ("analyzer.find_best_params", lambda df: _analyzer(df).find_best_params(), None),
+    ("analyzer.optimize[Cross MMS]", lambda df: _analyzer(df).optimize("Cross MMS", budget=60), None),
+    ("predict_future[Linear Regression]",
+     lambda df: _analyzer(df).predict_future(30, "Linear Regression"), None),
+    ("predict_future[Machine Learning (RF)]",
+     lambda df: _analyzer(df).predict_future(30, "Machine Learning (RF)"), 10_000),
+    ("predict_future[ARIMA]", lambda df: _analyzer(df).predict_future(30, "ARIMA"), 10_000),
+    ("simulate_paths[gbm 100k x 250]",
+     lambda df: simulate_paths(df["Close"].values, 250, 100_000, "gbm", seed=0), 10_000),
+    ("simulate_paths[garch 100k x 250]",
+     lambda df: simulate_paths(df["Close"].values, 250, 100_000, "garch", seed=0), 10_000),
+]
+
+
+def _measure(fn, df, repeat):
+    """Meilleur temps sur `repeat` exécutions (cache d'indicateurs vidé) + pic mémoire."""
+    times = []
+    for _ in range(repeat):
+        clear_indicator_cache()
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+
+    clear_indicator_cache()
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times), peak
+
+
+def run(sizes, generator="gbm", repeat=3, only=None):
+    """Exécute tous les cas ; retourne {"cas@taille": {"seconds", "peak_mb"}}."""
+    results = {}
+
+    for n in sizes:
+        df = to_frame(GENERATORS[generator](n))
+
+        for name, fn, max_bars in CASES:
+            if only and not any(o in name for o in only):
+                continue
+            if max_bars is not None and n > max_bars:
+                continue
+
+            # Les cas lents ne sont répétés qu'une fois sur les grandes tailles
+            seconds, peak = _measure(fn, df, repeat if n <= 100_000 else 1)
+            key = f"{name}@{n}"
+            results[key] = {"seconds": seconds, "peak_mb": peak / 1e6}
+            print(f"{key:<50} {seconds * 1000:>10.1f} ms {peak / 1e6:>10.1f} MB", flush=True)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Liste des régressions (temps ou mémoire) au-delà du seuil relatif."""
+    regressions = []
+
+    for key, cur in results.items():
+        ref = baseline.get(key)
+        if ref is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            # On ignore le bruit sur les mesures minuscules
+            floor = 1e-3 if metric == "seconds" else 1.0
+            if cur[metric] > max(ref[metric], floor) * (1 + threshold):
+                regressions.append((key, metric, ref[metric], cur[metric]))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="gbm")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", default=None, help="Filtre sur le nom des cas")
+    parser.add_argument("--save-baseline", default=None, help="Écrit les résultats en référence")
+    parser.add_argument("--baseline", default=None, help="Référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Tolérance relative (0.2 = +20 %%)")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.generator, args.repeat, args.only)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "results": results,
+            }, f, indent=2)
+        print(f"Référence enregistrée dans {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, ref, cur in regressions:
+            print(f"RÉGRESSION {key} [{metric}] : {ref:.4g} -> {cur:.4g}")
+        if regressions:
+            sys.exit(1)
+        print("Aucune régression au-delà du seuil.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/synthetic.py
+# Générateurs de séries de prix synthétiques (reproductibles) pour les benchmarks.
+
+import numpy as np
+import pandas as pd
+
+
+def gbm(n_bars, s0=100.0, mu=0.07, sigma=0.2, periods_per_year=252, seed=0):
+    """Mouvement brownien géométrique : n_bars clôtures."""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / periods_per_year
+    log_returns = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(n_bars)
+    log_returns[0] = 0.0
+    return s0 * np.exp(np.cumsum(log_returns))
+
+
+def jump_diffusion(n_bars, s0=100.0, mu=0.07, sigma=0.2, jump_rate=5.0,
+                   jump_mean=-0.02, jump_std=0.05, periods_per_year=252, seed=0):
+    """Modèle de Merton : GBM + sauts poissonniens log-normaux (jump_rate sauts / an)."""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / periods_per_year
+    diffusion = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(n_bars)
+
+    n_jumps = rng.poisson(jump_rate * dt, n_bars)
+    jumps = n_jumps * jump_mean + np.sqrt(n_jumps) * jump_std * rng.standard_normal(n_bars)
+
+    log_returns = diffusion + jumps
+    log_returns[0] = 0.0
+    return s0 * np.exp(np.cumsum(log_returns))
+
+
+def to_frame(close, seed=0):
+    """
+    DataFrame au format data_loader.get_history (Date + OHLCV) autour des clôtures.
+    Fréquence journalière tant que les dates restent représentables, horaire au-delà.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(close)
+    freq = "D" if n <= 200_000 else "h"
+    dates = pd.date_range("1700-01-01" if freq == "D" else "1950-01-01", periods=n, freq=freq)
+
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    open_ = np.r_[close[0], close[:-1]]
+
+    return pd.DataFrame({
+        "Date": dates,
+        "Open": open_,
+        "High": np.maximum(open_, close) + spread,
+        "Low": np.minimum(open_, close) - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, n).astype(float),
+    })
@@ -1,71 +1,173 @@
 # daily_report.py
 # SCRIPT À EXÉCUTER PAR CRON (Feature 6)
+#
+# Rapport quotidien multi-tickers :
+# - univers et stratégies configurables (cron/report_config.json ou arguments),
+# - historique incrémental via le stockage local (seules les nouvelles barres sont téléchargées),
+# - métriques de tous les tickers en parallèle (modules/batch_runner),
+# - sorties Parquet / JSON partitionnées par date, lisibles sur plusieurs jours :
+#     pd.read_parquet("data/reports/metrics", filters=[("date", ">=", "2026-01-01")])
+#
+# Exemples :
+#   python cron/daily_report.py
+#   python cron/daily_report.py --tickers AAPL MSFT NVDA --workers 4
+#   python cron/daily_report.py --profile data/reports/perf.trace.json   # spans (Chrome trace)
 
-import yfinance as yf
-import pandas as pd
-from datetime import date
+import argparse
+import json
 import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Exécution par cron : la racine du projet n'est pas forcément dans le PATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from modules.data_loader import get_panel
+from modules.batch_runner import run_batch, DEFAULT_STRATEGIES
+from modules import perf
+
+# --- Paramètres par défaut ---
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_config.json")
+OUTPUT_DIR = os.path.join(ROOT, "data", "reports")
+DEFAULT_CONFIG = {
+    "universe": ["AAPL"],
+    "strategies": DEFAULT_STRATEGIES,
+    "lookback_days": 365,
+    "interval": "1d",
+}
+
+
+def load_config(path=CONFIG_FILE):
+    """Configuration JSON (univers, stratégies, lookback_days, interval), complétée par les valeurs par défaut."""
+    config = dict(DEFAULT_CONFIG)
+    if path and os.path.exists(path):
+        with open(path) as f:
+            config.update(json.load(f))
+    return config
+
+
+def market_snapshot(panel: pd.DataFrame):
+    """Dernière barre de chaque ticker : dates, ouverture, clôture, variation du jour."""
+    close = panel["Close"]
+    rows = []
+
+    for symbol in close.columns:
+        series = close[symbol].dropna()
+        if series.empty:
+            continue
+        last = series.index[-1]
+        rows.append({
+            "Ticker": symbol,
+            "Dernière date": last,
+            "Ouverture": float(panel["Open"][symbol].get(last, np.nan)) if "Open" in panel else np.nan,
+            "Clôture": float(series.iloc[-1]),
+            "Variation jour (%)": float(series.iloc[-1] / series.iloc[-2] - 1) * 100 if len(series) > 1 else np.nan,
+            "Barres": int(len(series)),
+        })
+
+    return pd.DataFrame(rows)
+
 
-# Importez la fonction de calcul des métriques de votre module
-# Assurez-vous que le chemin d'importation est correct depuis le contexte d'exécution du cron
-try:
-    from modules.strategy_single import compute_metrics
-except ImportError:
-    # Fallback pour exécution standalone si modules n'est pas dans le path
-    print("Avertissement: modules/strategy_single.py non trouvé. Assurez-vous que le PATH est correct pour cron.")
-    exit()
-
-# --- Paramètres ---
-TICKER = "AAPL" # Actif par défaut pour le rapport
-# Assurez-vous que le dossier 'data/' existe sur la VM
-OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', f"daily_report_{TICKER}.txt")
-
-def generate_report():
+def generate_report(universe, strategies, lookback_days=365, output_dir=OUTPUT_DIR,
+                    max_workers=None, report_date=None, interval="1d"):
     """
-    Télécharge les données et génère un rapport de métriques clés
-    (prix, volatilité, Max Drawdown) et l'enregistre sur le disque.
+    Génère le rapport du jour dans output_dir (un jeu de données par type de sortie,
+    partitionné par date) :
+    - metrics/date=AAAA-MM-JJ/part.parquet : une ligne par ticker x stratégie
+    - snapshot/date=AAAA-MM-JJ/part.parquet : dernière barre de chaque ticker
+    - summary/AAAA-MM-JJ.json : résumé (tickers traités, échecs, durées)
+    Retourne le résumé.
     """
-    today = date.today()
-    
-    # 1. Télécharger les données des 365 derniers jours (pour les métriques annualisées)
-    try:
-        # Période large pour avoir des métriques annualisées stables
-        df = yf.download(TICKER, period="1y", interval="1d", progress=False) 
-        
-        if df.empty:
-            raise ValueError("Aucune donnée yfinance récupérée.")
-            
-        # 2. Calculer les métriques (Volatilité & Max Drawdown)
-        # On utilise le prix de clôture comme base (Buy & Hold)
-        df_strat_base = pd.DataFrame({"Strategy": df["Close"]})
-        metrics = compute_metrics(df_strat_base, column="Strategy") 
-        
-        # 3. Récupérer les prix quotidiens récents
-        latest_data = df.iloc[-1]
-        
-        # 4. Écrire le rapport
-        with open(OUTPUT_FILE, "a") as f:
-            f.write(f"\n--- Rapport Quotidien {today} pour {TICKER} ---\n")
-            f.write(f"Prix d'ouverture récent: {latest_data['Open']:.2f} $\n")
-            f.write(f"Prix de clôture récent: {latest_data['Close']:.2f} $\n")
-            f.write(f"Volatilité annualisée (1 an): {metrics['Volatility (ann.)']*100:.2f} %\n")
-            f.write(f"Max Drawdown (1 an): {abs(metrics['Max Drawdown'])*100:.2f} %\n")
-            f.write("-------------------------------------\n")
-            
-        print(f"Rapport généré avec succès dans {OUTPUT_FILE}")
+    report_date = report_date or date.today().isoformat()
+    timings = {}
+
+    # 1. Historique (incrémental grâce au stockage local)
+    start = time.perf_counter()
+    panel = get_panel(universe, lookback_days, field=None, interval=interval)
+    timings["fetch_s"] = time.perf_counter() - start
+
+    loaded = list(panel["Close"].columns) if not panel.empty else []
+    missing = [s for s in universe if s not in loaded]
+
+    # 2. Métriques en parallèle
+    start = time.perf_counter()
+    metrics = pd.DataFrame()
+    if loaded:
+        metrics = run_batch(panel["Close"][loaded], strategies, lookback_days, max_workers, interval)
+    timings["metrics_s"] = time.perf_counter() - start
+
+    snapshot = market_snapshot(panel) if loaded else pd.DataFrame()
+
+    # 3. Sorties structurées
+    failed = sorted(set(metrics["Ticker"][metrics["Erreur"].notna()])) if "Erreur" in metrics else []
+    for name, table in (("metrics", metrics), ("snapshot", snapshot)):
+        if not table.empty:
+            partition = os.path.join(output_dir, name, f"date={report_date}")
+            os.makedirs(partition, exist_ok=True)
+            table.to_parquet(os.path.join(partition, "part.parquet"), index=False)
+
+    summary = {
+        "date": report_date,
+        "interval": interval,
+        "universe": len(universe),
+        "loaded": len(loaded),
+        "missing": missing,
+        "failed": failed,
+        "strategies": [s["label"] for s in strategies],
+        "timings": {k: round(v, 3) for k, v in timings.items()},
+    }
+    os.makedirs(os.path.join(output_dir, "summary"), exist_ok=True)
+    with open(os.path.join(output_dir, "summary", f"{report_date}.json"), "w") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    return summary
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapport quotidien multi-tickers.")
+    parser.add_argument("--config", default=CONFIG_FILE)
+    parser.add_argument("--tickers", nargs="+", default=None, help="Remplace l'univers de la configuration")
+    parser.add_argument("--lookback", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out-dir", default=OUTPUT_DIR)
+    parser.add_argument("--date", default=None, help="Date du rapport (AAAA-MM-JJ), aujourd'hui par défaut")
+    parser.add_argument("--profile", default=None,
+                        help="Export des spans de performance (.json, ou .trace.json pour Chrome trace)")
+    parser.add_argument("--profile-memory", action="store_true", help="Suit aussi les allocations")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        perf.enable(memory=args.profile_memory)
+        perf.start_recording()
+
+    config = load_config(args.config)
+    universe = args.tickers or config["universe"]
+    lookback = args.lookback or config["lookback_days"]
+
+    try:
+        with perf.span("report.generate", universe=len(universe)):
+            summary = generate_report(universe, config["strategies"], lookback, args.out_dir,
+                                      args.workers, args.date, config["interval"])
     except Exception as e:
-        # En cas d'échec du téléchargement ou du calcul
-        with open(OUTPUT_FILE, "a") as f:
-            f.write(f"\n--- Rapport {today} ---\n")
-            f.write(f"Erreur fatale lors de la génération du rapport pour {TICKER}: {e}\n")
-        print(f"Échec de la génération du rapport: {e}")
+        print("ERROR daily_report:", e)
+        return 1
+    finally:
+        if args.profile:
+            perf.export(args.profile)
+
+    print(f"Rapport {summary['date']} : {summary['loaded']}/{summary['universe']} tickers "
+          f"({summary['timings']}) dans {args.out_dir}")
+    if summary["missing"]:
+        print("Sans données :", ", ".join(summary["missing"]))
+
+    return 0 if summary["loaded"] else 1
 
 
 if __name__ == "__main__":
-    # Assurez-vous que le dossier 'data' existe
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
-        
-    generate_report()
\ No newline at end of file
+    sys.exit(main())
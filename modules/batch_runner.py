@@ -0,0 +1,208 @@
+# modules/batch_runner.py
+# Backtest en lot (sans Streamlit) : tickers x stratégies sur plusieurs cœurs.
+#
+# Exemple :
+#   python -m modules.batch_runner --tickers AAPL MSFT NVDA --lookback 3000 --out resultats.csv
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from modules.strategy_single import (
+    strategy_buy_and_hold,
+    strategy_sma,
+    strategy_rsi,
+    strategy_macd,
+    strategy_bollinger,
+    strategy_golden_cross,
+    compute_metrics_matrix,
+    SingleAssetAnalyzer,
+)
+from modules.data_loader import get_panel, periods_per_year, INTERVALS
+from modules.utils import share_array, attach_array, release_array
+from modules import perf
+
+STRATEGIES = {
+    "strategy_buy_and_hold": strategy_buy_and_hold,
+    "strategy_sma": strategy_sma,
+    "strategy_rsi": strategy_rsi,
+    "strategy_macd": strategy_macd,
+    "strategy_bollinger": strategy_bollinger,
+    "strategy_golden_cross": strategy_golden_cross,
+    "SingleAssetAnalyzer.run_strategy": None,
+}
+
+# Jeu par défaut : les six stratégies du tableau comparatif + Momentum de l'analyseur
+DEFAULT_STRATEGIES = [
+    {"label": "Buy & Hold", "name": "strategy_buy_and_hold", "params": {}},
+    {"label": "SMA", "name": "strategy_sma", "params": {"short": 20, "long": 50}},
+    {"label": "RSI", "name": "strategy_rsi", "params": {"window": 14}},
+    {"label": "MACD", "name": "strategy_macd", "params": {}},
+    {"label": "Bollinger", "name": "strategy_bollinger", "params": {"window": 20, "num_std": 2}},
+    {"label": "Golden Cross", "name": "strategy_golden_cross", "params": {}},
+    {"label": "Momentum (analyseur)", "name": "SingleAssetAnalyzer.run_strategy",
+     "params": {"strat_name": "Momentum", "window": 50}},
+]
+
+# Ressources attachées une fois par processus
+_WORKER = {}
+
+
+# ---------------------------------------------------------
+# Côté processus de calcul
+# ---------------------------------------------------------
+def _init_worker(close_spec, dates_spec):
+    _WORKER["close_shm"], _WORKER["close"] = attach_array(close_spec)
+    _WORKER["dates_shm"], _WORKER["dates"] = attach_array(dates_spec)
+
+
+def _run_one(df: pd.DataFrame, ticker, spec):
+    """Exécute une stratégie et retourne sa courbe equity (base 1)."""
+    params = dict(spec.get("params", {}))
+
+    if spec["name"] == "SingleAssetAnalyzer.run_strategy":
+        analyzer = SingleAssetAnalyzer(ticker, None, None, initial_investment=1)
+        analyzer.load_frame(df)
+        curve, _ = analyzer.run_strategy(params.pop("strat_name"), **params)
+        return pd.DataFrame({"Strategy": curve.to_numpy()})
+
+    return STRATEGIES[spec["name"]](df, **params)
+
+
+def _run_columns(columns, tickers, strategies, periods_per_year=252):
+    """
+    Backteste un groupe de colonnes du panel partagé.
+    Retourne (lignes de résultats, spans de performance du processus de calcul).
+    """
+    close, dates = _WORKER["close"], _WORKER["dates"]
+    rows = []
+    spans = perf.start_recording() if perf.is_enabled() else []
+
+    for j, ticker in zip(columns, tickers):
+        valid = ~np.isnan(close[:, j])
+        df = pd.DataFrame({
+            "Date": pd.to_datetime(dates[valid]),
+            "Close": close[valid, j],
+        })
+
+        labels, curves = [], []
+        for spec in strategies:
+            label = spec.get("label", spec["name"])
+            try:
+                curves.append(_run_one(df, ticker, spec)["Strategy"].to_numpy(dtype=float))
+                labels.append(label)
+            except Exception as e:
+                rows.append({"Ticker": ticker, "Stratégie": label, "Erreur": str(e)})
+
+        if not curves:
+            continue
+
+        # Métriques de toutes les stratégies du ticker en une passe
+        m = compute_metrics_matrix(np.column_stack(curves), periods_per_year)
+        for i, label in enumerate(labels):
+            rows.append({
+                "Ticker": ticker,
+                "Stratégie": label,
+                "Sharpe Ratio": round(float(m["Sharpe Ratio"][i]), 3),
+                "Volatility (ann.)": round(float(m["Volatility (ann.)"][i]), 3),
+                "Max Drawdown": round(float(m["Max Drawdown"][i]), 3),
+                "Sortino": round(float(m["Sortino"][i]), 3),
+                "Performance totale (%)": float(m["Total Return"][i]) * 100,
+            })
+
+    return rows, spans
+
+
+# ---------------------------------------------------------
+# Côté orchestrateur
+# ---------------------------------------------------------
+def run_batch(prices, strategies=None, lookback_days=365, max_workers=None, interval="1d"):
+    """
+    Backteste chaque ticker avec chaque stratégie et retourne un tableau de métriques
+    (une ligne par ticker x stratégie, calculées par compute_metrics_matrix).
+
+    prices : liste de tickers (chargés via data_loader.get_panel) ou panel de clôtures
+             déjà aligné (index Date, une colonne par ticker).
+    strategies : liste de {"label", "name", "params"} (voir DEFAULT_STRATEGIES).
+    interval : fréquence des barres ("1d", "1h", "5m"...), pour le chargement et l'annualisation.
+    Les prix sont placés une seule fois en mémoire partagée : les processus les lisent
+    sans copie ni sérialisation.
+    """
+    strategies = strategies or DEFAULT_STRATEGIES
+    for spec in strategies:
+        if spec["name"] not in STRATEGIES:
+            raise ValueError(f"Stratégie inconnue : {spec['name']}")
+
+    if not isinstance(prices, pd.DataFrame):
+        prices = get_panel(list(prices), lookback_days, interval=interval)
+
+    if prices.empty:
+        return pd.DataFrame()
+
+    tickers = list(prices.columns)
+    close = prices.to_numpy(dtype=np.float64)
+    dates = pd.DatetimeIndex(prices.index).as_unit("ns").asi8
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # Quelques tâches par cœur pour équilibrer la charge
+    n_tasks = min(len(tickers), max_workers * 4)
+    groups = [g for g in np.array_split(np.arange(len(tickers)), n_tasks) if len(g)]
+
+    close_shm, close_spec = share_array(close)
+    dates_shm, dates_spec = share_array(dates)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(close_spec, dates_spec)) as pool:
+            futures = [
+                pool.submit(_run_columns, g.tolist(), [tickers[j] for j in g], strategies,
+                            periods_per_year(interval))
+                for g in groups
+            ]
+            rows = []
+            for f in futures:
+                group_rows, spans = f.result()
+                rows.extend(group_rows)
+                perf.add_records(spans)
+    finally:
+        release_array(close_shm)
+        release_array(dates_shm)
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest en lot tickers x stratégies.")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--lookback", type=int, default=365)
+    parser.add_argument("--interval", choices=list(INTERVALS), default="1d")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="Fichier CSV ou Parquet de sortie")
+    parser.add_argument("--profile", default=None,
+                        help="Export des spans de performance (.json, ou .trace.json pour Chrome trace)")
+    parser.add_argument("--profile-memory", action="store_true", help="Suit aussi les allocations")
+    args = parser.parse_args()
+
+    if args.profile:
+        perf.enable(memory=args.profile_memory)
+        perf.start_recording()
+
+    with perf.span("batch.run", tickers=len(args.tickers), interval=args.interval):
+        table = run_batch(args.tickers, lookback_days=args.lookback, max_workers=args.workers,
+                          interval=args.interval)
+
+    if args.profile:
+        perf.export(args.profile)
+
+    if args.out and args.out.endswith(".parquet"):
+        table.to_parquet(args.out, index=False)
+    elif args.out:
+        table.to_csv(args.out, index=False)
+    else:
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
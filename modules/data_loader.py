@@ -1,49 +1,663 @@
 # modules/data_loader.py
 
+import os
+import json
+from datetime import datetime, timedelta
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
 import pandas as pd
-import yfinance as yf
+
+from modules.perf import timed
+from modules.fetch import (
+    FetchError, CircuitOpenError, RateLimitTimeout,
+    SingleFlight, TokenBucket, CircuitBreaker, StaleCache, retry,
+)
+
+# Dossier du stockage local (un fichier Parquet par symbole)
+STORE_DIR = os.environ.get(
+    "QUANT_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "store")
+)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Intervalles de barres : barres par an (annualisation), historique maximal
+# proposé par Yahoo (jours), taille des requêtes découpées (jours) et pas d'une barre.
+# Les barres intraday couvrent une séance de 6h30 (actions US).
+INTERVALS = {
+    "1m": {"periods_per_year": 252 * 390, "max_days": 30, "chunk_days": 7, "step": timedelta(minutes=1)},
+    "5m": {"periods_per_year": 252 * 78, "max_days": 60, "chunk_days": 30, "step": timedelta(minutes=5)},
+    "15m": {"periods_per_year": 252 * 26, "max_days": 60, "chunk_days": 30, "step": timedelta(minutes=15)},
+    "1h": {"periods_per_year": 252 * 7, "max_days": 730, "chunk_days": 180, "step": timedelta(hours=1)},
+    "1d": {"periods_per_year": 252, "max_days": None, "chunk_days": None, "step": timedelta(days=1)},
+}
+
+
+def _interval(interval):
+    if interval not in INTERVALS:
+        raise ValueError(f"Intervalle inconnu : {interval} (attendu : {', '.join(INTERVALS)})")
+    return INTERVALS[interval]
+
+
+def periods_per_year(interval="1d"):
+    """Nombre de barres par an, pour annualiser les métriques."""
+    return _interval(interval)["periods_per_year"]
+
+
+def bar_step(interval="1d"):
+    """Durée d'une barre (pas des dates futures des prévisions)."""
+    return _interval(interval)["step"]
+
 
 # ---------------------------------------------------------
-# 1. Récupération du prix "live" (en réalité dernier prix connu)
+# 1. Fournisseurs de données (yfinance ou rejeu local)
 # ---------------------------------------------------------
-def get_live_price(symbol: str):
+class DataProvider:
     """
-    Récupère le dernier prix 'live' via yfinance.
-    Retourne float ou None.
+    Interface commune des sources de données de marché.
+    download() traite une liste de symboles en une seule requête et retourne
+    {symbole: DataFrame normalisé (Date + OHLCV)}.
+    """
+
+    # Les données de ce fournisseur peuvent être conservées dans data/store
+    use_store = True
+
+    def today(self):
+        """Date de référence pour les fenêtres 'lookback'."""
+        return pd.Timestamp(datetime.now().date())
+
+    def download(self, symbols, period=None, start=None, interval="1d"):
+        raise NotImplementedError
+
+    def live_prices(self, symbols):
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
     """
+    Fournisseur yfinance : un seul appel yf.download pour tout l'univers.
+    En intraday, Yahoo limite la plage de chaque requête : l'intervalle demandé
+    est découpé en tranches de chunk_days, dans la limite de max_days.
+    """
+
+    def download(self, symbols, period=None, start=None, interval="1d"):
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+
+        spec = _interval(interval)
+        if spec["chunk_days"] is None:
+            return self._download(symbols, interval, period=period, start=start)
+
+        end = pd.Timestamp(datetime.now())
+        oldest = end - timedelta(days=spec["max_days"]) + timedelta(minutes=1)
+        first = end - timedelta(days=int(str(period).rstrip("d"))) if period else pd.Timestamp(start)
+        first = max(first, oldest)
+
+        # Une tranche peut être vide (jours fériés) : seuls les symboles
+        # absents de toutes les tranches sont en échec
+        parts = {}
+        while first < end:
+            stop = min(first + timedelta(days=spec["chunk_days"]), end)
+            for symbol, df in self._download(symbols, interval, start=first, end=stop, strict=False).items():
+                parts.setdefault(symbol, []).append(df)
+            first = stop
+
+        if len(parts) < len(symbols):
+            raise _yahoo_error(symbols, parts, "download")
+
+        return {s: _normalize_ohlcv(pd.concat(dfs, ignore_index=True)) for s, dfs in parts.items()}
+
+    @timed
+    def _download(self, symbols, interval, period=None, start=None, end=None, strict=True):
+        """
+        Un appel yf.download. yfinance ne lève pas d'exception (réseau, 429, symbole
+        inconnu) : il renvoie un tableau vide ou partiel. Avec strict=True, un symbole
+        sans données lève FetchError pour que les reprises et le disjoncteur jouent.
+        """
+        import yfinance as yf  # import différé : le mode replay et le cache local s'en passent
+
+        df = yf.download(
+            symbols, period=period, start=start, end=end, interval=interval,
+            group_by="ticker", threads=True, progress=False
+        )
+
+        frames = {} if df is None or df.empty else _split_by_symbol(df, symbols)
+        if strict and len(frames) < len(symbols):
+            raise _yahoo_error(symbols, frames, "download")
+        return frames
+
+    def live_prices(self, symbols):
+        symbols = list(symbols)
+
+        if len(symbols) == 1:
+            import yfinance as yf
+
+            data = yf.Ticker(symbols[0]).history(period="1d")
+            if data is None or data.empty:
+                raise _yahoo_error(symbols, {}, "live_prices")
+            return {symbols[0]: float(data["Close"].iloc[-1])}
+
+        frames = self.download(symbols, period="5d")
+        return {s: float(df["Close"].iloc[-1]) for s, df in frames.items()}
+
+
+def _yahoo_error(symbols, frames, what):
+    """
+    FetchError pour les symboles sans données. Le détail vient du dictionnaire
+    d'erreurs de yfinance quand il est renseigné (yf.shared._ERRORS) : symbole
+    inconnu -> 404 (définitif), limite de débit -> 429 ; sinon erreur temporaire.
+    """
+    missing = [s for s in symbols if s not in frames]
     try:
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period="1d")
+        from yfinance import shared
+        errors = getattr(shared, "_ERRORS", None) or {}
+    except ImportError:
+        errors = {}
+    details = {s: str(errors[s]) for s in missing if s in errors}
+
+    text = " ".join(details.values()).lower()
+    status = None
+    if "too many requests" in text or "rate limit" in text:
+        status = 429
+    elif len(details) == len(missing) and all(
+            "delisted" in d.lower() or "not found" in d.lower() for d in details.values()):
+        status = 404
+
+    message = f"Yahoo {what} : aucune donnée pour {', '.join(missing)}"
+    if details:
+        message += " (" + "; ".join(f"{s}: {d}" for s, d in details.items()) + ")"
+    return FetchError(message, status=status)
+
+
+class ReplayProvider(DataProvider):
+    """
+    Fournisseur hors-ligne : rejoue des fichiers locaux {symbole}.parquet / .csv
+    (colonne Date + OHLCV) ou des DataFrames passés en mémoire.
+    La date de référence est as_of, ou la dernière barre disponible.
+    Hors "1d", les barres sont lues dans {symbole}_{intervalle}.parquet / .csv
+    ou dans frames[(symbole, intervalle)].
+    """
+
+    use_store = False
+
+    def __init__(self, directory=None, frames=None, as_of=None):
+        self.directory = directory
+        self.frames = {key: _normalize_ohlcv(df) for key, df in (frames or {}).items()}
+        self.as_of = pd.Timestamp(as_of) if as_of is not None else None
+
+    def _load(self, symbol, interval="1d"):
+        key = symbol if interval == "1d" else (symbol, interval)
+
+        if key not in self.frames and self.directory is not None:
+            base = os.path.join(self.directory, _store_name(symbol, interval))
+            if os.path.exists(base + ".parquet"):
+                self.frames[key] = _normalize_ohlcv(pd.read_parquet(base + ".parquet"))
+            elif os.path.exists(base + ".csv"):
+                self.frames[key] = _normalize_ohlcv(pd.read_csv(base + ".csv"))
+
+        df = self.frames.get(key)
+        if df is not None and self.as_of is not None:
+            df = df[df["Date"] <= self.as_of]
+        return df
+
+    def today(self):
+        if self.as_of is not None:
+            return self.as_of.normalize()
+
+        last = [df["Date"].iloc[-1] for df in self.frames.values() if not df.empty]
+        return max(last).normalize() if last else super().today()
+
+    def download(self, symbols, period=None, start=None, interval="1d"):
+        frames = {s: self._load(s, interval) for s in symbols}
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+
+        if period is not None:
+            start = self.today() - timedelta(days=int(str(period).rstrip("d")))
+        if start is not None:
+            frames = {s: df[df["Date"] >= pd.Timestamp(start)].reset_index(drop=True)
+                      for s, df in frames.items()}
+
+        return {s: df for s, df in frames.items() if not df.empty}
+
+    def live_prices(self, symbols):
+        frames = self.download(symbols)
+        return {s: float(df["Close"].iloc[-1]) for s, df in frames.items()}
+
+
+class HttpProvider(DataProvider):
+    """
+    Fournisseur HTTP/JSON (passerelle de données, ou serveur factice de
+    benchmarks/fake_market_server.py pour tester la couche de récupération) :
+      GET {base_url}/history?symbols=A,B&interval=1d&period=30d (ou start=AAAA-MM-JJ)
+          -> {"A": [{"Date": ..., "Open": ..., ..., "Volume": ...}, ...], ...}
+      GET {base_url}/quote?symbols=A,B -> {"A": 123.4, ...}
+    """
+
+    def __init__(self, base_url, timeout=10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _get(self, path, **params):
+        url = f"{self.base_url}/{path}?{urlencode({k: v for k, v in params.items() if v is not None})}"
+        try:
+            with urlopen(url, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as e:
+            raise FetchError(f"HTTP {e.code} sur /{path}", status=e.code) from e
+        except (URLError, TimeoutError, ConnectionError) as e:
+            raise FetchError(f"/{path} : {e}") from e
+
+    def download(self, symbols, period=None, start=None, interval="1d"):
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+
+        start = pd.Timestamp(start).strftime("%Y-%m-%d %H:%M") if start is not None else None
+        data = self._get("history", symbols=",".join(symbols), interval=interval, period=period, start=start)
+        frames = {s: _normalize_ohlcv(pd.DataFrame(rows)) for s, rows in data.items() if rows}
+        return {s: df for s, df in frames.items() if not df.empty}
+
+    def live_prices(self, symbols):
+        data = self._get("quote", symbols=",".join(symbols))
+        return {s: float(p) for s, p in data.items() if p is not None}
+
+
+class ResilientProvider(DataProvider):
+    """
+    Enveloppe un fournisseur avec la couche de récupération (modules/fetch) :
+    - les requêtes identiques simultanées (sessions, threads) n'en font qu'une ;
+    - seau à jetons : au plus `rate` requêtes/s vers la source (rafales de `burst`) ;
+    - reprises des erreurs temporaires avec attente exponentielle aléatoire ;
+    - disjoncteur : après `failure_threshold` échecs consécutifs, la source n'est
+      plus sollicitée pendant `reset_timeout` secondes ;
+    - en échec (ou disjoncteur ouvert), le dernier résultat connu de la même
+      requête est servi s'il date de moins de stale_max_age secondes (None : sans limite).
+    Une requête groupée en échec est retentée symbole par symbole : un symbole
+    défaillant ne prive pas les autres de leurs données.
+    """
+
+    def __init__(self, provider, rate=2.0, burst=5, attempts=3, base_delay=0.5, max_delay=8.0,
+                 failure_threshold=5, reset_timeout=60.0, acquire_timeout=30.0, stale_max_age=None):
+        self.provider = provider
+        self.attempts, self.base_delay, self.max_delay = attempts, base_delay, max_delay
+        self.acquire_timeout = acquire_timeout
+        self.stale_max_age = stale_max_age
+
+        self.flight = SingleFlight()
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stale = StaleCache()
+        self.stats = {"calls": 0, "shared": 0, "upstream": 0, "errors": 0, "stale": 0}
+
+    @property
+    def use_store(self):
+        return self.provider.use_store
+
+    def today(self):
+        return self.provider.today()
+
+    def _count(self, name):
+        self.stats[name] += 1
+
+    def _attempt(self, fn):
+        """Une tentative : jeton, puis appel à travers le disjoncteur."""
+        if self.breaker.state == "open":
+            # Inutile de consommer un jeton pour un appel qui sera refusé
+            raise CircuitOpenError("source de données indisponible (disjoncteur ouvert)")
+        if not self.bucket.acquire(timeout=self.acquire_timeout):
+            raise RateLimitTimeout(f"aucun jeton en {self.acquire_timeout} s")
+
+        def upstream():
+            self._count("upstream")
+            return fn()
+
+        return self.breaker.call(upstream)
+
+    def _fetch(self, key, fn):
+        self._count("calls")
+        try:
+            result, shared = self.flight.do(key, lambda: retry(
+                lambda: self._attempt(fn), self.attempts, self.base_delay, self.max_delay,
+                on_error=lambda e: self._count("errors"),
+            ))
+        except Exception as e:
+            value, age = self.stale.get(key, self.stale_max_age)
+            if value is None:
+                raise
+            self._count("stale")
+            print(f"Avertissement {key[0]}: source en échec ({e}), données d'il y a {age:.0f} s servies")
+            return value
+
+        if shared:
+            self._count("shared")
+        elif result:
+            # Un résultat vide ne remplace pas le dernier résultat connu
+            self.stale.put(key, result)
+        return result
+
+    def download(self, symbols, period=None, start=None, interval="1d"):
+        symbols = list(symbols)
+        key = ("download", tuple(symbols), period, None if start is None else str(start), interval)
+        try:
+            return dict(self._fetch(key, lambda: self.provider.download(
+                symbols, period=period, start=start, interval=interval)))
+        except Exception as e:
+            if len(symbols) < 2 or isinstance(e, (CircuitOpenError, RateLimitTimeout)):
+                raise
+            print("ERROR download (groupé):", e, "- nouvel essai symbole par symbole")
+
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames.update(self.download([symbol], period=period, start=start, interval=interval))
+            except Exception as e:
+                print(f"ERROR download {symbol}:", e)
+        return frames
+
+    def live_prices(self, symbols):
+        symbols = list(symbols)
+        return dict(self._fetch(("live", tuple(symbols)), lambda: self.provider.live_prices(symbols)))
+
 
-        if data.empty:
-            return None
+# Source par défaut : Yahoo, ou une passerelle HTTP si QUANT_MARKET_URL est défini
+_PROVIDER = ResilientProvider(
+    HttpProvider(os.environ["QUANT_MARKET_URL"]) if os.environ.get("QUANT_MARKET_URL") else YahooProvider()
+)
 
-        return float(data["Close"].iloc[-1])
+
+def set_provider(provider: DataProvider):
+    """Change la source de données utilisée par tout le module."""
+    global _PROVIDER
+    _PROVIDER = provider
+
+
+def get_provider():
+    return _PROVIDER
+
+
+# ---------------------------------------------------------
+# 2. Récupération du prix "live" (en réalité dernier prix connu)
+# ---------------------------------------------------------
+@timed
+def get_live_price(symbol: str):
+    """
+    Récupère le dernier prix 'live' via le fournisseur courant.
+    Retourne float ou None.
+    """
+    try:
+        return _PROVIDER.live_prices([symbol]).get(symbol)
 
     except Exception as e:
         print("ERROR get_live_price:", e)
         return None
 
 
+@timed
+def get_live_prices(symbols):
+    """
+    Derniers prix connus de plusieurs symboles en une requête.
+    Retourne {symbole: float} (les symboles sans donnée sont absents).
+    """
+    try:
+        return _PROVIDER.live_prices(list(symbols))
+
+    except Exception as e:
+        print("ERROR get_live_prices:", e)
+        return {}
+
+
 # ---------------------------------------------------------
-# 2. Récupération historique OHLC
+# 3. Stockage local incrémental (Parquet par symbole)
 # ---------------------------------------------------------
-def get_history(symbol: str, lookback_days=365):
+def _normalize_ohlcv(df: pd.DataFrame):
+    """
+    Met un téléchargement yfinance au format du projet :
+    colonnes à un seul niveau, colonne 'Date' sans fuseau, triée et sans doublons.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+
+    if "Date" not in df.columns:
+        df = df.reset_index()
+        df = df.rename(columns={df.columns[0]: "Date"})
+
+    df["Date"] = pd.to_datetime(df["Date"])
+    if df["Date"].dt.tz is not None:
+        df["Date"] = df["Date"].dt.tz_localize(None)
+
+    columns = ["Date"] + [c for c in OHLCV_COLUMNS if c in df.columns]
+    df = df[columns].dropna(subset=["Close"])
+    df = df.drop_duplicates(subset="Date", keep="last").sort_values("Date")
+    df.columns.name = None
+
+    return df.reset_index(drop=True)
+
+
+def _split_by_symbol(df: pd.DataFrame, symbols):
+    """Découpe un téléchargement groupé (Ticker, Price) en un DataFrame par symbole."""
+    frames = {}
+    for symbol in symbols:
+        if isinstance(df.columns, pd.MultiIndex):
+            if symbol not in df.columns.get_level_values(0):
+                continue
+            sub = df[symbol]
+        elif len(symbols) == 1:
+            sub = df
+        else:
+            continue
+        sub = _normalize_ohlcv(sub)
+        if not sub.empty:
+            frames[symbol] = sub
+    return frames
+
+
+def _safe_name(symbol: str):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+
+
+def _store_name(symbol: str, interval="1d"):
+    """Nom de fichier d'un symbole ; les barres intraday ont leur propre fichier."""
+    if interval == "1d":
+        return _safe_name(symbol)
+    return f"{_safe_name(symbol)}_{interval}"
+
+
+def _store_paths(symbol: str, interval="1d"):
+    """Chemins (données, métadonnées) du stockage d'un couple (symbole, intervalle)."""
+    base = os.path.join(STORE_DIR, _store_name(symbol, interval))
+    return base + ".parquet", base + ".json"
+
+
+def _compact(df: pd.DataFrame):
+    """
+    Forme compacte des barres intraday sur disque : prix en float32
+    (7 chiffres significatifs), volumes entiers.
     """
-    Récupère les prix historiques OHLC via yfinance.
+    df = df.copy()
+    for column in ("Open", "High", "Low", "Close"):
+        if column in df.columns:
+            df[column] = df[column].astype("float32")
+    if "Volume" in df.columns:
+        df["Volume"] = df["Volume"].fillna(0).astype("int64")
+    return df
+
+
+@timed
+def load_store(symbol: str, interval="1d"):
+    """
+    Lit l'historique stocké sur disque.
+    Retourne (DataFrame ou None, métadonnées).
+    """
+    data_path, meta_path = _store_paths(symbol, interval)
+
+    if not os.path.exists(data_path):
+        return None, {}
+
+    try:
+        df = pd.read_parquet(data_path)
+        if interval != "1d":
+            df = df.astype({c: "float64" for c in ("Open", "High", "Low", "Close") if c in df.columns})
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        return df, meta
+
+    except Exception as e:
+        print("ERROR load_store:", e)
+        return None, {}
+
+
+@timed
+def save_store(symbol: str, df: pd.DataFrame, covered_from, interval="1d"):
+    """
+    Écrit l'historique sur disque (écriture atomique) avec ses métadonnées :
+    date de début couverte et dernière barre détenue.
+    Les barres intraday sont stockées compactes (float32, compression zstd).
+    """
+    data_path, meta_path = _store_paths(symbol, interval)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    fmt = "%Y-%m-%d" if interval == "1d" else "%Y-%m-%d %H:%M:%S"
+
+    meta = {
+        "symbol": symbol,
+        "interval": interval,
+        "covered_from": pd.Timestamp(covered_from).strftime(fmt),
+        "last_bar": df["Date"].iloc[-1].strftime(fmt),
+        "rows": len(df),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    try:
+        if interval == "1d":
+            df.to_parquet(data_path + ".tmp", index=False)
+        else:
+            _compact(df).to_parquet(data_path + ".tmp", index=False, compression="zstd")
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    except Exception as e:
+        print("ERROR save_store:", e)
+
+
+# ---------------------------------------------------------
+# 4. Récupération historique OHLC
+# ---------------------------------------------------------
+@timed
+def get_history(symbol: str, lookback_days=365, use_store=True, interval="1d"):
+    """
+    Récupère les prix historiques OHLC via le fournisseur courant.
     Retourne un DataFrame propre compatible avec ton projet.
+
+    Avec use_store=True, l'historique est conservé sur disque (data/store) :
+    seule la fin manquante depuis la dernière barre détenue est téléchargée,
+    et toute fenêtre déjà couverte est servie depuis le disque.
+    interval : "1d" (défaut) ou barres intraday "1h" / "15m" / "5m" / "1m".
     """
+    return get_history_many([symbol], lookback_days, use_store, interval).get(symbol)
+
+
+@timed
+def get_history_many(symbols, lookback_days=365, use_store=True, interval="1d"):
+    """
+    Version multi-symboles de get_history : les symboles à compléter sont
+    regroupés en au plus deux requêtes groupées (historique complet / fin manquante).
+    Retourne {symbole: DataFrame} (les symboles sans donnée sont absents).
+    """
+    provider = _PROVIDER
+    symbols = list(dict.fromkeys(symbols))
+
+    max_days = _interval(interval)["max_days"]
+    clamped = max_days is not None and lookback_days > max_days
+    if clamped and provider.use_store:
+        # Yahoo ne remonte pas plus loin : seul le stockage local peut couvrir davantage
+        print(f"Avertissement get_history: {interval} limité à {max_days} jours par le fournisseur")
+
+    start = provider.today() - timedelta(days=lookback_days)
+    period = f"{lookback_days}d"
 
     try:
-        df = yf.download(symbol, period=f"{lookback_days}d", interval="1d")
+        if not (use_store and provider.use_store):
+            return provider.download(symbols, period=period, interval=interval)
 
-        if df is None or df.empty:
-            return None
+        stored, covered, full, tail = {}, {}, [], []
+        for symbol in symbols:
+            df, meta = load_store(symbol, interval)
+            covered_from = pd.Timestamp(meta["covered_from"]) if "covered_from" in meta else pd.Timestamp.max
 
-        df = df.reset_index()
+            if df is None or df.empty or covered_from > start:
+                # Fenêtre demandée plus longue que le stock : téléchargement complet
+                full.append(symbol)
+            else:
+                tail.append(symbol)
+            stored[symbol], covered[symbol] = df, covered_from
 
-        return df
+        fresh = {}
+        try:
+            if full:
+                fresh.update(provider.download(full, period=period, interval=interval))
+            if tail:
+                # On repart de la plus ancienne dernière barre détenue
+                # (elle peut avoir bougé en séance)
+                last_bar = min(stored[s]["Date"].iloc[-1] for s in tail)
+                fresh.update(provider.download(tail, start=last_bar.strftime("%Y-%m-%d"), interval=interval))
+        except Exception as e:
+            # En cas d'échec on sert ce qui est déjà sur disque
+            print("ERROR get_history (download):", e)
+
+        result = {}
+        for symbol in symbols:
+            df, new = stored[symbol], fresh.get(symbol)
+
+            if new is not None:
+                if symbol in full and not new.empty:
+                    # Couverture réellement obtenue : la première barre reçue si le
+                    # fournisseur a tronqué la fenêtre (max_days), sinon le début demandé
+                    # (aucune barre n'existe avant la première reçue : week-end, cotation récente)
+                    reached = new["Date"].iloc[0] if clamped else start
+                    covered[symbol] = min(covered[symbol], reached)
+                if df is not None and not df.empty:
+                    new = _normalize_ohlcv(pd.concat([df, new], ignore_index=True))
+                save_store(symbol, new, covered[symbol], interval)
+                df = new
+
+            if df is None or df.empty:
+                continue
+
+            df = df[df["Date"] >= start].reset_index(drop=True)
+            if not df.empty:
+                result[symbol] = df
+
+        return result
 
     except Exception as e:
         print("ERROR get_history:", e)
-        return None
+        return {}
+
+
+@timed
+def get_panel(symbols, lookback_days=365, field="Close", use_store=True, interval="1d"):
+    """
+    Panel aligné sur les dates : index Date, une colonne par symbole.
+    field=None retourne tout l'OHLCV avec des colonnes (champ, symbole).
+    """
+    frames = get_history_many(symbols, lookback_days, use_store, interval)
+
+    if not frames:
+        return pd.DataFrame()
+
+    panel = pd.concat(
+        {s: df.set_index("Date") for s, df in frames.items()}, axis=1
+    ).sort_index()
+    panel = panel.swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+    if field is None:
+        return panel
+
+    return panel[field][[s for s in symbols if s in frames]]
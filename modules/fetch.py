@@ -0,0 +1,244 @@
+# modules/fetch.py
+# Briques de la couche de récupération des données de marché :
+# fusion des requêtes identiques simultanées, limitation de débit (seau à jetons),
+# reprises avec attente exponentielle aléatoire, disjoncteur et dernier résultat connu.
+# Utilisées par data_loader.ResilientProvider, indépendantes de la source.
+
+import random
+import threading
+import time
+from collections import OrderedDict
+
+
+class FetchError(RuntimeError):
+    """
+    Échec d'une requête vers la source. Temporaire (retryable) sans statut
+    (réseau, délai) ou pour les statuts 429 et 5xx ; définitif sinon (404...).
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = status is None or status == 429 or status >= 500
+
+
+class CircuitOpenError(RuntimeError):
+    """Appel refusé : le disjoncteur est ouvert (source en échec)."""
+
+    retryable = False
+
+
+class RateLimitTimeout(RuntimeError):
+    """Aucun jeton disponible dans le délai imparti."""
+
+    retryable = False
+
+
+# ---------------------------------------------------------
+# 1. Fusion des requêtes identiques (single flight)
+# ---------------------------------------------------------
+class SingleFlight:
+    """
+    Les appels simultanés de même clé partagent une seule exécution :
+    le premier appelant exécute fn, les autres attendent son résultat (ou son erreur).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Retourne (résultat, partagé) ; partagé=True si l'appel a rejoint un appel en cours."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = fn()
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+        return call["result"], False
+
+
+# ---------------------------------------------------------
+# 2. Limitation de débit
+# ---------------------------------------------------------
+class TokenBucket:
+    """
+    Seau à jetons : `rate` requêtes par seconde en régime établi,
+    jusqu'à `capacity` d'un coup après une période calme.
+    """
+
+    def __init__(self, rate=2.0, capacity=5, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._clock, self._sleep = clock, sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1, timeout=None):
+        """Attend un jeton ; False si timeout (secondes) est dépassé."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+
+# ---------------------------------------------------------
+# 3. Reprises
+# ---------------------------------------------------------
+def backoff_delays(attempts, base_delay=0.5, max_delay=8.0, rng=random):
+    """
+    Attentes entre tentatives ("full jitter") : uniforme sur [0, min(max_delay, base * 2^i)],
+    pour que des clients en échec simultané ne réessaient pas ensemble.
+    """
+    return [rng.uniform(0, min(max_delay, base_delay * 2 ** i)) for i in range(attempts - 1)]
+
+
+def is_retryable(error):
+    """Erreur temporaire ? Les erreurs peuvent le préciser par un attribut `retryable`."""
+    return getattr(error, "retryable", True)
+
+
+def retry(fn, attempts=3, base_delay=0.5, max_delay=8.0, rng=random, sleep=time.sleep, on_error=None):
+    """Appelle fn jusqu'à `attempts` fois tant que l'erreur est temporaire."""
+    delays = backoff_delays(attempts, base_delay, max_delay, rng)
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            if attempt == attempts - 1 or not is_retryable(e):
+                raise
+            sleep(delays[attempt])
+
+
+# ---------------------------------------------------------
+# 4. Disjoncteur
+# ---------------------------------------------------------
+class CircuitBreaker:
+    """
+    Après `failure_threshold` échecs consécutifs, le disjoncteur s'ouvre :
+    les appels sont refusés pendant `reset_timeout` secondes, puis un seul
+    appel d'essai est autorisé (semi-ouvert). Succès : refermé ; échec : rouvert.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """L'appel peut-il partir ? (en semi-ouvert, un seul appel d'essai à la fois)"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+    def call(self, fn):
+        if not self.allow():
+            raise CircuitOpenError("source de données indisponible (disjoncteur ouvert)")
+        try:
+            result = fn()
+        except Exception as e:
+            if is_retryable(e):
+                self.record_failure()
+            else:
+                # La source a répondu : l'erreur tient à la requête (symbole inconnu...)
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+
+# ---------------------------------------------------------
+# 5. Dernier résultat connu
+# ---------------------------------------------------------
+class StaleCache:
+    """Dernier résultat réussi par clé (LRU borné), servi quand la source est en échec."""
+
+    def __init__(self, max_entries=256, clock=time.time):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, max_age=None):
+        """(valeur, âge en secondes) ou (None, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        age = self._clock() - entry[0]
+        if max_age is not None and age > max_age:
+            return None, None
+        return entry[1], age
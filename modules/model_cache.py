@@ -0,0 +1,162 @@
+# modules/model_cache.py
+# Cache des modèles de prévision ajustés (SingleAssetAnalyzer.predict_future),
+# persistant sur disque avec éviction LRU.
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+MODEL_DIR = os.environ.get(
+    "QUANT_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "models")
+)
+
+
+def fingerprint(values):
+    """Empreinte d'une série de prix (octets float64)."""
+    data = np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+    return hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+
+
+class ModelCache:
+    """
+    Un modèle par famille (ticker, intervalle, modèle, hyperparamètres), mémorisé
+    avec l'empreinte, la longueur et (si fournies) les dates des données d'ajustement.
+
+    lookup() reconnaît :
+    - les données identiques (réutilisation directe),
+    - les données prolongées de quelques barres (mise à jour incrémentale possible).
+    Avec les dates, la fenêtre doit en plus commencer à la même barre : une fenêtre
+    plus courte ou dont le début a avancé (historique de longueur fixe) est réajustée,
+    le modèle ne doit pas garder des barres sorties de la fenêtre.
+    Les entrées sont gardées en mémoire et sur disque (pickle), les moins
+    récemment utilisées sont évincées au-delà de max_entries.
+    """
+
+    def __init__(self, directory=MODEL_DIR, max_entries=32):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, family):
+        name = hashlib.blake2b(repr(family).encode(), digest_size=12).hexdigest()
+        return os.path.join(self.directory, name + ".pkl")
+
+    def _load(self, family):
+        if family in self._memory:
+            self._memory.move_to_end(family)
+            return self._memory[family]
+
+        path = self._path(family)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)
+        except Exception as e:
+            print("ERROR ModelCache:", e)
+            return None
+
+        self._remember(family, entry)
+        return entry
+
+    def _remember(self, family, entry):
+        self._memory[family] = entry
+        self._memory.move_to_end(family)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, family, values, dates=None):
+        """
+        Retourne (entrée, nombre de nouvelles barres) ou (None, None).
+        0 nouvelle barre = mêmes données que lors de l'ajustement.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        with self._lock:
+            entry = self._load(family)
+
+        if entry is None:
+            return None, None
+
+        if entry["n_obs"] > len(values):
+            return None, None
+
+        if dates is not None and entry.get("start") is not None:
+            # Même début, même dernière barre ajustée : les valeurs sont ensuite comparées
+            dates = np.asarray(dates, dtype="datetime64[ns]")
+            if dates[0] != entry["start"] or dates[entry["n_obs"] - 1] != entry["end"]:
+                return None, None
+        if fingerprint(values[:entry["n_obs"]]) != entry["fingerprint"]:
+            return None, None
+
+        return entry, len(values) - entry["n_obs"]
+
+    def store(self, family, values, state, since_fit=0, dates=None):
+        """
+        Mémorise l'état ajusté ; since_fit = barres ajoutées par mises à jour
+        incrémentales depuis le dernier ajustement complet.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        entry = {
+            "state": state,
+            "n_obs": len(values),
+            "fingerprint": fingerprint(values),
+            "since_fit": since_fit,
+            "start": None,
+            "end": None,
+            "stored_at": time.time(),
+        }
+        if dates is not None and len(dates):
+            dates = np.asarray(dates, dtype="datetime64[ns]")
+            entry["start"], entry["end"] = dates[0], dates[-1]
+
+        with self._lock:
+            self._remember(family, entry)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                path = self._path(family)
+                with open(path + ".tmp", "wb") as f:
+                    pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(path + ".tmp", path)
+                self._evict()
+            except Exception as e:
+                print("ERROR ModelCache:", e)
+
+        return entry
+
+    def _evict(self):
+        """Supprime les fichiers les moins récemment utilisés au-delà de max_entries."""
+        files = [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".pkl")]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            os.remove(path)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if os.path.isdir(self.directory):
+                for f in os.listdir(self.directory):
+                    if f.endswith(".pkl"):
+                        os.remove(os.path.join(self.directory, f))
+
+
+_DEFAULT_CACHE = None
+
+
+def get_model_cache():
+    """Cache partagé par défaut (data/models)."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = ModelCache()
+    return _DEFAULT_CACHE
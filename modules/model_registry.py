@@ -0,0 +1,73 @@
+# modules/model_registry.py
+# Registre des modèles de prévision : chaque backend lourd (scikit-learn, statsmodels)
+# n'est importé qu'à la première demande d'un modèle qui l'utilise.
+# Importer strategy_single (app, cron, batch) ne coûte donc plus ces bibliothèques.
+
+import importlib
+import importlib.util
+import threading
+
+# Backend : (module, classe), importé au premier usage
+_BACKENDS = {
+    "linear": ("sklearn.linear_model", "LinearRegression"),
+    "random_forest": ("sklearn.ensemble", "RandomForestRegressor"),
+    "arima": ("statsmodels.tsa.arima.model", "ARIMA"),
+}
+
+# Modèles proposés par SingleAssetAnalyzer.predict_future -> backend
+MODELS = {
+    "Linear Regression": "linear",
+    "ARIMA": "arima",
+    "Machine Learning (RF)": "random_forest",
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def register_backend(name, module, attribute):
+    """Déclare (ou remplace) un backend sans l'importer."""
+    with _lock:
+        _BACKENDS[name] = (module, attribute)
+        _loaded.pop(name, None)
+
+
+def load_backend(name):
+    """Classe du backend, importée au premier appel puis mémorisée."""
+    if name in _loaded:
+        return _loaded[name]
+
+    if name not in _BACKENDS:
+        raise KeyError(f"Backend inconnu : {name} (attendu : {', '.join(_BACKENDS)})")
+
+    module, attribute = _BACKENDS[name]
+    with _lock:
+        if name not in _loaded:
+            try:
+                _loaded[name] = getattr(importlib.import_module(module), attribute)
+            except ImportError as e:
+                raise ImportError(f"Le backend '{name}' nécessite {module.split('.')[0]} : {e}") from e
+    return _loaded[name]
+
+
+def model_backend(model_type):
+    """Classe du backend d'un modèle de predict_future ("ARIMA", ...)."""
+    if model_type not in MODELS:
+        raise KeyError(f"Modèle inconnu : {model_type} (attendu : {', '.join(MODELS)})")
+    return load_backend(MODELS[model_type])
+
+
+def is_available(name):
+    """Le paquet du backend est-il installé ? (vérifié sans l'importer)"""
+    module = _BACKENDS[name][0]
+    return importlib.util.find_spec(module.split(".")[0]) is not None
+
+
+def available_models():
+    """Modèles dont le backend est installé, dans l'ordre de MODELS."""
+    return [m for m, backend in MODELS.items() if is_available(backend)]
+
+
+def loaded_backends():
+    """Backends déjà importés dans ce processus."""
+    return sorted(_loaded)
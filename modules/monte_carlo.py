@@ -0,0 +1,183 @@
+# modules/monte_carlo.py
+# Simulation Monte Carlo vectorisée de trajectoires de prix futures :
+# bandes de quantiles par jour, VaR / ES à l'horizon.
+# Les trajectoires sont traitées par blocs : la mémoire ne dépend que de chunk_size.
+
+import numpy as np
+
+METHODS = ("gbm", "bootstrap", "garch")
+DEFAULT_LEVELS = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Histogramme par jour (log-rendement cumulé) : N_BINS cases sur ± HIST_RANGE écarts-types
+N_BINS = 2000
+HIST_RANGE = 10.0
+
+
+# ---------------------------------------------------------
+# 1. GARCH(1,1)
+# ---------------------------------------------------------
+def garch_variance(eps, omega, alpha, beta, var0=None):
+    """
+    Variance conditionnelle GARCH(1,1) :
+    sigma2[t] = omega + alpha * eps[t-1]^2 + beta * sigma2[t-1]
+    calculée d'un bloc par un filtre récursif (lfilter).
+    """
+    from scipy.signal import lfilter  # import différé : seul le modèle GARCH en a besoin
+
+    eps = np.asarray(eps, dtype=float)
+    var0 = np.var(eps) if var0 is None else var0
+    # y[t] = x[t] + beta * y[t-1], avec x[0] = var0 pour démarrer à sigma2[0] = var0
+    drive = np.r_[var0, omega + alpha * eps[:-1] ** 2]
+    return lfilter([1.0], [1.0, -beta], drive)
+
+
+def fit_garch(returns):
+    """
+    Ajustement GARCH(1,1) par maximum de vraisemblance gaussienne.
+    Retourne {"mu", "omega", "alpha", "beta", "last_var", "last_eps"}.
+    """
+    from scipy.optimize import minimize
+
+    r = np.asarray(returns, dtype=float)
+    r = r[np.isfinite(r)]
+    mu = r.mean()
+    eps = r - mu
+    var0 = eps.var()
+
+    def neg_loglik(params):
+        omega, alpha, beta = params
+        if alpha + beta >= 0.999:
+            return 1e10
+        sigma2 = np.maximum(garch_variance(eps, omega, alpha, beta, var0), 1e-12)
+        return 0.5 * np.sum(np.log(sigma2) + eps ** 2 / sigma2)
+
+    x0 = [var0 * 0.05, 0.05, 0.9]
+    bounds = [(1e-12, 10 * var0), (0.0, 0.5), (0.0, 0.999)]
+    res = minimize(neg_loglik, x0, method="L-BFGS-B", bounds=bounds)
+    omega, alpha, beta = res.x
+
+    sigma2 = garch_variance(eps, omega, alpha, beta, var0)
+    last_var = omega + alpha * eps[-1] ** 2 + beta * sigma2[-1]
+    return {"mu": mu, "omega": omega, "alpha": alpha, "beta": beta,
+            "last_var": last_var, "last_eps": eps[-1]}
+
+
+# ---------------------------------------------------------
+# 2. Générateurs d'incréments (log-rendements, chunk x horizon)
+# ---------------------------------------------------------
+def _increments_gbm(rng, n, horizon, model):
+    return model["mu"] + model["sigma"] * rng.standard_normal((n, horizon))
+
+
+def _increments_bootstrap(rng, n, horizon, model):
+    history = model["history"]
+    return history[rng.integers(0, len(history), size=(n, horizon))]
+
+
+def _increments_garch(rng, n, horizon, model):
+    # Boucle sur les jours, vectorisée sur les trajectoires
+    z = rng.standard_normal((n, horizon))
+    out = np.empty((n, horizon))
+    var = np.full(n, model["last_var"])
+    for t in range(horizon):
+        eps = np.sqrt(var) * z[:, t]
+        out[:, t] = model["mu"] + eps
+        var = model["omega"] + model["alpha"] * eps ** 2 + model["beta"] * var
+    return out
+
+
+_GENERATORS = {"gbm": _increments_gbm, "bootstrap": _increments_bootstrap, "garch": _increments_garch}
+
+
+def _fit_model(log_returns, method):
+    if method == "gbm":
+        return {"mu": log_returns.mean(), "sigma": log_returns.std(ddof=1)}
+    if method == "bootstrap":
+        return {"history": log_returns}
+    if method == "garch":
+        return fit_garch(log_returns)
+    raise ValueError(f"Méthode inconnue : {method} (attendu : {', '.join(METHODS)})")
+
+
+# ---------------------------------------------------------
+# 3. Simulation par blocs
+# ---------------------------------------------------------
+def simulate_paths(close, horizon=250, n_paths=10_000, method="gbm", seed=None,
+                   chunk_size=10_000, levels=DEFAULT_LEVELS, var_levels=(0.95, 0.99)):
+    """
+    Simule n_paths trajectoires de `horizon` jours à partir de l'historique de prix.
+
+    method : "gbm" (log-rendements gaussiens), "bootstrap" (tirage des rendements
+             historiques) ou "garch" (volatilité GARCH(1,1) ajustée sur l'historique)
+    seed : graine ; mêmes paramètres + même graine = mêmes résultats
+    chunk_size : trajectoires simulées à la fois (borne la mémoire)
+
+    Retourne un dict :
+    - "bands" : {niveau: vecteur de prix par jour} (quantiles par jour, via histogrammes)
+    - "mean" : prix moyen par jour
+    - "terminal_returns" : rendement simple de chaque trajectoire à l'horizon
+    - "var" / "es" : {niveau: perte} à l'horizon, en rendement positif (0.08 = -8 %)
+    """
+    close = np.asarray(close, dtype=float)
+    close = close[np.isfinite(close)]
+    log_returns = np.diff(np.log(close))
+    last_price = close[-1]
+
+    model = _fit_model(log_returns, method)
+    generate = _GENERATORS[method]
+
+    # Grille d'histogramme par jour centrée sur la dérive, échelle sigma * sqrt(t)
+    days = np.arange(1, horizon + 1)
+    center = log_returns.mean() * days
+    scale = log_returns.std(ddof=1) * np.sqrt(days)
+    if method == "garch":
+        scale = np.maximum(scale, np.sqrt(model["last_var"] * days))
+    lo = center - HIST_RANGE * scale
+    width = 2 * HIST_RANGE * scale / N_BINS
+
+    counts = np.zeros(horizon * N_BINS, dtype=np.int64)
+    price_sum = np.zeros(horizon)
+    terminal = np.empty(n_paths)
+    offsets = (np.arange(horizon) * N_BINS)[None, :]
+
+    n_chunks = -(-n_paths // chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    for k, chunk_seed in enumerate(seeds):
+        rng = np.random.default_rng(chunk_seed)
+        start = k * chunk_size
+        n = min(chunk_size, n_paths - start)
+
+        cum = np.cumsum(generate(rng, n, horizon, model), axis=1)
+        price_sum += (last_price * np.exp(cum)).sum(axis=0)
+        terminal[start:start + n] = np.expm1(cum[:, -1])
+
+        idx = np.clip(((cum - lo) / width).astype(np.int64), 0, N_BINS - 1)
+        counts += np.bincount((idx + offsets).ravel(), minlength=horizon * N_BINS)
+
+    # Quantiles par jour : interpolation linéaire dans la case de l'histogramme cumulé
+    cum_counts = counts.reshape(horizon, N_BINS).cumsum(axis=1)
+    bands = {}
+    for q in levels:
+        target = q * n_paths
+        b = np.minimum((cum_counts < target).sum(axis=1), N_BINS - 1)
+        rows = np.arange(horizon)
+        below = np.where(b > 0, cum_counts[rows, b - 1], 0)
+        in_bin = np.maximum(cum_counts[rows, b] - below, 1)
+        frac = np.clip((target - below) / in_bin, 0, 1)
+        bands[q] = last_price * np.exp(lo + (b + frac) * width)
+
+    var, es = {}, {}
+    for level in var_levels:
+        cutoff = np.quantile(terminal, 1 - level)
+        var[level] = -cutoff
+        es[level] = -terminal[terminal <= cutoff].mean()
+
+    return {
+        "bands": bands,
+        "mean": price_sum / n_paths,
+        "terminal_returns": terminal,
+        "var": var,
+        "es": es,
+        "model": {k: v for k, v in model.items() if k != "history"},
+    }
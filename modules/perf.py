@@ -0,0 +1,316 @@
+# modules/perf.py
+# Instrumentation des chemins critiques : spans de durée (et d'allocations, en option)
+# autour du chargement des données, des stratégies, des métriques et des graphiques.
+#
+# Désactivée par défaut : un span coûte alors un test de drapeau. Deux portées :
+# - processus : QUANT_PERF=1 (QUANT_PERF=memory pour les allocations) ou perf.enable() ;
+# - contexte : start_recording() n'instrumente que le contexte appelant (une session
+#   Streamlit, une exécution cron...) ; les autres sessions du processus ne sont pas touchées.
+# Export JSON (spans + agrégats) ou Chrome trace (chrome://tracing, ui.perfetto.dev).
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+
+# Activation pour tout le processus (QUANT_PERF, cron, batch)
+_STATE = {"enabled": False, "memory": False}
+
+# Spans hors enregistrement dédié : tampon borné du processus
+_GLOBAL = deque(maxlen=10_000)
+# Enregistrement en cours dans ce contexte (session Streamlit, exécution cron...)
+# et suivi des allocations propre à cet enregistrement
+_RECORDS = contextvars.ContextVar("perf_records", default=None)
+_MEMORY = contextvars.ContextVar("perf_memory", default=False)
+_LOCAL = threading.local()
+# Horloge monotone recalée sur l'heure murale : spans comparables entre processus
+_EPOCH = time.perf_counter_ns()
+_EPOCH_WALL_NS = time.time_ns()
+
+
+# tracemalloc est global au processus : démarré au premier utilisateur
+# (processus ou enregistrement), arrêté au dernier s'il a été démarré ici
+_TRACE = {"users": 0, "own": False}
+_TRACE_LOCK = threading.Lock()
+
+
+def _trace_acquire():
+    with _TRACE_LOCK:
+        _TRACE["users"] += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _TRACE["own"] = True
+
+
+def _trace_release():
+    with _TRACE_LOCK:
+        _TRACE["users"] -= 1
+        if _TRACE["users"] == 0 and _TRACE["own"]:
+            tracemalloc.stop()
+            _TRACE["own"] = False
+
+
+def enable(memory=False):
+    """
+    Active les spans pour tout le processus ; memory=True suit aussi les allocations
+    (tracemalloc, plus coûteux). Pour une seule session : start_recording().
+    """
+    if memory and not _STATE["memory"]:
+        _trace_acquire()
+    elif not memory and _STATE["memory"]:
+        _trace_release()
+    _STATE["enabled"] = True
+    _STATE["memory"] = memory
+
+
+def disable():
+    """Désactive l'instrumentation du processus (les enregistrements en cours continuent)."""
+    enable(memory=False)
+    _STATE["enabled"] = False
+
+
+def is_enabled():
+    """Spans actifs dans ce contexte (processus entier ou enregistrement en cours) ?"""
+    return _STATE["enabled"] or _RECORDS.get() is not None
+
+
+_ENV = os.environ.get("QUANT_PERF", "").lower()
+if _ENV not in ("", "0", "false"):
+    enable(memory=_ENV == "memory")
+
+
+class _Records(list):
+    """Liste des spans d'un enregistrement (référençable par weakref)."""
+
+    __slots__ = ("release", "__weakref__")
+
+
+def start_recording(memory=False):
+    """
+    Nouvel enregistrement pour le contexte courant : les spans de ce contexte sont
+    mesurés même si le processus n'est pas instrumenté. memory=True suit aussi les
+    allocations de ce contexte (tracemalloc tourne tant que l'enregistrement vit ;
+    les pics mesurés sont ceux du processus, donc bruités par les sessions concurrentes).
+    Retourne la liste, remplie au fil des spans. Remplace l'enregistrement précédent.
+    """
+    stop_recording()
+    records = _Records()
+    records.release = None
+    if memory:
+        _trace_acquire()
+        # Libéré par stop_recording(), ou quand la liste disparaît (fin de session)
+        records.release = weakref.finalize(records, _trace_release)
+
+    _RECORDS.set(records)
+    _MEMORY.set(memory)
+    return records
+
+
+def stop_recording():
+    """Termine l'enregistrement du contexte courant ; retourne ses spans (ou None)."""
+    records = _RECORDS.get()
+    if records is None:
+        return None
+    _RECORDS.set(None)
+    _MEMORY.set(False)
+    if getattr(records, "release", None) is not None:
+        records.release()
+    return list(records)
+
+
+def records():
+    """Spans de l'enregistrement courant, sinon du tampon du processus."""
+    current = _RECORDS.get()
+    return list(current) if current is not None else list(_GLOBAL)
+
+
+def add_records(spans):
+    """Ajoute des spans venus d'ailleurs (processus de calcul) à l'enregistrement courant."""
+    current = _RECORDS.get()
+    (current if current is not None else _GLOBAL).extend(spans)
+
+
+def reset():
+    current = _RECORDS.get()
+    if current is not None:
+        current.clear()
+    _GLOBAL.clear()
+
+
+# ---------------------------------------------------------
+# 1. Spans
+# ---------------------------------------------------------
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start", "depth", "mem_start", "peak")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = getattr(_LOCAL, "stack", None)
+        if stack is None:
+            stack = _LOCAL.stack = []
+        self.depth = len(stack)
+        self.mem_start = None
+
+        if (_STATE["memory"] or _MEMORY.get()) and tracemalloc.is_tracing():
+            # Pic propre au span : le pic courant est reporté sur le parent avant remise à zéro
+            current, peak = tracemalloc.get_traced_memory()
+            if stack and stack[-1].mem_start is not None:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = self.peak = current
+
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        stack = _LOCAL.stack
+        stack.pop()
+
+        record = {
+            "name": self.name,
+            "start_ms": (_EPOCH_WALL_NS + self.start - _EPOCH) / 1e6,
+            "duration_ms": (end - self.start) / 1e6,
+            "depth": self.depth,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if self.attrs:
+            record["args"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        if self.mem_start is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            record["mem_peak_kb"] = (self.peak - self.mem_start) / 1024
+            record["mem_net_kb"] = (current - self.mem_start) / 1024
+            if stack and stack[-1].mem_start is not None:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+
+        current_records = _RECORDS.get()
+        (current_records if current_records is not None else _GLOBAL).append(record)
+        return False
+
+
+def span(name, **attrs):
+    """
+    Contexte mesurant un bloc :
+        with perf.span("data.get_history", symbol=symbol):
+            ...
+    Désactivé (ni processus instrumenté ni enregistrement en cours) : renvoie un contexte vide partagé.
+    """
+    if not _STATE["enabled"] and _RECORDS.get() is None:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def timed(name=None):
+    """
+    Décorateur : un span par appel, nommé module.fonction par défaut.
+    Utilisable avec ou sans parenthèses (@timed, @timed("nom")).
+    """
+    def decorate(func):
+        label = name if isinstance(name, str) else f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _STATE["enabled"] and _RECORDS.get() is None:
+                return func(*args, **kwargs)
+            with _Span(label, None):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate(name) if callable(name) else decorate
+
+
+# ---------------------------------------------------------
+# 2. Agrégats et exports
+# ---------------------------------------------------------
+def summary(spans=None):
+    """
+    Agrégat par nom de span, trié par temps total décroissant :
+    [{"name", "calls", "total_ms", "mean_ms", "max_ms", "mem_peak_kb"}].
+    """
+    spans = records() if spans is None else spans
+    stats = {}
+    for s in spans:
+        entry = stats.setdefault(s["name"], {"name": s["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["calls"] += 1
+        entry["total_ms"] += s["duration_ms"]
+        entry["max_ms"] = max(entry["max_ms"], s["duration_ms"])
+        if "mem_peak_kb" in s:
+            entry["mem_peak_kb"] = max(entry.get("mem_peak_kb", 0.0), s["mem_peak_kb"])
+
+    rows = sorted(stats.values(), key=lambda e: -e["total_ms"])
+    for entry in rows:
+        entry["mean_ms"] = entry["total_ms"] / entry["calls"]
+    return rows
+
+
+def to_chrome_trace(spans=None):
+    """Format Chrome trace (événements complets "X", temps en microsecondes)."""
+    spans = records() if spans is None else spans
+    events = []
+    for s in spans:
+        args = dict(s.get("args", {}))
+        for key in ("mem_peak_kb", "mem_net_kb", "error"):
+            if key in s:
+                args[key] = s[key]
+        events.append({
+            "name": s["name"],
+            "cat": s["name"].split(".", 1)[0],
+            "ph": "X",
+            "ts": s["start_ms"] * 1000,
+            "dur": s["duration_ms"] * 1000,
+            "pid": s["pid"],
+            "tid": s["tid"],
+            "args": args,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def report(spans=None):
+    """{"spans": [...], "summary": [...]} (format de export_json)."""
+    spans = records() if spans is None else spans
+    return {"spans": spans, "summary": summary(spans)}
+
+
+def export_json(path, spans=None):
+    with open(path, "w") as f:
+        json.dump(report(spans), f, indent=2, default=str)
+
+
+def export_chrome_trace(path, spans=None):
+    with open(path, "w") as f:
+        json.dump(to_chrome_trace(spans), f, default=str)
+
+
+def export(path, spans=None):
+    """Export selon l'extension : .trace.json -> Chrome trace, sinon JSON (spans + agrégats)."""
+    if path.endswith(".trace.json"):
+        export_chrome_trace(path, spans)
+    else:
+        export_json(path, spans)
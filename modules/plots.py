@@ -1,49 +1,172 @@
 # modules/plots.py
 
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 
+from modules.perf import timed
+
+
+# ---------------------------------------------------------
+# RÉDUCTION DU NOMBRE DE POINTS ENVOYÉS AU NAVIGATEUR
+# ---------------------------------------------------------
+# Une courbe n'a pas besoin de plus de points que de pixels en largeur :
+# au-delà, on sous-échantillonne en conservant la forme (LTTB ou min/max par case).
+DEFAULT_WIDTH_PX = 1200
+WEBGL_THRESHOLD = 5000  # points par trace au-delà desquels on passe en Scattergl
+
+
+def _as_float(x):
+    """Abscisses numériques (dates -> nanosecondes) pour les calculs de surface."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    try:
+        return x.astype(float)
+    except (TypeError, ValueError):
+        return np.arange(len(x), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets : indices des n_out points qui préservent
+    le mieux la forme de la courbe (premier et dernier point toujours gardés).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Moyenne de la case suivante (le dernier point pour la dernière case)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+
+    return out
+
+
+def minmax_indices(y, n_buckets):
+    """Indices du minimum et du maximum de chaque case (vectorisé), triés."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    valid = ~np.all(np.isnan(blocks), axis=1)
+    blocks = blocks[valid]
+    base = (np.flatnonzero(valid) * size)
+
+    idx = np.r_[0, base + np.nanargmin(blocks, axis=1), base + np.nanargmax(blocks, axis=1), n - 1]
+    return np.unique(idx)
+
+
+def downsample_indices(x, y, width_px=DEFAULT_WIDTH_PX, method="lttb"):
+    """Indices à conserver pour une trace affichée sur width_px pixels."""
+    if method == "minmax":
+        return minmax_indices(y, max(width_px // 2, 1))
+    return lttb_indices(x, y, width_px)
+
+
+@timed
+def downsample_frame(df: pd.DataFrame, width_px=DEFAULT_WIDTH_PX):
+    """
+    Sous-échantillonne un DataFrame de courbes (une colonne par courbe, ex. pour
+    st.line_chart) : union des min/max par case de chaque colonne, lignes communes.
+    """
+    if len(df) <= width_px:
+        return df
+
+    keep = np.unique(np.concatenate([
+        minmax_indices(df[c].to_numpy(dtype=float), max(width_px // 2, 1)) for c in df.columns
+    ]))
+    return df.iloc[keep]
+
+
+def _line(x, y, downsample, width_px, method, counts, **kwargs):
+    """Trace de type ligne, sous-échantillonnée et en WebGL si elle reste volumineuse."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+
+    # Les NaN de tête (fenêtres glissantes incomplètes) ne sont pas envoyés
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    counts["raw"] += int(valid.sum())
+
+    if downsample and len(y) > width_px:
+        idx = downsample_indices(x, y, width_px, method)
+        x, y = x[idx], y[idx]
+    counts["sent"] += len(y)
+
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, mode="lines", **kwargs)
+
+
+def _report_points(fig, counts):
+    """Nombre de points bruts / envoyés, dans layout.meta."""
+    fig.update_layout(meta={"points_raw": counts["raw"], "points_sent": counts["sent"]})
+
 
 # ---------------------------------------------------------
 # PLOT 1 — Graphique des prix + SMA + signaux
 # ---------------------------------------------------------
-def plot_price_with_indicators(df: pd.DataFrame, show_sma=True):
+@timed
+def plot_price_with_indicators(df: pd.DataFrame, show_sma=True, downsample=True,
+                               width_px=DEFAULT_WIDTH_PX, method="lttb"):
     """
     Graphique : prix, SMA, zones achat/vente.
+    downsample : réduit chaque trace à ~width_px points (method "lttb" ou "minmax").
     """
 
     fig = go.Figure()
+    counts = {"raw": 0, "sent": 0}
 
     # Courbe des prix
-    fig.add_trace(go.Scatter(
-        x=df["Date"],
-        y=df["Close"],
-        mode="lines",
+    fig.add_trace(_line(
+        df["Date"],
+        df["Close"],
+        downsample, width_px, method, counts,
         name="Prix",
         line=dict(color="white", width=2)
     ))
 
     # SMA short
     if show_sma and "SMA_short" in df.columns:
-        fig.add_trace(go.Scatter(
-            x=df["Date"],
-            y=df["SMA_short"],
-            mode="lines",
+        fig.add_trace(_line(
+            df["Date"],
+            df["SMA_short"],
+            downsample, width_px, method, counts,
             name="SMA Court",
             line=dict(color="orange", width=1.5)
         ))
 
     # SMA long
     if show_sma and "SMA_long" in df.columns:
-        fig.add_trace(go.Scatter(
-            x=df["Date"],
-            y=df["SMA_long"],
-            mode="lines",
+        fig.add_trace(_line(
+            df["Date"],
+            df["SMA_long"],
+            downsample, width_px, method, counts,
             name="SMA Long",
             line=dict(color="blue", width=1.5)
         ))
 
+    _report_points(fig, counts)
     fig.update_layout(
         template="plotly_dark",
         height=500,
@@ -58,31 +181,36 @@ def plot_price_with_indicators(df: pd.DataFrame, show_sma=True):
 # ---------------------------------------------------------
 # PLOT 2 — Courbe equity (stratégie vs buy&hold)
 # ---------------------------------------------------------
-def plot_equity(df_bh: pd.DataFrame, df_strat: pd.DataFrame):
+@timed
+def plot_equity(df_bh: pd.DataFrame, df_strat: pd.DataFrame, downsample=True,
+                width_px=DEFAULT_WIDTH_PX, method="lttb"):
     """
     Graphique Equity curve des deux stratégies
+    downsample : réduit chaque trace à ~width_px points (method "lttb" ou "minmax").
     """
 
     fig = go.Figure()
+    counts = {"raw": 0, "sent": 0}
 
     # Buy & Hold
-    fig.add_trace(go.Scatter(
-        x=df_bh["Date"],
-        y=df_bh["Strategy"],
-        mode="lines",
+    fig.add_trace(_line(
+        df_bh["Date"],
+        df_bh["Strategy"],
+        downsample, width_px, method, counts,
         name="Buy & Hold",
         line=dict(color="green", width=2)
     ))
 
     # SMA ou autre stratégie
-    fig.add_trace(go.Scatter(
-        x=df_strat["Date"],
-        y=df_strat["Strategy"],
-        mode="lines",
+    fig.add_trace(_line(
+        df_strat["Date"],
+        df_strat["Strategy"],
+        downsample, width_px, method, counts,
         name="Stratégie",
         line=dict(color="cyan", width=2)
     ))
 
+    _report_points(fig, counts)
     fig.update_layout(
         template="plotly_dark",
         height=500,
@@ -92,3 +220,89 @@ def plot_equity(df_bh: pd.DataFrame, df_strat: pd.DataFrame):
     )
 
     return fig
+
+
+# ---------------------------------------------------------
+# PLOT 3 — Chronologie des spans de performance (modules/perf)
+# ---------------------------------------------------------
+def plot_spans(spans):
+    """
+    Chronologie des spans (une barre par span, imbrication par profondeur),
+    temps relatifs au premier span, en millisecondes.
+    """
+    fig = go.Figure()
+    if not spans:
+        return fig
+
+    origin = min(s["start_ms"] for s in spans)
+    fig.add_trace(go.Bar(
+        x=[s["duration_ms"] for s in spans],
+        base=[s["start_ms"] - origin for s in spans],
+        y=[f"{'  ' * s['depth']}{s['name']}" for s in spans],
+        orientation="h",
+        marker=dict(color=[s["depth"] for s in spans], colorscale="Viridis"),
+        hovertemplate="%{y}<br>début %{base:.1f} ms<br>durée %{x:.1f} ms<extra></extra>",
+    ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=max(300, 22 * len({s["name"] for s in spans})),
+        title="Chronologie de l'analyse",
+        xaxis_title="Temps (ms)",
+        yaxis=dict(autorange="reversed"),
+        showlegend=False,
+    )
+    return fig
+
+
+# ---------------------------------------------------------
+# PLOT 4 — Métriques glissantes (modules/rolling)
+# ---------------------------------------------------------
+ROLLING_LABELS = {
+    "Sharpe": ("Sharpe glissant", "Sharpe (ann.)"),
+    "Volatility": ("Volatilité glissante", "Volatilité (ann.)"),
+    "Sortino": ("Sortino glissant", "Sortino (ann.)"),
+    "Drawdown": ("Drawdown glissant", "Écart au plus-haut de la fenêtre"),
+    "Beta": ("Bêta glissant", "Bêta"),
+}
+
+
+@timed
+def plot_rolling(dates, frame: pd.DataFrame, metric, window=None, downsample=True,
+                 width_px=DEFAULT_WIDTH_PX, method="lttb"):
+    """
+    Une métrique glissante (une courbe par colonne de frame, ex. rolling_metrics(...)[metric]).
+    metric : clé de ROLLING_LABELS ; window : taille de fenêtre affichée dans le titre.
+    """
+    title, yaxis_title = ROLLING_LABELS.get(metric, (metric, metric))
+    if window is not None:
+        title = f"{title} ({window} barres)"
+
+    fig = go.Figure()
+    counts = {"raw": 0, "sent": 0}
+
+    for column in frame.columns:
+        fig.add_trace(_line(
+            dates,
+            frame[column],
+            downsample, width_px, method, counts,
+            name=str(column),
+            line=dict(width=1.5)
+        ))
+
+    # Repères : 0 pour les ratios, 1 pour le bêta
+    reference = {"Sharpe": 0.0, "Sortino": 0.0, "Beta": 1.0}.get(metric)
+    if reference is not None:
+        fig.add_hline(y=reference, line=dict(color="gray", width=1, dash="dot"))
+
+    _report_points(fig, counts)
+    fig.update_layout(
+        template="plotly_dark",
+        height=450,
+        title=title,
+        xaxis_title="Date",
+        yaxis_title=yaxis_title,
+        yaxis_tickformat=".0%" if metric in ("Volatility", "Drawdown") else None,
+    )
+
+    return fig
@@ -0,0 +1,201 @@
+# modules/portfolio_tools.py
+# Backtest de portefeuille multi-actifs entièrement vectorisé (Quant B) :
+# aucune boucle Python par actif ni par barre.
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------------------------------------------------
+# 1. Calendrier de rééquilibrage
+# ---------------------------------------------------------
+def rebalance_indices(dates, rule="M"):
+    """
+    Indices des barres de rééquilibrage (la première barre est toujours incluse).
+    rule : None (achat puis dérive), entier k (toutes les k barres),
+           alias pandas "W" / "M" / "Q" / "Y" (première barre de chaque période)
+           ou liste de dates.
+    """
+    dates = pd.DatetimeIndex(dates)
+    n = len(dates)
+
+    if rule is None:
+        idx = np.array([0])
+    elif isinstance(rule, (int, np.integer)):
+        idx = np.arange(0, n, int(rule))
+    elif isinstance(rule, str):
+        periods = dates.to_period(rule.rstrip("E") or rule).asi8
+        idx = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    else:
+        idx = np.searchsorted(dates, pd.DatetimeIndex(rule))
+        idx = idx[idx < n]
+
+    return np.unique(np.r_[0, idx]).astype(int)
+
+
+# ---------------------------------------------------------
+# 2. Moteur de backtest
+# ---------------------------------------------------------
+def backtest_portfolio(prices, weights=None, rebalance="M", overlay=None,
+                       cost_bps=0.0, initial_value=1.0, dtype=np.float64,
+                       return_weights=False):
+    """
+    Backtest d'un portefeuille à partir d'une matrice de prix alignés.
+
+    prices : DataFrame (index Date, une colonne par actif) ou matrice (n_barres x n_actifs)
+    weights : None (équipondéré sur les actifs disponibles), vecteur de poids cibles,
+              ou matrice (n_barres x n_actifs) dont la ligne de chaque rééquilibrage sert de cible
+    rebalance : voir rebalance_indices
+    overlay : positions par actif (n_barres x n_actifs, déjà décalées d'une barre comme
+              la colonne Position de strategy_*), appliquées à chaque barre : la poche
+              de l'actif (poids cible, puis dérive) est exposée à overlay[t] pendant la
+              barre t, le reste de la poche en cash (0 = cash, 1 = investi)
+    cost_bps : coût de transaction en points de base du montant échangé, aux
+               rééquilibrages et à chaque changement de position de l'overlay
+    dtype : np.float32 pour diviser la mémoire par deux sur les gros univers
+
+    Retourne un dict : "equity" (Series ou vecteur), "returns", "rebalance_dates",
+    "turnover" par rééquilibrage, "overlay_turnover" par barre (si overlay) et,
+    si demandé, "weights" (poids des poches après dérive, avant overlay).
+    """
+    is_frame = isinstance(prices, pd.DataFrame)
+    index = prices.index if is_frame else pd.RangeIndex(len(prices))
+    columns = prices.columns if is_frame else None
+
+    raw = pd.DataFrame(np.asarray(prices, dtype=dtype)).ffill().to_numpy(dtype=dtype)
+    n, m = raw.shape
+    available = ~np.isnan(raw)
+    P = np.where(available, raw, 1).astype(dtype)
+
+    if isinstance(rebalance, str) and not is_frame:
+        raise ValueError("Rééquilibrage calendaire : fournir un DataFrame indexé par dates.")
+    reb = rebalance_indices(index, rebalance)
+    k = len(reb)
+
+    # Poids cibles à chaque rééquilibrage (k x m)
+    avail_reb = available[reb]
+    if weights is None:
+        W = avail_reb / np.maximum(avail_reb.sum(axis=1, keepdims=True), 1)
+    else:
+        w = np.asarray(weights, dtype=dtype)
+        W = w[reb] if w.ndim == 2 else np.broadcast_to(w, (k, m))
+        W = np.where(avail_reb, W, 0)
+
+    W = W.astype(dtype)
+    cash = 1 - W.sum(axis=1)
+
+    # Valeur cumulée de chaque poche : le prix, ou avec overlay le produit des
+    # rendements exposés (1 + overlay[t] * r[t]) barre par barre
+    if overlay is None:
+        O, V = None, P
+    else:
+        O = np.nan_to_num(np.asarray(overlay, dtype=dtype))
+        r = np.zeros_like(P)
+        r[1:] = np.where(available[:-1], P[1:] / P[:-1] - 1, 0)
+        V = np.cumprod(1 + O * r, axis=0)
+
+    # Période de chaque barre et croissance depuis le dernier rééquilibrage
+    period = np.searchsorted(reb, np.arange(n), side="right") - 1
+    growth = V / V[reb][period]
+    holdings = W[period] * growth
+    factor = cash[period] + holdings.sum(axis=1)
+
+    # Valeur en début de période : produit des facteurs de fin de période précédente
+    growth_end = V[reb[1:]] / V[reb[:-1]]
+    drifted = W[:-1] * growth_end
+    factor_end = cash[:-1] + drifted.sum(axis=1)
+
+    before = np.vstack([np.zeros((1, m), dtype=dtype),
+                        drifted / factor_end[:, None]])
+    turnover = np.abs(W - before).sum(axis=1)
+    costs = turnover * cost_bps / 1e4
+
+    start_value = initial_value * np.cumprod(np.r_[1.0, factor_end]) * np.cumprod(1 - costs)
+    equity = start_value[period] * factor
+
+    if O is not None:
+        # Changement de position en t : montant échangé = |Δoverlay| x poids de la poche en t-1
+        overlay_turnover = np.zeros(n, dtype=dtype)
+        overlay_turnover[2:] = (np.abs(O[2:] - O[1:-1]) * holdings[1:-1]).sum(axis=1) / factor[1:-1]
+        equity = equity * np.cumprod(1 - overlay_turnover * cost_bps / 1e4)
+    equity = equity.astype(dtype)
+    returns = np.r_[0.0, equity[1:] / equity[:-1] - 1].astype(dtype)
+
+    result = {
+        "equity": pd.Series(equity, index=index, name="Portfolio") if is_frame else equity,
+        "returns": pd.Series(returns, index=index, name="Returns") if is_frame else returns,
+        "rebalance_dates": index[reb],
+        "turnover": turnover,
+    }
+    if O is not None:
+        result["overlay_turnover"] = (pd.Series(overlay_turnover, index=index, name="Overlay turnover")
+                                      if is_frame else overlay_turnover)
+
+    if return_weights:
+        current = holdings / factor[:, None]
+        result["weights"] = pd.DataFrame(current, index=index, columns=columns) if is_frame else current
+
+    return result
+
+
+# ---------------------------------------------------------
+# 3. Superpositions de signaux par actif
+# ---------------------------------------------------------
+def sma_overlay(prices, short=20, long=50, long_only=True):
+    """
+    Croisement de moyennes mobiles calculé pour tous les actifs d'un coup
+    (sommes cumulées colonne par colonne). Retourne les positions décalées
+    d'une barre, comme la colonne Position de strategy_sma.
+    """
+    P = np.asarray(prices, dtype=float)
+    n = len(P)
+    zeros = np.zeros((1, P.shape[1]))
+    csum = np.vstack([zeros, np.nancumsum(P, axis=0)])
+    ccount = np.vstack([zeros, np.cumsum(~np.isnan(P), axis=0)])
+
+    def sma(w):
+        # NaN tant que la fenêtre contient une barre sans prix (avant cotation)
+        out = np.full(P.shape, np.nan)
+        if w <= n:
+            full = (ccount[w:] - ccount[:-w]) == w
+            out[w - 1:] = np.where(full, (csum[w:] - csum[:-w]) / w, np.nan)
+        return out
+
+    fast, slow = sma(short), sma(long)
+    signal = np.where(fast > slow, 1.0, np.where(fast < slow, -1.0, 0.0))
+    if long_only:
+        signal = np.clip(signal, 0, None)
+
+    position = np.vstack([np.zeros((1, P.shape[1])), signal[:-1]])
+    if isinstance(prices, pd.DataFrame):
+        return pd.DataFrame(position, index=prices.index, columns=prices.columns)
+    return position
+
+
+def strategy_overlay(prices: pd.DataFrame, strategy_fn, long_only=True, **params):
+    """
+    Positions d'une stratégie de modules/strategy_single appliquée à chaque actif
+    (colonne Position), alignées sur le panel de prix.
+    """
+    positions = {}
+    for symbol in prices.columns:
+        close = prices[symbol].dropna()
+        df = pd.DataFrame({"Date": close.index, "Close": close.to_numpy()})
+        result = strategy_fn(df, **params)
+        positions[symbol] = pd.Series(np.asarray(result["Position"], dtype=float), index=close.index)
+
+    overlay = pd.DataFrame(positions).reindex(prices.index).fillna(0)
+    return overlay.clip(lower=0) if long_only else overlay
+
+
+# ---------------------------------------------------------
+# 4. Statistiques multi-actifs
+# ---------------------------------------------------------
+def covariance_matrix(prices: pd.DataFrame, periods_per_year=252):
+    """Matrice de covariance annualisée des rendements."""
+    return prices.pct_change().cov() * periods_per_year
+
+
+def correlation_matrix(prices: pd.DataFrame):
+    """Matrice de corrélation des rendements."""
+    return prices.pct_change().corr()
@@ -0,0 +1,250 @@
+# modules/quote_service.py
+# Service de cotations partagé : une boucle asyncio (thread dédié) interroge
+# les symboles suivis en une requête groupée et tient une table de prix en mémoire.
+# Les pages Streamlit lisent cette table sans bloquer.
+
+import asyncio
+import random
+import threading
+import time
+
+from modules.data_loader import get_live_prices
+
+
+# ---------------------------------------------------------
+# 1. Sources de cotations
+# ---------------------------------------------------------
+class YahooQuoteSource:
+    """Source réelle : get_live_prices (une requête pour tous les symboles) hors de la boucle (thread)."""
+
+    async def fetch_many(self, symbols):
+        return await asyncio.to_thread(get_live_prices, symbols)
+
+
+class FakeQuoteSource:
+    """
+    Source locale pour tests hors-ligne : marche aléatoire par symbole,
+    latence et taux d'échec configurables (par requête), compteurs d'appels
+    (requêtes groupées et cotations par symbole).
+    """
+
+    def __init__(self, prices=None, latency=0.05, volatility=0.001, fail_rate=0.0, seed=None):
+        self.prices = dict(prices or {})
+        self.latency = latency
+        self.volatility = volatility
+        self.fail_rate = fail_rate
+        self.calls = {}
+        self.requests = 0
+        self._rng = random.Random(seed)
+
+    async def fetch_many(self, symbols):
+        self.requests += 1
+        for symbol in symbols:
+            self.calls[symbol] = self.calls.get(symbol, 0) + 1
+        await asyncio.sleep(self.latency)
+
+        if self._rng.random() < self.fail_rate:
+            raise ConnectionError(f"échec simulé pour {', '.join(symbols)}")
+
+        for symbol in symbols:
+            price = self.prices.get(symbol, 100.0)
+            self.prices[symbol] = price * (1 + self._rng.gauss(0, self.volatility))
+        return {symbol: self.prices[symbol] for symbol in symbols}
+
+
+# ---------------------------------------------------------
+# 2. Service partagé
+# ---------------------------------------------------------
+class QuoteService:
+    """
+    Table de cotations partagée entre sessions.
+    - poll_interval : période de rafraîchissement des symboles suivis, tous
+      interrogés en une seule requête (source.fetch_many)
+    - ttl : âge au-delà duquel une cotation est marquée périmée (et relancée)
+    - subscription_ttl : un abonnement non renouvelé (subscribe / get) depuis ce
+      délai est abandonné ; les sessions fermées n'ont pas à se désabonner
+    - les demandes simultanées d'un même symbole partagent un seul appel réseau
+    """
+
+    def __init__(self, source=None, ttl=60, poll_interval=30, max_concurrency=8, subscription_ttl=300):
+        self.source = source or YahooQuoteSource()
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.max_concurrency = max_concurrency
+        self.subscription_ttl = subscription_ttl
+
+        self._quotes = {}
+        # Symboles suivis : {symbole: date de la dernière demande}
+        self._symbols = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+
+    # --- cycle de vie -------------------------------------
+    def start(self):
+        """Démarre la boucle asyncio dans un thread démon (idempotent)."""
+        if self._thread is not None:
+            return self
+
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop.create_task(self._poll_loop())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="quote-service", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def cancel_tasks():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_tasks(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop, self._thread = None, None
+
+    # --- API synchrone (pages Streamlit) ------------------
+    def subscribe(self, *symbols):
+        """
+        Ajoute des symboles au rafraîchissement périodique, ou prolonge leur
+        abonnement (à rappeler à chaque affichage, voir subscription_ttl).
+        """
+        now = time.time()
+        with self._lock:
+            new = [s for s in dict.fromkeys(symbols) if s not in self._symbols]
+            self._symbols.update(dict.fromkeys(symbols, now))
+        if new:
+            self._submit(self.fetch_many(new))
+
+    def unsubscribe(self, *symbols):
+        """Retire des symboles du rafraîchissement périodique (la table garde leur dernière cotation)."""
+        with self._lock:
+            for symbol in symbols:
+                self._symbols.pop(symbol, None)
+
+    def subscriptions(self):
+        """Symboles suivis dont l'abonnement n'a pas expiré."""
+        limit = time.time() - self.subscription_ttl
+        with self._lock:
+            return [s for s, seen in self._symbols.items() if seen >= limit]
+
+    def refresh(self, symbol: str):
+        """Programme une mise à jour (fusionnée avec celle en cours s'il y en a une)."""
+        return self._submit(self.fetch(symbol))
+
+    def _submit(self, coro):
+        if self._loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def get(self, symbol: str, wait=0.0):
+        """
+        Lecture non bloquante : {"price", "time", "age", "stale"} ou None.
+        Une cotation absente ou périmée déclenche un rafraîchissement ; avec wait > 0
+        on attend au plus wait secondes la première valeur.
+        """
+        with self._lock:
+            if symbol in self._symbols:
+                self._symbols[symbol] = time.time()
+
+        quote = self._quotes.get(symbol)
+        expired = quote is None or time.time() - quote["time"] > self.ttl
+
+        if expired:
+            future = self.refresh(symbol)
+            if quote is None and wait > 0:
+                try:
+                    future.result(timeout=wait)
+                except Exception:
+                    pass
+                quote = self._quotes.get(symbol)
+
+        if quote is None:
+            return None
+
+        age = time.time() - quote["time"]
+        return dict(quote, age=age, stale=age > self.ttl)
+
+    def get_price(self, symbol: str, wait=0.0):
+        quote = self.get(symbol, wait)
+        return None if quote is None else quote["price"]
+
+    def snapshot(self):
+        """Copie de la table complète des cotations."""
+        return {s: dict(q) for s, q in self._quotes.items()}
+
+    # --- boucle asyncio -----------------------------------
+    async def fetch(self, symbol: str):
+        """Récupère une cotation ; un seul appel à la fois par symbole."""
+        return (await self.fetch_many([symbol])).get(symbol)
+
+    async def fetch_many(self, symbols):
+        """
+        Récupère plusieurs cotations en une requête à la source. Les symboles déjà
+        en cours de récupération rejoignent la requête existante.
+        Retourne {symbole: prix ou None}.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        todo = [s for s in symbols if s not in self._inflight]
+        if todo:
+            task = asyncio.ensure_future(self._fetch_batch(todo))
+            for symbol in todo:
+                self._inflight[symbol] = task
+
+            def done(_, todo=todo, task=task):
+                for symbol in todo:
+                    if self._inflight.get(symbol) is task:
+                        del self._inflight[symbol]
+
+            task.add_done_callback(done)
+
+        tasks = {self._inflight.get(s) for s in symbols} - {None}
+        prices = {}
+        for result in await asyncio.gather(*(asyncio.shield(t) for t in tasks)):
+            prices.update(result)
+        return {s: prices.get(s) for s in symbols}
+
+    async def _fetch_batch(self, symbols):
+        async with self._semaphore:
+            try:
+                prices = await self.source.fetch_many(symbols)
+            except Exception as e:
+                print("ERROR QuoteService:", ", ".join(symbols), e)
+                return {}
+
+        now = time.time()
+        for symbol, price in prices.items():
+            if price is not None:
+                self._quotes[symbol] = {"price": float(price), "time": now}
+        return prices
+
+    def _prune(self):
+        """Abandonne les abonnements expirés ; retourne les symboles encore suivis."""
+        limit = time.time() - self.subscription_ttl
+        with self._lock:
+            for symbol in [s for s, seen in self._symbols.items() if seen < limit]:
+                del self._symbols[symbol]
+            return list(self._symbols)
+
+    async def _poll_loop(self):
+        while True:
+            symbols = self._prune()
+            if symbols:
+                await self.fetch_many(symbols)
+            await asyncio.sleep(self.poll_interval)
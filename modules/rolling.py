@@ -0,0 +1,233 @@
+# modules/rolling.py
+# Métriques glissantes (Sharpe, volatilité, Sortino, drawdown, bêta) sur un lot de
+# courbes à la fois (matrice n_barres x n_courbes ou DataFrame, une courbe par colonne).
+#
+# Coût O(n) par courbe quelle que soit la fenêtre :
+# - moyennes, variances et covariances par sommes cumulées (différence de deux
+#   sommes préfixes par fenêtre), sur des rendements centrés pour limiter les arrondis ;
+# - maximum glissant (drawdown) par blocs de la taille de la fenêtre : maxima
+#   préfixes et suffixes par bloc (van Herk / Gil-Werman), vectorisé sur toutes les courbes.
+# Conventions de strategy_single.compute_metrics_matrix : taux sans risque nul,
+# écart-type échantillon, Sortino sur l'écart-type des seuls rendements négatifs.
+
+import numpy as np
+import pandas as pd
+
+from modules.perf import timed
+
+ROLLING_WINDOWS = (63, 126, 252)
+ROLLING_METRICS = ("Sharpe", "Volatility", "Sortino", "Drawdown", "Beta")
+
+
+def _as_matrix(x):
+    """(matrice float n x k, étiquettes ou None, index ou None)."""
+    if isinstance(x, pd.DataFrame):
+        return x.to_numpy(dtype=float), x.columns, x.index
+    if isinstance(x, pd.Series):
+        return x.to_numpy(dtype=float)[:, None], pd.Index([x.name]), x.index
+    a = np.asarray(x, dtype=float)
+    return (a[:, None] if a.ndim == 1 else a), None, None
+
+
+def _wrap(a, labels, index):
+    return a if labels is None else pd.DataFrame(a, index=index, columns=labels)
+
+
+def _returns(eq):
+    """Rendements alignés sur les barres (première ligne NaN)."""
+    r = np.full(eq.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r[1:] = eq[1:] / eq[:-1] - 1
+    return r
+
+
+def window_sums(x, window):
+    """
+    Somme glissante par colonne : out[t] = somme de x[t-window+1 .. t]
+    (fenêtre tronquée en tête de série). Deux lectures de la somme cumulée par barre.
+    """
+    out = np.cumsum(x, axis=0, dtype=float)
+    if window < len(out):
+        out[window:] -= out[:-window].copy()
+    return out
+
+
+def rolling_max(x, window):
+    """
+    Maximum glissant par colonne sur `window` barres (NaN ignorés), en O(n) :
+    pour la fenêtre [s, t], max = max(suffixe du bloc de s, préfixe du bloc de t).
+    Les window-1 premières barres prennent le maximum depuis le début.
+    """
+    x = np.asarray(x, dtype=float)
+    n = x.shape[0]
+    if n == 0:
+        return x.copy()
+    window = max(1, min(int(window), n))
+
+    blocks = -(-n // window)
+    padded = np.full((blocks * window,) + x.shape[1:], -np.inf)
+    padded[:n] = np.where(np.isnan(x), -np.inf, x)
+    shaped = padded.reshape((blocks, window) + x.shape[1:])
+
+    prefix = np.maximum.accumulate(shaped, axis=1).reshape(padded.shape)[:n]
+    suffix = np.maximum.accumulate(shaped[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)[:n]
+
+    out = np.empty_like(prefix)
+    out[:window - 1] = np.maximum.accumulate(prefix[:window - 1], axis=0)
+    out[window - 1:] = np.maximum(suffix[:n - window + 1], prefix[window - 1:])
+    out[np.isinf(out)] = np.nan
+    return out
+
+
+def _moments(r, window, min_periods):
+    """Compte, moyenne et écart-type glissants (NaN ignorés) d'une matrice de rendements."""
+    valid = ~np.isnan(r)
+    # Centrage par colonne : les sommes cumulées restent petites
+    shift = np.nanmean(np.where(valid, r, np.nan), axis=0) if valid.any() else np.zeros(r.shape[1])
+    shift = np.nan_to_num(shift)
+    x = np.where(valid, r - shift, 0.0)
+
+    count = window_sums(valid.astype(float), window)
+    s1 = window_sums(x, window)
+    s2 = window_sums(x * x, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / count
+        var = np.clip(s2 - s1 * mean, 0, None) / (count - 1)
+    std = np.sqrt(var)
+
+    enough = (count >= max(min_periods, 2))
+    mean = np.where(enough, mean + shift, np.nan)
+    std = np.where(enough, std, np.nan)
+    return count, mean, std
+
+
+def _downside_std(r, window, min_periods):
+    """Écart-type glissant des seuls rendements négatifs (convention du Sortino du tableau)."""
+    neg = r < 0
+    neg_r = np.where(neg, r, 0.0)
+    n_neg = window_sums(neg.astype(float), window)
+    s1 = window_sums(neg_r, window)
+    s2 = window_sums(neg_r * neg_r, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.clip(s2 - s1 * s1 / n_neg, 0, None) / (n_neg - 1)
+    return np.where(n_neg >= 2, np.sqrt(var), np.nan)
+
+
+def _ratio(mean, std, ann):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(std > 0, mean / std * ann, 0.0)
+    return np.where(np.isnan(mean), np.nan, out)
+
+
+# ---------------------------------------------------------
+# MÉTRIQUES GLISSANTES
+# ---------------------------------------------------------
+def rolling_volatility(equity, window=63, periods_per_year=252, min_periods=None):
+    """Volatilité annualisée des rendements sur `window` barres."""
+    eq, labels, index = _as_matrix(equity)
+    _, _, std = _moments(_returns(eq), window, min_periods or window)
+    return _wrap(std * np.sqrt(periods_per_year), labels, index)
+
+
+def rolling_sharpe(equity, window=63, periods_per_year=252, min_periods=None):
+    """Sharpe annualisé (taux sans risque nul) sur `window` barres."""
+    eq, labels, index = _as_matrix(equity)
+    _, mean, std = _moments(_returns(eq), window, min_periods or window)
+    return _wrap(_ratio(mean, std, np.sqrt(periods_per_year)), labels, index)
+
+
+def rolling_sortino(equity, window=63, periods_per_year=252, min_periods=None):
+    """Sortino annualisé sur `window` barres."""
+    eq, labels, index = _as_matrix(equity)
+    r = _returns(eq)
+    _, mean, _ = _moments(r, window, min_periods or window)
+    return _wrap(_ratio(mean, _downside_std(r, window, min_periods or window), np.sqrt(periods_per_year)),
+                 labels, index)
+
+
+def rolling_drawdown(equity, window=None):
+    """
+    Écart au plus-haut (<= 0) : plus-haut des `window` dernières barres,
+    ou depuis le début de la série si window est None.
+    """
+    eq, labels, index = _as_matrix(equity)
+    peak = np.fmax.accumulate(eq, axis=0) if window is None else rolling_max(eq, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = eq / peak - 1
+    return _wrap(dd, labels, index)
+
+
+def rolling_beta(equity, benchmark, window=63, min_periods=None):
+    """
+    Bêta glissant de chaque courbe par rapport à `benchmark` (courbe ou prix de
+    l'indice, mêmes barres que equity ; NaN = barre absente, ignorée).
+    """
+    eq, labels, index = _as_matrix(equity)
+    if isinstance(benchmark, (pd.Series, pd.DataFrame)) and index is not None:
+        benchmark = benchmark.reindex(index)
+    bench = np.asarray(benchmark, dtype=float).reshape(-1)[:, None]
+    return _wrap(_beta(_returns(eq), _returns(bench), window, min_periods or window), labels, index)
+
+
+def _beta(r, rb, window, min_periods):
+    """cov(r, rb) / var(rb) glissants, sur les barres où les deux rendements existent."""
+    valid = ~np.isnan(r) & ~np.isnan(rb)
+    shift_x = np.nan_to_num(np.nanmean(np.where(valid, r, np.nan), axis=0)) if valid.any() else 0.0
+    shift_y = np.nan_to_num(np.nanmean(np.where(valid, rb, np.nan), axis=0)) if valid.any() else 0.0
+    x = np.where(valid, r - shift_x, 0.0)
+    y = np.where(valid, rb - shift_y, 0.0)
+
+    count = window_sums(valid.astype(float), window)
+    sx, sy = window_sums(x, window), window_sums(y, window)
+    sxy, syy = window_sums(x * y, window), window_sums(y * y, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / count
+        var = syy - sy * sy / count
+        beta = np.where(var > 0, cov / var, np.nan)
+    return np.where(count >= max(min_periods, 2), beta, np.nan)
+
+
+def align_benchmark(closes: pd.Series, dates):
+    """
+    Clôtures de l'indice (Series indexée par date) sur les barres `dates` :
+    barres sans cotation de l'indice (week-ends des cryptos, horaires décalés)
+    = dernière clôture connue, NaN seulement avant la première. Sans ce report,
+    chaque trou retire deux rendements de l'indice et le bêta reste NaN.
+    """
+    closes = closes.sort_index()
+    closes = closes[~closes.index.duplicated(keep="last")]
+    return closes.reindex(pd.DatetimeIndex(dates), method="ffill")
+
+
+@timed
+def rolling_metrics(equity, window=63, periods_per_year=252, benchmark=None, min_periods=None,
+                    drawdown_window=None):
+    """
+    Toutes les métriques glissantes d'un lot de courbes en une passe :
+    {"Sharpe", "Volatility", "Sortino", "Drawdown", ["Beta" si benchmark]},
+    chaque entrée de même forme que equity (DataFrame si equity en est un).
+    Drawdown : depuis le plus-haut historique, ou sur drawdown_window barres.
+    """
+    eq, labels, index = _as_matrix(equity)
+    min_periods = min_periods or window
+    ann = np.sqrt(periods_per_year)
+
+    r = _returns(eq)
+    _, mean, std = _moments(r, window, min_periods)
+    metrics = {
+        "Sharpe": _ratio(mean, std, ann),
+        "Volatility": std * ann,
+        "Sortino": _ratio(mean, _downside_std(r, window, min_periods), ann),
+        "Drawdown": rolling_drawdown(eq, drawdown_window),
+    }
+
+    if benchmark is not None:
+        if isinstance(benchmark, (pd.Series, pd.DataFrame)) and index is not None:
+            benchmark = benchmark.reindex(index)
+        bench = np.asarray(benchmark, dtype=float).reshape(-1)[:, None]
+        metrics["Beta"] = _beta(r, _returns(bench), window, min_periods)
+
+    return {name: _wrap(a, labels, index) for name, a in metrics.items()}
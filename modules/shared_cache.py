@@ -0,0 +1,193 @@
+# modules/shared_cache.py
+# Cache de DataFrames partagé entre sessions, processus et redémarrages :
+# un fichier Arrow IPC par clé, lu par mémoire mappée (sans copie).
+# Tous les workers Streamlit qui lisent le même ticker partagent les mêmes pages
+# du cache système : la mémoire est payée une fois.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+
+from modules.fetch import SingleFlight
+
+# /dev/shm (mémoire) si disponible, sinon sous data/
+CACHE_DIR = os.environ.get(
+    "QUANT_SHARED_CACHE_DIR",
+    "/dev/shm/quant_cache" if os.path.isdir("/dev/shm") else
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "shared_cache")
+)
+MAX_BYTES = int(float(os.environ.get("QUANT_SHARED_CACHE_MB", 512)) * 1024 * 1024)
+
+
+class SharedFrameCache:
+    """
+    Cache clé -> DataFrame, sur fichiers Arrow IPC mappés en mémoire.
+
+    - get() rend un DataFrame dont les colonnes numériques et dates sans valeur
+      manquante sont des vues en lecture seule sur le fichier mappé (ni copie, ni pickle) ;
+      les autres (texte, entiers avec manquants...) sont converties par pandas.
+    - put() écrit atomiquement (fichier temporaire puis rename) : un lecteur garde
+      sa vue sur l'ancienne version jusqu'à ce qu'il la libère.
+    - Éviction LRU (date d'accès des fichiers) au-delà de max_bytes ; les entrées
+      plus vieilles que ttl secondes sont ignorées et rechargées.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES, ttl=300, max_mapped=64):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_mapped = max_mapped
+        # Tables déjà mappées dans ce processus : {chemin: (mtime, table)}
+        self._mapped = OrderedDict()
+        self._lock = threading.Lock()
+        # Chargements simultanés d'une même clé absente : un seul loader()
+        self._flight = SingleFlight()
+
+    def _path(self, key):
+        name = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+        return os.path.join(self.directory, name + ".arrow")
+
+    def _read(self, path):
+        """Table Arrow mappée (réutilisée tant que le fichier n'a pas été remplacé)."""
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._mapped.get(path)
+            if cached is not None and cached[0] == mtime:
+                self._mapped.move_to_end(path)
+                return cached[1]
+
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        with self._lock:
+            self._mapped[path] = (mtime, table)
+            self._mapped.move_to_end(path)
+            while len(self._mapped) > self.max_mapped:
+                self._mapped.popitem(last=False)
+        return table
+
+    def get_table(self, key):
+        """Table Arrow de la clé, ou None (absente ou expirée)."""
+        path = self._path(key)
+        try:
+            if not os.path.exists(path):
+                return None
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            table = self._read(path)
+            # Date d'accès = ordre LRU (l'écriture reste la date de fraîcheur)
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+            return table
+        except (OSError, pa.ArrowException) as e:
+            print("ERROR SharedFrameCache:", e)
+            return None
+
+    def get(self, key):
+        """
+        DataFrame ou None. split_blocks évite la consolidation des colonnes en un
+        bloc (qui copierait) : les colonnes numériques et dates sans valeur manquante
+        restent des vues en lecture seule. Pas de self_destruct : la table mappée
+        est conservée et relue par les appels suivants.
+        """
+        table = self.get_table(key)
+        if table is None:
+            return None
+        return table.to_pandas(split_blocks=True)
+
+    def get_arrays(self, key, columns=None):
+        """{colonne: tableau numpy} en vues directes sur le fichier mappé, ou None."""
+        table = self.get_table(key)
+        if table is None:
+            return None
+        columns = columns or table.column_names
+        return {c: table.column(c).combine_chunks().to_numpy(zero_copy_only=False) for c in columns}
+
+    def put(self, key, df):
+        """Écrit le DataFrame (index conservé s'il n'est pas un simple RangeIndex)."""
+        path = self._path(key)
+        try:
+            table = pa.Table.from_pandas(df)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with pa.OSFile(tmp, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp, path)
+            self._evict()
+        except (OSError, pa.ArrowException, TypeError, ValueError) as e:
+            print("ERROR SharedFrameCache:", e)
+
+    def get_or_load(self, key, loader):
+        """
+        Lecture du cache, sinon loader() puis écriture. Les résultats vides (None,
+        DataFrame vide) ne sont pas mis en cache.
+        Les appels simultanés sur une même clé absente (sessions d'un même processus)
+        partagent un seul loader().
+        """
+        df = self.get(key)
+        if df is not None:
+            return df
+
+        df, _ = self._flight.do(self._path(key), lambda: self._load(key, loader))
+        return df
+
+    def _load(self, key, loader):
+        # Un appel terminé juste avant, ou un autre processus, a pu remplir l'entrée
+        df = self.get(key)
+        if df is not None:
+            return df
+
+        df = loader()
+        if df is None or df.empty:
+            return df
+
+        self.put(key, df)
+        # Relecture : l'appelant partage la version mappée plutôt que sa copie privée
+        shared = self.get(key)
+        return df if shared is None else shared
+
+    def _evict(self):
+        """Supprime les fichiers les moins récemment lus au-delà de max_bytes."""
+        files = [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".arrow")]
+        stats = sorted(((os.stat(p), p) for p in files), key=lambda sp: sp[0].st_atime)
+        total = sum(s.st_size for s, _ in stats)
+
+        for stat, path in stats:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stat.st_size
+            with self._lock:
+                self._mapped.pop(path, None)
+
+    def size_bytes(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.directory, f))
+                   for f in os.listdir(self.directory) if f.endswith(".arrow"))
+
+    def clear(self):
+        with self._lock:
+            self._mapped.clear()
+        if os.path.isdir(self.directory):
+            for f in os.listdir(self.directory):
+                if f.endswith(".arrow"):
+                    os.remove(os.path.join(self.directory, f))
+
+
+_DEFAULT_CACHE = None
+
+
+def get_shared_cache():
+    """Cache partagé par défaut (CACHE_DIR, MAX_BYTES)."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = SharedFrameCache()
+    return _DEFAULT_CACHE
@@ -0,0 +1,145 @@
+# modules/signal_engine.py
+# Moteur de signaux à état : règles d'entrée / sortie / stop résolues en positions
+# par des opérations de tableau (report vers l'avant), vectorisées sur les colonnes
+# (une colonne = un jeu de paramètres), avec coûts de transaction et turnover.
+
+import numpy as np
+
+
+def _as_2d(a):
+    a = np.asarray(a)
+    return (a[:, None], True) if a.ndim == 1 else (a, False)
+
+
+# ---------------------------------------------------------
+# 1. Report vers l'avant
+# ---------------------------------------------------------
+def ffill(values, fill=0.0):
+    """
+    Report vers l'avant le long de l'axe 0 : chaque NaN prend la dernière valeur
+    connue (fill avant la première). values : vecteur ou matrice (barres x colonnes).
+    """
+    v, flat = _as_2d(np.asarray(values, dtype=float))
+    n = len(v)
+    valid = ~np.isnan(v)
+
+    idx = np.where(valid, np.arange(n)[:, None], -1)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    out = np.take_along_axis(v, np.maximum(idx, 0), axis=0)
+    out[idx < 0] = fill
+
+    return out[:, 0] if flat else out
+
+
+def latch(set_when, reset_when):
+    """
+    Bascule : 1 à partir d'une barre où set_when est vrai, jusqu'à la prochaine
+    barre où reset_when est vrai (set prioritaire si les deux le sont).
+    """
+    events = np.where(set_when, 1.0, np.where(reset_when, 0.0, np.nan))
+    return ffill(events).astype(np.int8)
+
+
+def hold_positions(long_entry, long_exit=None, short_entry=None, short_exit=None):
+    """
+    Positions (int8) de règles "entrer sur condition, tenir jusqu'à la sortie" :
+    +1 de long_entry jusqu'à long_exit (ou une entrée short), -1 de short_entry
+    jusqu'à short_exit (ou une entrée long). Sans règle de sortie, la position
+    est tenue jusqu'au signal inverse.
+    Ce sont des signaux au sens des stratégies : la position réellement détenue
+    est celle de la barre précédente (voir backtest).
+    """
+    long_entry = np.asarray(long_entry, dtype=bool)
+    no_event = np.zeros_like(long_entry)
+    long_exit = no_event if long_exit is None else np.asarray(long_exit, dtype=bool)
+
+    if short_entry is None:
+        return latch(long_entry, long_exit)
+
+    short_entry = np.asarray(short_entry, dtype=bool)
+    short_exit = no_event if short_exit is None else np.asarray(short_exit, dtype=bool)
+
+    long_state = latch(long_entry, long_exit | short_entry)
+    short_state = latch(short_entry, short_exit | long_entry)
+    return (long_state - short_state).astype(np.int8)
+
+
+# ---------------------------------------------------------
+# 2. Stops (boucle sur les barres, vectorisée sur les colonnes)
+# ---------------------------------------------------------
+def apply_stops(close, signal, stop_loss=None, take_profit=None):
+    """
+    Coupe les positions dont la perte (ou le gain) depuis le prix d'entrée atteint
+    stop_loss (ou take_profit), en fraction (0.05 = 5 %). Après un stop, on reste
+    à plat jusqu'au prochain changement de signal.
+    L'état (prix d'entrée, stop atteint) dépend du chemin : une boucle sur les barres,
+    chaque itération traitant toutes les colonnes d'un coup.
+    """
+    if stop_loss is None and take_profit is None:
+        return np.asarray(signal, dtype=np.int8)
+
+    sig, flat = _as_2d(np.asarray(signal, dtype=np.int8))
+    close = np.asarray(close, dtype=float)
+    px = close[:, None] if close.ndim == 1 else close
+    k = sig.shape[1]
+
+    out = np.zeros_like(sig)
+    entry = np.full(k, np.nan)
+    stopped = np.zeros(k, dtype=bool)
+    prev = np.zeros(k, dtype=np.int8)
+    sl = np.inf if stop_loss is None else stop_loss
+    tp = np.inf if take_profit is None else take_profit
+
+    for t in range(len(sig)):
+        cur, price = sig[t], px[t]
+
+        changed = cur != prev
+        entry = np.where(changed, price, entry)
+        stopped &= ~changed
+
+        pnl = (price / entry - 1) * cur
+        stopped |= (cur != 0) & ((pnl <= -sl) | (pnl >= tp))
+        out[t] = np.where(stopped, 0, cur)
+        prev = cur
+
+    return out[:, 0] if flat else out
+
+
+# ---------------------------------------------------------
+# 3. Backtest : rendements, coûts, turnover
+# ---------------------------------------------------------
+def backtest(close, signal, cost_bps=0.0, lag=1):
+    """
+    Backtest des signaux (vecteur ou matrice barres x colonnes) sur un prix.
+    La position détenue à la barre t est le signal de t - lag (convention des
+    stratégies : pas de look-ahead). Chaque changement de position coûte
+    cost_bps points de base du montant échangé.
+
+    Retourne un dict : "position" (int8), "returns" (nets de coûts), "equity" (base 1),
+    "turnover" (somme des |variations de position| par colonne), "trades" (nombre
+    de changements de position par colonne).
+    """
+    sig, flat = _as_2d(np.asarray(signal, dtype=np.int8))
+    close = np.asarray(close, dtype=float)
+    n = len(sig)
+
+    r = np.zeros(n)
+    r[1:] = close[1:] / close[:-1] - 1
+
+    held = np.zeros_like(sig)
+    held[lag:] = sig[:n - lag]
+
+    change = np.abs(np.diff(held, axis=0, prepend=0).astype(float))
+    net = r[:, None] * held - change * (cost_bps / 1e4)
+    equity = np.cumprod(1 + net, axis=0)
+
+    result = {
+        "position": held,
+        "returns": net,
+        "equity": equity,
+        "turnover": change.sum(axis=0),
+        "trades": (change > 0).sum(axis=0),
+    }
+    if flat:
+        result = {key: value[:, 0] if value.ndim == 2 else value[0] for key, value in result.items()}
+    return result
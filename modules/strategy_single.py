@@ -2,236 +2,812 @@
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from statsmodels.tsa.arima.model import ARIMA
-from datetime import timedelta
-import itertools
+from collections import OrderedDict
+import hashlib
+import threading
+
+from modules.sweep import PriceSums, sweep_momentum, sweep_cross, sweep_bollinger, walk_forward, adaptive_search
+from modules.model_cache import get_model_cache
+from modules.model_registry import model_backend
+from modules.monte_carlo import simulate_paths
+from modules.data_loader import periods_per_year, bar_step
+from modules.signal_engine import apply_stops, backtest, hold_positions
+from modules.perf import timed
+
+
+# -------------------------------------------------------------
+# CACHE D'INDICATEURS PARTAGÉ ENTRE LES STRATÉGIES
+# -------------------------------------------------------------
+# Clé : (version des données, indicateur, paramètres). Chaque indicateur
+# distinct n'est calculé qu'une fois pour un même jeu de prix, quel que soit
+# le nombre de stratégies qui l'utilisent. Les séries retournées sont partagées :
+# ne pas les modifier en place.
+INDICATOR_CACHE_SIZE = 256
+
+_indicator_cache = OrderedDict()
+_indicator_lock = threading.Lock()
+_indicator_stats = {"hits": 0, "misses": 0}
+
+
+def data_version(df: pd.DataFrame):
+    """Empreinte des prix de clôture et de l'index d'un DataFrame."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df["Close"].to_numpy(dtype=float)).tobytes())
+    if isinstance(df.index, pd.RangeIndex):
+        h.update(repr((df.index.start, df.index.stop, df.index.step)).encode())
+    else:
+        h.update(np.ascontiguousarray(df.index.to_numpy()).tobytes())
+    return h.hexdigest()
+
+
+def _cached_indicator(df, name, params, compute):
+    key = (data_version(df), name, params)
+
+    with _indicator_lock:
+        if key in _indicator_cache:
+            _indicator_cache.move_to_end(key)
+            _indicator_stats["hits"] += 1
+            return _indicator_cache[key]
+
+    value = compute()
+
+    with _indicator_lock:
+        _indicator_stats["misses"] += 1
+        _indicator_cache[key] = value
+        while len(_indicator_cache) > INDICATOR_CACHE_SIZE:
+            _indicator_cache.popitem(last=False)
+
+    return value
+
+
+def clear_indicator_cache():
+    with _indicator_lock:
+        _indicator_cache.clear()
+        _indicator_stats.update(hits=0, misses=0)
+
+
+def indicator_cache_info():
+    """Nombre de hits / calculs effectifs et taille du cache."""
+    with _indicator_lock:
+        return dict(_indicator_stats, size=len(_indicator_cache))
+
+
+def get_returns(df: pd.DataFrame):
+    return _cached_indicator(df, "returns", (),
+                             lambda: df["Close"].pct_change().fillna(0))
+
+
+def get_sma(df: pd.DataFrame, window):
+    return _cached_indicator(df, "sma", (int(window),),
+                             lambda: df["Close"].rolling(int(window)).mean())
+
+
+def get_rolling_std(df: pd.DataFrame, window):
+    return _cached_indicator(df, "std", (int(window),),
+                             lambda: df["Close"].rolling(int(window)).std())
+
+
+def get_ema(df: pd.DataFrame, span):
+    return _cached_indicator(df, "ema", (int(span),),
+                             lambda: df["Close"].ewm(span=int(span), adjust=False).mean())
+
+
+def get_rsi(df: pd.DataFrame, window=14):
+    def compute():
+        delta = df["Close"].diff()
+        gain = delta.clip(lower=0)
+        loss = -delta.clip(upper=0)
+
+        avg_gain = gain.rolling(window).mean()
+        avg_loss = loss.rolling(window).mean()
+
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    return _cached_indicator(df, "rsi", (int(window),), compute)
+
+
+def get_macd(df: pd.DataFrame, fast=12, slow=26, signal=9):
+    """Retourne (MACD, ligne de signal)."""
+    def compute():
+        macd = get_ema(df, fast) - get_ema(df, slow)
+        return macd, macd.ewm(span=signal, adjust=False).mean()
+
+    return _cached_indicator(df, "macd", (int(fast), int(slow), int(signal)), compute)
+
+
+# -------------------------------------------------------------
+# RÉSULTAT COMPACT DES STRATÉGIES
+# -------------------------------------------------------------
+class StrategyResult:
+    """
+    Résultat d'une stratégie sans copie du DataFrame de prix :
+    - positions (et signaux) en int8, rendements et courbe equity en tableaux NumPy,
+    - colonnes d'origine lues dans le DataFrame source (référence, pas de copie),
+    - indicateurs calculés seulement à la première lecture (ex. par un graphique).
+
+    S'utilise en lecture comme l'ancien DataFrame : result["Strategy"],
+    result.columns, "SMA_short" in result.columns, result[["Date", "Close"]]...
+    to_frame() reconstruit le DataFrame complet pour l'affichage.
+    Le DataFrame source ne doit pas être modifié ensuite.
+    """
+
+    def __init__(self, source: pd.DataFrame, position, returns, equity,
+                 signal=None, indicators=None, dtype=np.float64):
+        self.source = source
+        self.position = np.asarray(position, dtype=np.int8)
+        self.signal = None if signal is None else np.asarray(signal, dtype=np.int8)
+        self.returns = np.asarray(returns, dtype=np.float64)
+        self.equity = np.asarray(equity, dtype=dtype)
+        self._indicators = dict(indicators or {})
+        self._computed = {}
+
+    @property
+    def index(self):
+        return self.source.index
+
+    @property
+    def columns(self):
+        names = list(self.source.columns) + list(self._indicators)
+        if self.signal is not None:
+            names.append("Signal")
+        return pd.Index(names + ["Position", "Returns", "Strategy"])
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __len__(self):
+        return len(self.position)
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __repr__(self):
+        return f"StrategyResult({len(self)} barres, colonnes={list(self.columns)})"
+
+    def indicator(self, name):
+        """Indicateur calculé à la demande (puis conservé)."""
+        if name not in self._computed:
+            self._computed[name] = np.asarray(self._indicators[name](), dtype=float)
+        return self._computed[name]
+
+    def _array(self, key):
+        if key == "Position":
+            return self.position
+        if key == "Returns":
+            return self.returns
+        if key == "Strategy":
+            return self.equity
+        if key == "Signal" and self.signal is not None:
+            return self.signal
+        if key in self._indicators:
+            return self.indicator(key)
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        if isinstance(key, (list, tuple, pd.Index)):
+            return self.to_frame(list(key))
+        if key in self.source.columns:
+            return self.source[key]
+        return pd.Series(self._array(key), index=self.index, name=key)
+
+    @timed
+    def to_frame(self, columns=None):
+        """DataFrame équivalent (toutes les colonnes par défaut)."""
+        columns = list(self.columns) if columns is None else list(columns)
+        return pd.DataFrame({c: self[c] for c in columns}, index=self.index)
+
+    def copy(self):
+        return StrategyResult(
+            self.source, self.position.copy(), self.returns.copy(), self.equity.copy(),
+            None if self.signal is None else self.signal.copy(), self._indicators, self.equity.dtype
+        )
+
+    @property
+    def turnover(self):
+        """Somme des variations absolues de position (allers-retours comptés deux fois)."""
+        return float(np.abs(np.diff(self.position, prepend=0).astype(float)).sum())
+
+    def nbytes(self):
+        """Mémoire des tableaux propres au résultat (hors prix source et indicateurs)."""
+        arrays = [self.position, self.equity] + ([self.signal] if self.signal is not None else [])
+        return sum(a.nbytes for a in arrays)
+
+
+def _sign(a, b):
+    """+1 si a > b, -1 si a < b, 0 sinon (NaN compris), en int8."""
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return ((a > b).astype(np.int8) - (a < b).astype(np.int8))
+
+
+def _strategy_result(df, signal, indicators, dtype, position=None, cost_bps=0.0):
+    """
+    Position = signal de la veille (sans look-ahead), equity = produit des (1 + r * position),
+    moins cost_bps points de base à chaque variation de position (signal_engine.backtest).
+    position : positions déjà détenues (sans décalage), à la place du signal.
+    """
+    returns = get_returns(df).to_numpy()
+    close = df["Close"].to_numpy(dtype=float)
+    if position is None:
+        result = backtest(close, signal, cost_bps=cost_bps)
+    else:
+        result = backtest(close, position, cost_bps=cost_bps, lag=0)
+    return StrategyResult(df, result["position"], returns, result["equity"], signal, indicators, dtype)
 
 
 # -------------------------------------------------------------
 # STRATÉGIE 1 : BUY & HOLD
 # -------------------------------------------------------------
-def strategy_buy_and_hold(df: pd.DataFrame):
+@timed
+def strategy_buy_and_hold(df: pd.DataFrame, dtype=np.float64, cost_bps=0.0):
     """
     Stratégie Buy & Hold :
     Toujours investi du début à la fin.
-    Retourne un DataFrame avec la position et le portefeuille.
+    Retourne un StrategyResult avec la position et le portefeuille.
     """
 
-    df = df.copy()
-    df["Position"] = 1   # toujours investi
-    df["Returns"] = df["Close"].pct_change().fillna(0)
-    df["Strategy"] = (1 + df["Returns"]).cumprod()
-    return df
+    position = np.ones(len(df), dtype=np.int8)   # toujours investi
+    return _strategy_result(df, None, {}, dtype, position=position, cost_bps=cost_bps)
 
 
 # -------------------------------------------------------------
 # STRATÉGIE 2 : MOMENTUM SMA — Simple Moving Average
 # -------------------------------------------------------------
-def strategy_sma(df: pd.DataFrame, short=20, long=50):
+@timed
+def strategy_sma(df: pd.DataFrame, short=20, long=50, dtype=np.float64, cost_bps=0.0):
     """
     Stratégie Momentum basée sur croisement de moyennes mobiles :
     - Achat lorsque SMA courte > SMA longue
     - Vente lorsque SMA courte < SMA longue
 
-    Retourne un DataFrame avec signaux, positions, performance.
+    Retourne un StrategyResult avec signaux, positions, performance.
     """
 
-    df = df.copy()
-
-    df["SMA_short"] = df["Close"].rolling(short).mean()
-    df["SMA_long"] = df["Close"].rolling(long).mean()
-
-    df["Signal"] = 0
-    # Correction : Utiliser .values pour garantir l'alignement
-    df.loc[df["SMA_short"].values > df["SMA_long"].values, "Signal"] = 1
-    df.loc[df["SMA_short"].values < df["SMA_long"].values, "Signal"] = -1
-
-    # Position = signal d'aujourd’hui (sans look-ahead bias)
-    df["Position"] = df["Signal"].shift(1).fillna(0)
-
-    df["Returns"] = df["Close"].pct_change().fillna(0)
-    df["Strategy"] = (1 + df["Returns"] * df["Position"]).cumprod()
+    signal = _sign(get_sma(df, short), get_sma(df, long))
 
-    return df
+    return _strategy_result(df, signal, {
+        "SMA_short": lambda: get_sma(df, short),
+        "SMA_long": lambda: get_sma(df, long),
+    }, dtype, cost_bps=cost_bps)
 
 
 # -------------------------------------------------------------
 # STRATÉGIE 3 : RSI Momentum - Relative Strength Index
 # -------------------------------------------------------------
 def compute_rsi(df: pd.DataFrame, window=14):
-    delta = df["Close"].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
+    """Copie de df avec une colonne RSI (df n'est pas modifié ; RSI seul : get_rsi)."""
+    return df.assign(RSI=get_rsi(df, window))
 
-    avg_gain = gain.rolling(window).mean()
-    avg_loss = loss.rolling(window).mean()
 
-    rs = avg_gain / avg_loss
-    df["RSI"] = 100 - (100 / (1 + rs))
+@timed
+def strategy_rsi(df: pd.DataFrame, window=14, dtype=np.float64, hold=False, exit_level=50, cost_bps=0.0):
+    """
+    hold=False : signal seulement dans les zones RSI < 30 (achat) / RSI > 70 (vente).
+    hold=True : la position est tenue jusqu'au retour du RSI à exit_level.
+    """
+    rsi = get_rsi(df, window).to_numpy()
+
+    if hold:
+        signal = hold_positions(rsi < 30, rsi >= exit_level, rsi > 70, rsi <= exit_level)
+    else:
+        signal = np.zeros(len(df), dtype=np.int8)
+        signal[rsi < 30] = 1      # Achat
+        signal[rsi > 70] = -1     # Vente
+
+    return _strategy_result(df, signal, {"RSI": lambda: get_rsi(df, window)}, dtype, cost_bps=cost_bps)
 
-    return df
 
+# -------------------------------------------------------------
+# STRATÉGIE 4 :  MACD - Moving Average Convergence Divergence
+# -------------------------------------------------------------
+@timed
+def strategy_macd(df: pd.DataFrame, dtype=np.float64, cost_bps=0.0):
+    macd, signal_line = get_macd(df, 12, 26, 9)
+
+    # Position = signe de MACD - ligne de signal, décalé d'une barre
+    # (ici la colonne "Signal" est la ligne de signal du MACD)
+    target = _sign(macd, signal_line)
+    position = np.r_[np.int8(0), target[:-1]].astype(np.int8)
 
-def strategy_rsi(df: pd.DataFrame, window=14):
-    df = df.copy()
-    df = compute_rsi(df, window)
+    return _strategy_result(df, None, {
+        "EMA12": lambda: get_ema(df, 12),
+        "EMA26": lambda: get_ema(df, 26),
+        "MACD": lambda: get_macd(df, 12, 26, 9)[0],
+        "Signal": lambda: get_macd(df, 12, 26, 9)[1],
+    }, dtype, position=position, cost_bps=cost_bps)
 
-    df["Signal"] = 0
-    # Correction : Utiliser .values pour garantir l'alignement
-    df.loc[df["RSI"].values < 30, "Signal"] = 1      # Achat
-    df.loc[df["RSI"].values > 70, "Signal"] = -1     # Vente
 
-    df["Position"] = df["Signal"].shift(1).fillna(0)
-    df["Returns"] = df["Close"].pct_change().fillna(0)
+# -------------------------------------------------------------
+# STRATÉGIE 5 :  Bollinger Bands - Reversion to Mean
+# -------------------------------------------------------------
+@timed
+def strategy_bollinger(df: pd.DataFrame, window=20, num_std=2, dtype=np.float64, hold=False, cost_bps=0.0):
+    """
+    hold=False : signal seulement hors des bandes (sous la basse : achat, au-dessus de la haute : vente).
+    hold=True : la position est tenue jusqu'au retour du prix à la moyenne mobile.
+    """
+    ma = get_sma(df, window).to_numpy()
+    std = get_rolling_std(df, window).to_numpy()
+    close = df["Close"].to_numpy(dtype=float)
 
-    df["Strategy"] = (1 + df["Returns"] * df["Position"]).cumprod()
+    if hold:
+        signal = hold_positions(close < ma - num_std * std, close >= ma,
+                                close > ma + num_std * std, close <= ma)
+    else:
+        signal = np.zeros(len(df), dtype=np.int8)
+        signal[close < ma - num_std * std] = 1   # Achat
+        signal[close > ma + num_std * std] = -1  # Vente
 
-    return df
+    return _strategy_result(df, signal, {
+        "MA": lambda: get_sma(df, window),
+        "STD": lambda: get_rolling_std(df, window),
+        "Upper": lambda: get_sma(df, window) + num_std * get_rolling_std(df, window),
+        "Lower": lambda: get_sma(df, window) - num_std * get_rolling_std(df, window),
+    }, dtype, cost_bps=cost_bps)
 
 
 # -------------------------------------------------------------
-# STRATÉGIE 4 :  MACD - Moving Average Convergence Divergence
+# STRATÉGIE 6 :  Golden Cross / Death Cross
 # -------------------------------------------------------------
-def strategy_macd(df: pd.DataFrame):
-    df = df.copy()
+@timed
+def strategy_golden_cross(df: pd.DataFrame, dtype=np.float64, cost_bps=0.0):
+    signal = _sign(get_sma(df, 50), get_sma(df, 200))
+
+    return _strategy_result(df, signal, {
+        "SMA50": lambda: get_sma(df, 50),
+        "SMA200": lambda: get_sma(df, 200),
+    }, dtype, cost_bps=cost_bps)
 
-    df["EMA12"] = df["Close"].ewm(span=12, adjust=False).mean()
-    df["EMA26"] = df["Close"].ewm(span=26, adjust=False).mean()
 
-    df["MACD"] = df["EMA12"] - df["EMA26"]
-    df["Signal"] = df["MACD"].ewm(span=9, adjust=False).mean()
+# -------------------------------------------------------------
+# MÉTRIQUES QUANTITATIVES
+# -------------------------------------------------------------
+def _returns_stats(returns: np.ndarray, periods_per_year=252):
+    """
+    Statistiques annualisées colonne par colonne d'une matrice de rendements
+    (n_barres x n_séries). Les NaN sont ignorés, comme pandas.dropna().
+    Retourne (sharpe, vol, sortino) : trois vecteurs.
+    """
+    valid = ~np.isnan(returns)
+    ann = np.sqrt(periods_per_year)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if valid.all():
+            # Cas courant sans NaN : pas de masques à appliquer
+            count = np.full(returns.shape[1], returns.shape[0])
+            mean = returns.sum(axis=0) / count
+            dev = returns - mean
+        else:
+            count = valid.sum(axis=0)
+            r = np.where(valid, returns, 0.0)
+            mean = r.sum(axis=0) / count
+            dev = np.where(valid, returns - mean, 0.0)
+        std = np.sqrt(np.einsum("ij,ij->j", dev, dev) / (count - 1))
+        std[count < 2] = np.nan
+
+        sharpe = np.where(std > 0, mean / std * ann, 0.0)
+        vol = std * ann
+
+        # Sortino : uniquement la volatilité des rendements négatifs
+        neg = returns < 0
+        n_neg = neg.sum(axis=0)
+        neg_r = np.where(neg, returns, 0.0)
+        neg_mean = neg_r.sum(axis=0) / n_neg
+        # Somme des carrés des écarts sur les seuls rendements négatifs
+        neg_ss = np.einsum("ij,ij->j", neg_r, neg_r) - n_neg * neg_mean * neg_mean
+        downside_std = np.sqrt(np.clip(neg_ss, 0, None) / (n_neg - 1))
+        downside_std[n_neg < 2] = np.nan
+        sortino = np.where(downside_std > 0, mean / downside_std * ann, 0.0)
+
+    return sharpe, vol, sortino
+
+
+@timed
+def compute_metrics_matrix(equity, periods_per_year=252):
+    """
+    Version vectorisée de compute_metrics : une passe pour toutes les courbes.
+    equity : matrice (n_barres x n_courbes) ou DataFrame (une courbe par colonne).
+    Retourne un dict de vecteurs (ou un DataFrame indexé par les colonnes) :
+    Sharpe Ratio, Volatility (ann.), Max Drawdown, Sortino, Total Return.
+    """
+    labels = equity.columns if isinstance(equity, pd.DataFrame) else None
+    eq = np.asarray(equity, dtype=float)
+    if eq.ndim == 1:
+        eq = eq[:, None]
+    n, k = eq.shape
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = eq[1:] / eq[:-1] - 1
+    sharpe, vol, sortino = _returns_stats(returns, periods_per_year)
+
+    # Max drawdown (les NaN ne cassent pas le plus-haut courant)
+    cum_max = np.fmax.accumulate(eq, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = (eq - cum_max) / cum_max
+    max_dd = np.where(np.isnan(drawdown), np.inf, drawdown).min(axis=0) if n else np.full(k, np.inf)
+    max_dd[np.isinf(max_dd)] = np.nan
+
+    # Performance totale : dernière valeur valide / première valeur valide
+    valid = ~np.isnan(eq)
+    first = valid.argmax(axis=0)
+    last = n - 1 - valid[::-1].argmax(axis=0) if n else first
+    cols = np.arange(k)
+    total = eq[last, cols] / eq[first, cols] - 1 if n else np.full(k, np.nan)
+
+    # Aucune variation exploitable : métriques nulles (comme compute_metrics)
+    empty = (~np.isnan(returns)).sum(axis=0) == 0 if n > 1 else np.ones(k, dtype=bool)
+    for arr in (sharpe, vol, max_dd, sortino):
+        arr[empty] = 0.0
+
+    metrics = {
+        "Sharpe Ratio": sharpe,
+        "Volatility (ann.)": vol,
+        "Max Drawdown": max_dd,
+        "Sortino": sortino,
+        "Total Return": total,
+    }
 
-    df["Position"] = 0
-    # Correction : Utiliser .values pour garantir l'alignement
-    df.loc[df["MACD"].values > df["Signal"].values, "Position"] = 1
-    df.loc[df["MACD"].values < df["Signal"].values, "Position"] = -1
+    if labels is not None:
+        return pd.DataFrame(metrics, index=labels)
+    return metrics
 
-    # Le shift est appliqué à la Position, pas au Signal
-    df["Position"] = df["Position"].shift(1).fillna(0)
-    df["Returns"] = df["Close"].pct_change().fillna(0)
 
-    df["Strategy"] = (1 + df["Returns"] * df["Position"]).cumprod()
+@timed
+def compute_metrics(df: pd.DataFrame, column="Strategy", periods_per_year=252):
+    """
+    Calcule les métriques de performance :
+    - Sharpe Ratio (annualisé, 252 périodes par défaut)
+    - Max Drawdown
+    - Volatilité annualisée
+    - Sortino Ratio
+    """
+    m = compute_metrics_matrix(df[column].to_numpy(dtype=float), periods_per_year)
 
-    return df
+    return {
+        "Sharpe Ratio": round(float(m["Sharpe Ratio"][0]), 3),
+        "Volatility (ann.)": round(float(m["Volatility (ann.)"][0]), 3),
+        "Max Drawdown": round(float(m["Max Drawdown"][0]), 3),
+        "Sortino": round(float(m["Sortino"][0]), 3),
+    }
 
 
 # -------------------------------------------------------------
-# STRATÉGIE 5 :  Bollinger Bands - Reversion to Mean
+# STRATÉGIES EN FLUX (mise à jour barre par barre, état O(1))
 # -------------------------------------------------------------
-def strategy_bollinger(df: pd.DataFrame, window=20, num_std=2):
-    df = df.copy()
+class _RollingWindow:
+    """
+    Fenêtre glissante à buffer circulaire avec sommes courantes.
+    Les valeurs sont centrées sur la première reçue (moins d'erreurs d'arrondi)
+    et les sommes sont recalculées à chaque tour complet du buffer.
+    """
 
-    df["MA"] = df["Close"].rolling(window).mean()
-    df["STD"] = df["Close"].rolling(window).std()
+    def __init__(self, size, offset=None):
+        self.size = int(size)
+        self.buffer = np.zeros(self.size)
+        self.count = 0
+        self.pos = 0
+        self.offset = offset
+        self.s1 = 0.0
+        self.s2 = 0.0
+        self.nonzero = 0
+
+    def push(self, x):
+        if self.offset is None:
+            self.offset = x
+        x = x - self.offset
+
+        old = self.buffer[self.pos]
+        if self.count == self.size:
+            self.s1 -= old
+            self.s2 -= old * old
+            self.nonzero -= old != 0
+        else:
+            self.count += 1
+
+        self.buffer[self.pos] = x
+        self.s1 += x
+        self.s2 += x * x
+        self.nonzero += x != 0
+        self.pos = (self.pos + 1) % self.size
+
+        if self.pos == 0:
+            self.s1 = self.buffer.sum()
+            self.s2 = (self.buffer * self.buffer).sum()
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+    def mean(self):
+        if not self.full:
+            return np.nan
+        if self.nonzero == 0:
+            return self.offset
+        return self.s1 / self.size + self.offset
+
+    def std(self):
+        if not self.full or self.size < 2:
+            return np.nan
+        var = (self.s2 - self.s1 * self.s1 / self.size) / (self.size - 1)
+        return np.sqrt(max(var, 0.0))
+
+
+class _StreamingEMA:
+    """EMA récursive (équivalent de ewm(span, adjust=False))."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class StreamingStrategy:
+    """
+    Base des stratégies en flux : chaque nouvelle clôture met à jour en O(1)
+    les indicateurs, la position, la courbe equity (base 1) et les métriques.
+    Mêmes conventions que les strategy_* : position = signal de la barre précédente.
+    """
 
-    df["Upper"] = df["MA"] + num_std * df["STD"]
-    df["Lower"] = df["MA"] - num_std * df["STD"]
+    def __init__(self):
+        self.n_bars = 0
+        self.last_close = None
+        self.last_date = None
+        self.signal = 0
+        self.position = 0
+        self.equity = 1.0
+
+        # Statistiques des rendements de la stratégie (Welford)
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._n_neg = 0
+        self._neg_mean = 0.0
+        self._neg_m2 = 0.0
+        self._peak = None
+        self._max_dd = 0.0
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, **params):
+        """Initialise l'état en rejouant un historique (colonnes Date + Close)."""
+        strat = cls(**params)
+        strat.sync(df)
+        return strat
+
+    def sync(self, df: pd.DataFrame):
+        """
+        Intègre uniquement les barres postérieures à la dernière vue
+        (rafraîchissement live : seule la nouvelle barre est traitée).
+        """
+        if self.last_date is not None:
+            df = df[df["Date"] > self.last_date]
+        if df.empty:
+            return None
+
+        for close in df["Close"].to_numpy(dtype=float):
+            state = self.update(close)
+        self.last_date = df["Date"].iloc[-1]
+        return state
+
+    def _next_signal(self, close):
+        raise NotImplementedError
+
+    def update(self, close):
+        """Intègre une nouvelle barre et retourne l'état courant."""
+        close = float(close)
+        ret = 0.0 if self.last_close is None else close / self.last_close - 1
+
+        self.position = self.signal
+        previous = self.equity
+        self.equity *= 1 + ret * self.position
+
+        if self.n_bars > 0:
+            self._update_stats(self.equity / previous - 1)
+        self._peak = self.equity if self._peak is None else max(self._peak, self.equity)
+        self._max_dd = min(self._max_dd, (self.equity - self._peak) / self._peak)
+
+        self.signal = self._next_signal(close)
+        self.last_close = close
+        self.n_bars += 1
 
-    df["Signal"] = 0
-    # Correction (Cause de l'erreur) : Utiliser .values pour garantir l'alignement
-    df.loc[df["Close"].values < df["Lower"].values, "Signal"] = 1   # Achat
-    df.loc[df["Close"].values > df["Upper"].values, "Signal"] = -1  # Vente
+        return {
+            "Close": close,
+            "Signal": self.signal,
+            "Position": self.position,
+            "Returns": ret,
+            "Strategy": self.equity,
+        }
 
-    df["Position"] = df["Signal"].shift(1).fillna(0)
+    def update_many(self, closes):
+        """Intègre plusieurs barres, retourne la courbe equity correspondante."""
+        return np.array([self.update(c)["Strategy"] for c in closes])
 
-    df["Returns"] = df["Close"].pct_change().fillna(0)
-    df["Strategy"] = (1 + df["Returns"] * df["Position"]).cumprod()
+    def _update_stats(self, r):
+        self._n += 1
+        delta = r - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (r - self._mean)
 
-    return df
+        if r < 0:
+            self._n_neg += 1
+            delta = r - self._neg_mean
+            self._neg_mean += delta / self._n_neg
+            self._neg_m2 += delta * (r - self._neg_mean)
 
+    def metrics(self, periods_per_year=252):
+        """Mêmes métriques que compute_metrics, sans relire l'historique."""
+        if self._n == 0:
+            return {"Sharpe Ratio": 0.0, "Volatility (ann.)": 0.0, "Max Drawdown": 0.0, "Sortino": 0.0}
 
-# -------------------------------------------------------------
-# STRATÉGIE 6 :  Golden Cross / Death Cross
-# -------------------------------------------------------------
-def strategy_golden_cross(df: pd.DataFrame):
-    df = df.copy()
+        ann = np.sqrt(periods_per_year)
+        std = np.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else np.nan
+        downside_std = np.sqrt(self._neg_m2 / (self._n_neg - 1)) if self._n_neg > 1 else np.nan
+
+        sharpe = self._mean / std * ann if std > 0 else 0.0
+        sortino = self._mean / downside_std * ann if downside_std > 0 else 0.0
+
+        return {
+            "Sharpe Ratio": round(float(sharpe), 3),
+            "Volatility (ann.)": round(float(std * ann), 3),
+            "Max Drawdown": round(float(self._max_dd), 3),
+            "Sortino": round(float(sortino), 3),
+        }
+
+
+def _cross_signal(fast, slow):
+    if fast > slow:
+        return 1
+    if fast < slow:
+        return -1
+    return 0
+
+
+class StreamingSMA(StreamingStrategy):
+    """Équivalent en flux de strategy_sma."""
+
+    def __init__(self, short=20, long=50):
+        super().__init__()
+        self.sma_short = _RollingWindow(short)
+        self.sma_long = _RollingWindow(long)
+
+    def _next_signal(self, close):
+        self.sma_short.push(close)
+        self.sma_long.push(close)
+        return _cross_signal(self.sma_short.mean(), self.sma_long.mean())
+
+
+class StreamingGoldenCross(StreamingSMA):
+    """Équivalent en flux de strategy_golden_cross (SMA50 / SMA200)."""
+
+    def __init__(self):
+        super().__init__(short=50, long=200)
+
+
+class StreamingRSI(StreamingStrategy):
+    """Équivalent en flux de strategy_rsi."""
+
+    def __init__(self, window=14):
+        super().__init__()
+        self.gains = _RollingWindow(window, offset=0.0)
+        self.losses = _RollingWindow(window, offset=0.0)
+
+    def _next_signal(self, close):
+        if self.last_close is None:
+            return 0
+
+        delta = close - self.last_close
+        self.gains.push(max(delta, 0.0))
+        self.losses.push(max(-delta, 0.0))
+
+        avg_gain, avg_loss = self.gains.mean(), self.losses.mean()
+        if np.isnan(avg_gain) or (avg_gain == 0 and avg_loss == 0):
+            return 0
+        rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+        if rsi < 30:
+            return 1
+        if rsi > 70:
+            return -1
+        return 0
 
-    df["SMA50"] = df["Close"].rolling(50).mean()
-    df["SMA200"] = df["Close"].rolling(200).mean()
 
-    df["Signal"] = 0
-    # Correction : Utiliser .values pour garantir l'alignement
-    df.loc[df["SMA50"].values > df["SMA200"].values, "Signal"] = 1
-    df.loc[df["SMA50"].values < df["SMA200"].values, "Signal"] = -1
+class StreamingMACD(StreamingStrategy):
+    """Équivalent en flux de strategy_macd (12, 26, 9)."""
 
-    df["Position"] = df["Signal"].shift(1).fillna(0)
-    df["Returns"] = df["Close"].pct_change().fillna(0)
+    def __init__(self, fast=12, slow=26, signal=9):
+        super().__init__()
+        self.ema_fast = _StreamingEMA(fast)
+        self.ema_slow = _StreamingEMA(slow)
+        self.ema_signal = _StreamingEMA(signal)
 
-    df["Strategy"] = (1 + df["Returns"] * df["Position"]).cumprod()
+    def _next_signal(self, close):
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        return _cross_signal(macd, self.ema_signal.update(macd))
 
-    return df
+
+class StreamingBollinger(StreamingStrategy):
+    """Équivalent en flux de strategy_bollinger."""
+
+    def __init__(self, window=20, num_std=2):
+        super().__init__()
+        self.window = _RollingWindow(window)
+        self.num_std = num_std
+
+    def _next_signal(self, close):
+        self.window.push(close)
+        ma, std = self.window.mean(), self.window.std()
+
+        if close < ma - self.num_std * std:
+            return 1
+        if close > ma + self.num_std * std:
+            return -1
+        return 0
+
+
+def _days(dates):
+    """Dates -> colonne de temps en jours (régression linéaire)."""
+    ns = pd.DatetimeIndex(dates).as_unit("ns").asi8
+    return (ns / 86_400e9).reshape(-1, 1)
 
 
 # -------------------------------------------------------------
-# MÉTRIQUES QUANTITATIVES
+# PRÉVISION DIRECTE MULTI-HORIZON (RANDOM FOREST)
 # -------------------------------------------------------------
-def compute_metrics(df: pd.DataFrame, column="Strategy"):
+def _rf_direct_dataset(close, horizon):
     """
-    Calcule les métriques de performance :
-    - Sharpe Ratio (252 jours)
-    - Max Drawdown
-    - Volatilité annualisée
-    - Sortino Ratio
+    Jeu d'entraînement du mode direct : caractéristiques relatives connues en t
+    (deux derniers log-rendements, écart à la MA5) et cibles log(C[t+h] / C[t])
+    pour h = 1..horizon. Retourne (X, Y, x_last) ; x_last = caractéristiques
+    de la dernière barre.
     """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    log_close = np.log(close)
+    csum = np.r_[0.0, np.cumsum(close)]
 
-    # Rendements journaliers de la stratégie
-    returns = df[column].pct_change().dropna()
-
-    if returns.empty:
-        return {
-            "Sharpe Ratio": 0.0,
-            "Volatility (ann.)": 0.0,
-            "Max Drawdown": 0.0,
-            "Sortino": 0.0,
-        }
-
-    # Volatilité / Sharpe
-    std = returns.std()
-    if std > 0:
-        sharpe = (returns.mean() / std) * np.sqrt(252)
-    else:
-        sharpe = 0.0
-    vol = std * np.sqrt(252)
-
-    # Sortino : uniquement la volatilité des rendements négatifs
-    downside = returns[returns < 0]
-    downside_std = downside.std()
-    if downside_std > 0:
-        sortino = (returns.mean() / downside_std) * np.sqrt(252)
-    else:
-        sortino = 0.0
-
-    # Max drawdown
-    cum_max = df[column].cummax()
-    drawdown = (df[column] - cum_max) / cum_max
-    max_dd = drawdown.min()
+    t = np.arange(4, n)
+    ma5 = (csum[t + 1] - csum[t - 4]) / 5
+    features = np.column_stack([
+        log_close[t] - log_close[t - 1],
+        log_close[t - 1] - log_close[t - 2],
+        log_close[t] - np.log(ma5),
+    ])
 
-    return {
-        "Sharpe Ratio": round(sharpe, 3),
-        "Volatility (ann.)": round(vol, 3),
-        "Max Drawdown": round(max_dd, 3),
-        "Sortino": round(sortino, 3),
-    }
+    n_train = max(len(t) - horizon, 0)
+    steps = np.arange(1, horizon + 1)
+    rows = t[:n_train]
+    Y = log_close[rows[:, None] + steps[None, :]] - log_close[rows][:, None]
 
+    return features[:n_train], Y, features[-1:]
 
 
 class SingleAssetAnalyzer:
-    def __init__(self, ticker, start_date, end_date, initial_investment=1000):
+    def __init__(self, ticker, start_date, end_date, initial_investment=1000, interval="1d"):
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date
         self.initial_investment = initial_investment
+        # Fréquence des barres : annualisation des métriques et pas des prévisions
+        self.interval = interval
+        self.periods_per_year = periods_per_year(interval)
         self.data = pd.DataFrame()
         self.daily_returns = pd.Series(dtype=float)
         self.best_params = {}
 
+    @timed
     def load_data(self):
         """Télécharge les données."""
         try:
-            df = yf.download(self.ticker, start=self.start_date, end=self.end_date, progress=False)
+            import yfinance as yf  # import différé : inutile quand les données viennent de load_frame
+
+            df = yf.download(self.ticker, start=self.start_date, end=self.end_date,
+                             interval=self.interval, progress=False)
             if isinstance(df.columns, pd.MultiIndex):
                 df = df.xs('Close', axis=1, level=0, drop_level=False)
                 df.columns = ['Close']
@@ -248,9 +824,27 @@ class SingleAssetAnalyzer:
             # On ne met pas st.error ici, on le gère dans app.py
             return False
 
+    @timed
+    def load_frame(self, df: pd.DataFrame):
+        """Utilise des données déjà chargées (colonnes Date + Close) au lieu de yfinance."""
+        data = df.set_index('Date')[['Close']] if 'Date' in df.columns else df[['Close']]
+        if data.empty:
+            return False
+
+        self.data = data
+        self.daily_returns = self.data['Close'].pct_change().fillna(0)
+        return True
+
     
+    @timed
     def run_strategy(self, strat_name, **params):
-        """Exécute une stratégie spécifique avec des paramètres donnés."""
+        """
+        Exécute une stratégie spécifique avec des paramètres donnés.
+        Mean Reversion (BB) : hold=True tient la position jusqu'au retour à la moyenne.
+        cost_bps : coût de transaction par variation de position (points de base).
+        stop_loss / take_profit : sortie (fraction du prix d'entrée, 0.05 = 5 %),
+        à plat ensuite jusqu'au prochain changement de signal.
+        """
         signals = pd.Series(0, index=self.data.index)
 
         # --- LOGIQUE DES STRATÉGIES ---
@@ -272,70 +866,196 @@ class SingleAssetAnalyzer:
             sma = self.data['Close'].rolling(window=window).mean()
             std = self.data['Close'].rolling(window=window).std()
             lower_band = sma - (std * std_dev)
-            signals = np.where(self.data['Close'] < lower_band, 1.0, 0.0)
-
-        # Backtest
-        signals = pd.Series(signals, index=self.data.index)
-        strat_returns = self.daily_returns.shift(-1) * signals.shift(1).fillna(0)
+            if params.get('hold', False):
+                signals = hold_positions(self.data['Close'] < lower_band, self.data['Close'] >= sma).astype(float)
+            else:
+                signals = np.where(self.data['Close'] < lower_band, 1.0, 0.0)
+
+        # Backtest (signal_engine). Convention historique de l'analyseur : le rendement
+        # de la barre t est celui de t -> t+1, pour la position du signal de t-1
+        # (d'où lag=2 puis un décalage d'une barre ; dernière barre NaN)
+        close = self.data['Close'].to_numpy(dtype=float)
+        signals = apply_stops(close, np.nan_to_num(np.asarray(signals, dtype=float)).astype(np.int8),
+                              params.get('stop_loss'), params.get('take_profit'))
+        result = backtest(close, signals, cost_bps=float(params.get('cost_bps', 0.0)), lag=2)
+        strat_returns = pd.Series(result["returns"], index=self.data.index).shift(-1)
         strat_curve = (1 + strat_returns).cumprod() * self.initial_investment
         strat_curve = strat_curve.ffill()
 
         return strat_curve, strat_returns
 
-    def find_best_params(self):
-        """Teste plein de combinaisons et stocke les gagnantes."""
+    def compute_metrics(self, returns, periods_per_year=None):
+        """Métriques d'une série de rendements de stratégie (Raw_Sharpe non arrondi)."""
+        periods_per_year = periods_per_year or self.periods_per_year
+        returns = np.asarray(returns, dtype=float).reshape(-1, 1)
+        sharpe, vol, sortino = (float(x[0]) for x in _returns_stats(returns, periods_per_year))
+        return {
+            'Raw_Sharpe': sharpe,
+            'Sharpe Ratio': round(sharpe, 3),
+            'Volatility (ann.)': round(vol, 3),
+            'Sortino': round(sortino, 3),
+        }
+
+    @timed
+    def find_best_params(self,
+                         momentum_windows=range(10, 100, 10),
+                         cross_short=range(10, 50, 10),
+                         cross_long=range(50, 150, 20),
+                         bb_windows=range(10, 50, 10),
+                         bb_std_devs=(1.5, 2.0, 2.5),
+                         bb_hold=False):
+        """
+        Teste toutes les combinaisons des grilles et stocke les gagnantes.
+        Le balayage est vectorisé (modules/sweep.py) : toutes les fenêtres sont
+        calculées d'un coup à partir des mêmes sommes cumulées.
+        """
+        close = self.data['Close'].to_numpy(dtype=float)
+        rets = self.daily_returns.to_numpy(dtype=float)
+        sums = PriceSums(close)
 
         # 1. Optimisation Momentum
-        best_sharpe = -999
-        best_p = {'window': 50}
-        for w in range(10, 100, 10):
-            _, rets = self.run_strategy("Momentum", window=w)
-            m = self.compute_metrics(rets)
-            if m['Raw_Sharpe'] > best_sharpe:
-                best_sharpe = m['Raw_Sharpe']
-                best_p = {'window': w}
-        self.best_params['Momentum'] = best_p
+        windows, sharpe = sweep_momentum(sums, rets, momentum_windows)
+        best = int(np.argmax(sharpe))
+        self.best_params['Momentum'] = {'window': int(windows[best])}
 
         # 2. Optimisation Cross MMS
-        best_sharpe = -999
-        best_p = {'short_w': 20, 'long_w': 50}
-        for s, l in itertools.product(range(10, 50, 10), range(50, 150, 20)):
-            if s >= l:
-                continue
-            _, rets = self.run_strategy("Cross MMS", short_w=s, long_w=l)
-            m = self.compute_metrics(rets)
-            if m['Raw_Sharpe'] > best_sharpe:
-                best_sharpe = m['Raw_Sharpe']
-                best_p = {'short_w': s, 'long_w': l}
-        self.best_params['Cross MMS'] = best_p
+        pairs, sharpe = sweep_cross(sums, rets, cross_short, cross_long)
+        if len(pairs):
+            best = int(np.argmax(sharpe))
+            self.best_params['Cross MMS'] = {'short_w': int(pairs[best, 0]), 'long_w': int(pairs[best, 1])}
+        else:
+            self.best_params['Cross MMS'] = {'short_w': 20, 'long_w': 50}
 
         # 3. Optimisation BB
-        best_sharpe = -999
-        best_p = {'window': 20, 'std_dev': 2.0}
-        for w, std in itertools.product(range(10, 50, 10), [1.5, 2.0, 2.5]):
-            _, rets = self.run_strategy("Mean Reversion (BB)", window=w, std_dev=std)
-            m = self.compute_metrics(rets)
-            if m['Raw_Sharpe'] > best_sharpe:
-                best_sharpe = m['Raw_Sharpe']
-                best_p = {'window': w, 'std_dev': std}
-        self.best_params['Mean Reversion (BB)'] = best_p
-
-    def predict_future(self, days_ahead=30, model_type="Linear Regression"):
-        """Génère des prédictions selon le modèle choisi."""
+        combos, sharpe = sweep_bollinger(sums, rets, bb_windows, bb_std_devs, hold=bb_hold)
+        best = int(np.argmax(sharpe))
+        self.best_params['Mean Reversion (BB)'] = {'window': int(combos[best, 0]), 'std_dev': float(combos[best, 1])}
+        if bb_hold:
+            self.best_params['Mean Reversion (BB)']['hold'] = True
+
+    @timed
+    def optimize(self, strat_name, budget=60, space=None, hold=False, seed=0):
+        """
+        Recherche adaptative des paramètres (modules/sweep.adaptive_search) sur un
+        espace bien plus large que les grilles de find_best_params (par défaut les
+        bornes des entrées de l'app), pour un budget d'évaluations fixé.
+        Stocke les gagnants dans best_params.
+        Retourne (paramètres, sharpe annualisé, rapport par palier).
+        """
+        params, sharpe, report = adaptive_search(
+            PriceSums(self.data['Close'].to_numpy(dtype=float)),
+            self.daily_returns.to_numpy(dtype=float),
+            strat_name, space=space, budget=budget, seed=seed,
+            hold=hold and strat_name == "Mean Reversion (BB)", periods_per_year=self.periods_per_year,
+        )
+        self.best_params[strat_name] = params
+        return params, sharpe, report
+
+    @timed
+    def walk_forward(self, strat_name, train_size=756, test_size=126, anchored=False,
+                     grid=None, max_workers=None):
+        """
+        Optimisation walk-forward (folds glissants ou ancrés) : les paramètres de chaque
+        fold sont choisis sur son train puis appliqués sur le test suivant.
+        Retourne (courbe hors échantillon recollée, DataFrame des folds).
+        """
+        oos, rows, report = walk_forward(
+            self.data['Close'].to_numpy(dtype=float),
+            self.daily_returns.to_numpy(dtype=float),
+            strat_name, grid=grid, train_size=train_size, test_size=test_size,
+            anchored=anchored, max_workers=max_workers, periods_per_year=self.periods_per_year,
+        )
+
+        dates = self.data.index[rows]
+        curve = pd.Series((1 + oos).cumprod() * self.initial_investment, index=dates)
+
+        folds = pd.DataFrame([{
+            "Début test": self.data.index[f["test"][0]],
+            "Fin test": self.data.index[f["test"][1] - 1],
+            "Paramètres": f["params"],
+            "Sharpe (train)": round(f["in_sample_sharpe"], 3),
+            "Sharpe (test)": round(f["out_of_sample_sharpe"], 3),
+        } for f in report])
+
+        return curve, folds
+
+    # --- Prévisions : ajustement (mis en cache) puis projection ---
+    # Barres ajoutées tolérées avant un ajustement complet (mise à jour incrémentale sinon)
+    REFIT_EVERY = {"ARIMA": 250, "Machine Learning (RF)": 20}
+    ARIMA_ORDER = (5, 1, 0)
+    RF_PARAMS = {"n_estimators": 100, "random_state": 42}
+    RF_MIN_ROWS = 50  # lignes d'entraînement minimales du mode direct
+    # Horizon de la forêt directe : ajustée une fois jusqu'à cet horizon, puis découpée
+    # selon la demande (changer d'horizon ne réajuste pas)
+    RF_MAX_HORIZON = 120
+
+    def _fitted_model(self, model_type, params, fit, update=None, use_cache=True, usable=None):
+        """
+        Modèle ajusté sur self.data['Close'], via le cache de modèles :
+        - mêmes données : modèle réutilisé tel quel ;
+        - données prolongées (même première barre) : mise à jour incrémentale (update)
+          tant que moins de REFIT_EVERY[model_type] barres se sont ajoutées depuis le
+          dernier ajustement complet ;
+        - sinon (fenêtre plus courte, début avancé...) : ajustement complet.
+        usable(state) : le modèle en cache convient-il à la demande ? (sinon réajustement)
+        """
+        close = self.data['Close'].to_numpy(dtype=float)
+        if not use_cache:
+            return fit(close)
+
+        cache = get_model_cache()
+        dates = self.data.index
+        family = (self.ticker, self.interval, model_type, tuple(sorted(params.items())))
+        entry, n_new = cache.lookup(family, close, dates)
+        if entry is not None and usable is not None and not usable(entry["state"]):
+            entry = None
+
+        if entry is not None and n_new == 0:
+            return entry["state"]
+
+        refit_every = self.REFIT_EVERY.get(model_type, 0)
+        if entry is not None and update is not None and entry["since_fit"] + n_new < refit_every:
+            state = update(entry["state"], close, n_new)
+            cache.store(family, close, state, since_fit=entry["since_fit"] + n_new, dates=dates)
+            return state
+
+        state = fit(close)
+        cache.store(family, close, state, dates=dates)
+        return state
+
+    def _future_dates(self, n_bars):
+        """Dates des n_bars prochaines barres (pas de l'intervalle des données)."""
+        step = bar_step(self.interval)
+        last_date = self.data.index[-1]
+        return [last_date + step * i for i in range(1, n_bars + 1)]
+
+    @timed
+    def predict_future(self, days_ahead=30, model_type="Linear Regression", use_cache=True, rf_mode="direct"):
+        """
+        Génère des prédictions selon le modèle choisi.
+        use_cache : réutilise / met à jour le modèle déjà ajusté sur ces données (modules/model_cache).
+        rf_mode : "direct" (une forêt multi-sorties, tout l'horizon en une prédiction,
+                  écart-type des résidus par horizon) ou "recursive" (une étape à la fois).
+        days_ahead est un nombre de barres de l'intervalle de l'analyseur.
+
+        Retourne (dates futures, prévisions, std_dev) ; std_dev est toujours un tableau
+        de days_ahead écarts-types en prix, un par horizon : constant pour la régression
+        linéaire, ARIMA et la forêt récursive, croissant avec l'horizon pour la forêt directe.
+        """
         df = self.data.copy()
-        last_date = df.index[-1]
-        future_dates = [last_date + timedelta(days=i) for i in range(1, days_ahead + 1)]
+        future_dates = self._future_dates(days_ahead)
 
         # --- MODÈLE 1 : RÉGRESSION LINÉAIRE (CORRIGÉ) ---
         if model_type == "Linear Regression":
-            df = df.reset_index()
-            df['Date_Ordinal'] = df['Date'].map(pd.Timestamp.toordinal)
-            X = df[['Date_Ordinal']].values
+            # Temps en jours (fractionnaires en intraday)
+            X = _days(df.index)
             y = df['Close'].values
-            
-            model = LinearRegression().fit(X, y)
-            future_ordinals = [[d.toordinal()] for d in future_dates]
-            preds = model.predict(future_ordinals)
+
+            LinearRegression = model_backend(model_type)
+            model = self._fitted_model(
+                model_type, {}, lambda close: LinearRegression().fit(X, close), use_cache=use_cache
+            )
+            preds = model.predict(_days(future_dates))
             
             # Fix Ancrage
             last_day_ordinal = [[X[-1][0]]]
@@ -349,46 +1069,94 @@ class SingleAssetAnalyzer:
             sigma_pct = recent_returns.std()
             std_dev = sigma_pct * df['Close'].iloc[-1]
 
-            return future_dates, preds, std_dev
+            return future_dates, preds, np.full(days_ahead, std_dev)
 
         # --- MODÈLE 2 : ARIMA ---
         elif model_type == "ARIMA":
-            history = df['Close'].values
-            model = ARIMA(history, order=(5,1,0))
-            model_fit = model.fit()
+            # Nouvelles barres : paramètres conservés, état du filtre prolongé (append)
+            ARIMA = model_backend(model_type)
+            model_fit = self._fitted_model(
+                model_type, {"order": self.ARIMA_ORDER},
+                lambda close: ARIMA(close, order=self.ARIMA_ORDER).fit(),
+                lambda fit, close, n_new: fit.append(close[-n_new:], refit=False),
+                use_cache=use_cache,
+            )
             preds = model_fit.forecast(steps=days_ahead)
             
             residuals = model_fit.resid
             std_dev = np.std(residuals[1:])
-            return future_dates, preds, std_dev
+            return future_dates, preds, np.full(days_ahead, std_dev)
 
         # --- MODÈLE 3 : RANDOM FOREST ---
         elif model_type == "Machine Learning (RF)":
+            close_all = df['Close'].to_numpy(dtype=float)
+            RandomForestRegressor = model_backend(model_type)
+
+            if rf_mode == "direct":
+                # Une forêt pour tous les horizons jusqu'à RF_MAX_HORIZON (moins si
+                # l'historique est court, davantage si la demande le dépasse)
+                horizon = max(days_ahead, min(self.RF_MAX_HORIZON, len(close_all) - 4 - self.RF_MIN_ROWS))
+                X, Y, x_last = _rf_direct_dataset(close_all, horizon)
+                if len(X) >= self.RF_MIN_ROWS:
+                    def fit(close):
+                        model = RandomForestRegressor(**self.RF_PARAMS, oob_score=True, n_jobs=-1)
+                        model.fit(X, Y)
+                        # Erreur hors échantillon (OOB) par horizon, en log-rendement
+                        oob = model.oob_prediction_.reshape(Y.shape)
+                        return {"model": model, "horizon": horizon, "resid_std": np.nanstd(Y - oob, axis=0)}
+
+                    # Nouvelles barres : la forêt est conservée jusqu'au prochain réajustement
+                    state = self._fitted_model(
+                        model_type, dict(self.RF_PARAMS, mode="direct"), fit,
+                        lambda state, close, n_new: state, use_cache=use_cache,
+                        usable=lambda state: state["horizon"] >= days_ahead,
+                    )
+                    # Tout l'horizon en un seul appel, découpé à la demande
+                    log_rets = state["model"].predict(x_last).reshape(-1)[:days_ahead]
+                    preds = close_all[-1] * np.exp(log_rets)
+                    std_dev = preds * state["resid_std"][:days_ahead]
+                    return future_dates, preds, std_dev
+
+                print("ERROR predict_future: historique trop court pour le mode direct, mode récursif utilisé")
+
             df['Lag1'] = df['Close'].shift(1)
             df['Lag2'] = df['Close'].shift(2)
             df['MA5'] = df['Close'].rolling(5).mean()
             df = df.dropna()
 
-            X = df[['Lag1', 'Lag2', 'MA5']].values
-            y = df['Close'].values
-            
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
-            model.fit(X, y)
-
+            def fit(close):
+                X = df[['Lag1', 'Lag2', 'MA5']].values
+                y = df['Close'].values
+                model = RandomForestRegressor(**self.RF_PARAMS)
+                model.fit(X, y)
+                train_preds = model.predict(X)
+                return {"model": model, "std_dev": np.std(y - train_preds)}
+
+            state = self._fitted_model(
+                model_type, self.RF_PARAMS, fit, lambda state, close, n_new: state,
+                use_cache=use_cache,
+            )
+            model = state["model"]
+
+            # Récursif : chaque prévision alimente les retards et la MA5 de l'étape suivante
             preds = []
-            current_lag1 = df['Close'].iloc[-1]
-            current_lag2 = df['Close'].iloc[-2]
-            current_ma = df['MA5'].iloc[-1]
+            window = list(close_all[-5:])
 
             for _ in range(days_ahead):
-                pred = model.predict([[current_lag1, current_lag2, current_ma]])[0]
+                pred = model.predict([[window[-1], window[-2], np.mean(window)]])[0]
                 preds.append(pred)
-                current_lag2 = current_lag1
-                current_lag1 = pred
-            
-            train_preds = model.predict(X)
-            std_dev = np.std(y - train_preds)
+                window = window[1:] + [pred]
             
-            return future_dates, np.array(preds), std_dev
+            return future_dates, np.array(preds), np.full(days_ahead, state["std_dev"])
         
-        return [], [], 0
\ No newline at end of file
+        return [], [], np.array([])
+
+    @timed
+    def simulate_future(self, days_ahead=30, n_paths=10_000, method="gbm", seed=None, **kwargs):
+        """
+        Bandes de prévision Monte Carlo (modules/monte_carlo) : method "gbm",
+        "bootstrap" ou "garch". Retourne (dates futures, résultat de simulate_paths).
+        """
+        future_dates = self._future_dates(days_ahead)
+        result = simulate_paths(self.data['Close'].values, days_ahead, n_paths, method, seed, **kwargs)
+        return future_dates, result
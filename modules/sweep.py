@@ -0,0 +1,518 @@
+# modules/sweep.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from modules.signal_engine import hold_positions
+from modules.utils import share_array, attach_array, release_array
+
+# Nombre maximal de cellules (barres x paramètres) traitées à la fois
+MAX_CELLS = 4_000_000
+
+# Grilles par défaut (celles de SingleAssetAnalyzer.find_best_params)
+DEFAULT_GRIDS = {
+    "Momentum": {"window": list(range(10, 100, 10))},
+    "Cross MMS": {"short_w": list(range(10, 50, 10)), "long_w": list(range(50, 150, 20))},
+    "Mean Reversion (BB)": {"window": list(range(10, 50, 10)), "std_dev": [1.5, 2.0, 2.5]},
+}
+
+
+# -------------------------------------------------------------
+# SOMMES CUMULÉES PARTAGÉES
+# -------------------------------------------------------------
+class PriceSums:
+    """
+    Sommes cumulées (prix et carrés) calculées une seule fois par série.
+    Toutes les moyennes / écarts-types glissants en sont déduits en O(1) par cellule,
+    sur n'importe quelle plage de barres (folds de walk-forward compris).
+    Les prix sont centrés pour limiter les erreurs d'arrondi.
+    """
+
+    def __init__(self, close, s1=None, s2=None):
+        self.close = np.asarray(close, dtype=float)
+        self.offset = self.close[0] if len(self.close) else 0.0
+
+        if s1 is None:
+            centered = self.close - self.offset
+            s1 = np.concatenate(([0.0], np.cumsum(centered)))
+            s2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        self.s1, self.s2 = s1, s2
+
+    def __len__(self):
+        return len(self.close)
+
+
+def _rows(n, rows):
+    return np.arange(n)[rows if rows is not None else slice(None)][:, None]
+
+
+def rolling_mean_matrix(sums: PriceSums, windows, rows=None):
+    """
+    Moyennes mobiles pour toutes les fenêtres : matrice (n_barres x n_fenêtres),
+    NaN tant que la fenêtre n'est pas remplie (comme pandas.rolling).
+    rows (slice) limite le calcul à une plage de barres.
+    """
+    windows = np.asarray(windows, dtype=int)
+    t = _rows(len(sums), rows)
+    lo = np.clip(t + 1 - windows[None, :], 0, None)
+
+    out = (sums.s1[t + 1] - sums.s1[lo]) / windows + sums.offset
+    out[t < windows - 1] = np.nan
+    return out
+
+
+def rolling_std_matrix(sums: PriceSums, windows, rows=None):
+    """Écarts-types glissants (ddof=1) pour toutes les fenêtres."""
+    windows = np.asarray(windows, dtype=int)
+    t = _rows(len(sums), rows)
+    lo = np.clip(t + 1 - windows[None, :], 0, None)
+
+    s1 = sums.s1[t + 1] - sums.s1[lo]
+    s2 = sums.s2[t + 1] - sums.s2[lo]
+    var = (s2 - s1 * s1 / windows) / (windows - 1)
+    out = np.sqrt(np.clip(var, 0, None))
+    out[t < windows - 1] = np.nan
+    return out
+
+
+# -------------------------------------------------------------
+# ALIGNEMENT DES RENDEMENTS (convention de run_strategy)
+# -------------------------------------------------------------
+# Rendement de la stratégie à la ligne t : r[t+1] * signal[t-1], nul en t = 0,
+# dernière barre exclue. Une plage [start, stop) de lignes de rendement utilise
+# donc les signaux des barres [max(start, 1) - 1, stop - 1).
+# step > 1 : une ligne sur step seulement (estimation rapide sur toute la plage).
+def _fold_layout(n, start=0, stop=None, step=1):
+    stop = n - 1 if stop is None else min(stop, n - 1)
+    first = max(start, 1)
+    signal_rows = slice(first - 1, max(stop - 1, first - 1), step)
+    return stop, first, signal_rows
+
+
+def batch_sharpe(daily_returns, signals, periods_per_year=252, start=0, stop=None, step=1):
+    """
+    Sharpe de toutes les colonnes de signaux en un seul calcul matriciel,
+    sur les lignes de rendement [start, stop) (tout l'historique par défaut).
+    signals : signaux des barres [max(start, 1) - 1, stop - 1) (voir _fold_layout).
+    step > 1 : lignes sous-échantillonnées (signals alors pris une barre sur step).
+    """
+    r = np.asarray(daily_returns, dtype=float)
+    stop, first, _ = _fold_layout(len(r), start, stop)
+    a = r[first + 1:stop + 1:step]
+    count = stop - start if step == 1 else len(a)
+    if count < 2:
+        return np.zeros(signals.shape[1])
+
+    s = signals[:len(a)].astype(float)
+
+    total = a @ s
+    total_sq = (a * a) @ np.abs(s)
+    mean = total / count
+    var = (total_sq - count * mean * mean) / (count - 1)
+    std = np.sqrt(np.clip(var, 0, None))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+    return sharpe
+
+
+def _chunks(n_rows, n_cols):
+    """Découpe les colonnes pour borner la mémoire à MAX_CELLS cellules."""
+    step = max(1, MAX_CELLS // max(n_rows, 1))
+    for start in range(0, n_cols, step):
+        yield slice(start, min(start + step, n_cols))
+
+
+# -------------------------------------------------------------
+# BALAYAGES PAR STRATÉGIE
+# -------------------------------------------------------------
+def sweep_momentum(sums: PriceSums, daily_returns, windows, start=0, stop=None, step=1, periods_per_year=252):
+    """
+    Momentum (prix > MMS) pour toutes les fenêtres.
+    Retourne (fenêtres, sharpes).
+    """
+    windows = np.asarray(list(windows), dtype=int)
+    sharpe = np.empty(len(windows))
+    _, _, rows = _fold_layout(len(sums), start, stop, step)
+    close = sums.close[rows, None]
+
+    for cols in _chunks(len(close), len(windows)):
+        mms = rolling_mean_matrix(sums, windows[cols], rows)
+        sharpe[cols] = batch_sharpe(daily_returns, close > mms, periods_per_year, start, stop, step)
+
+    return windows, sharpe
+
+
+def sweep_cross(sums: PriceSums, daily_returns, short_windows, long_windows, start=0, stop=None,
+                periods_per_year=252):
+    """
+    Croisement de MMS pour toutes les paires courte < longue.
+    Chaque fenêtre distincte n'est calculée qu'une fois.
+    Retourne (paires (k x 2), sharpes).
+    """
+    pairs = np.array(
+        [(s, l) for s in short_windows for l in long_windows if s < l], dtype=int
+    ).reshape(-1, 2)
+    return pairs, cross_sharpe(sums, daily_returns, pairs, start, stop, periods_per_year=periods_per_year)
+
+
+def cross_sharpe(sums: PriceSums, daily_returns, pairs, start=0, stop=None, step=1, periods_per_year=252):
+    """Sharpe du croisement de MMS pour une liste quelconque de paires (k x 2)."""
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    _, _, rows = _fold_layout(len(sums), start, stop, step)
+    unique = np.unique(pairs)
+    mms = rolling_mean_matrix(sums, unique, rows)
+    col = {w: i for i, w in enumerate(unique)}
+    short_idx = np.array([col[s] for s in pairs[:, 0]], dtype=int)
+    long_idx = np.array([col[l] for l in pairs[:, 1]], dtype=int)
+
+    sharpe = np.empty(len(pairs))
+    for cols in _chunks(len(mms), len(pairs)):
+        signals = mms[:, short_idx[cols]] > mms[:, long_idx[cols]]
+        sharpe[cols] = batch_sharpe(daily_returns, signals, periods_per_year, start, stop, step)
+
+    return sharpe
+
+
+def sweep_bollinger(sums: PriceSums, daily_returns, windows, std_devs, start=0, stop=None, hold=False,
+                    periods_per_year=252):
+    """
+    Retour à la moyenne (prix < bande basse) pour toutes les combinaisons
+    fenêtre x nombre d'écarts-types.
+    hold=True : position tenue jusqu'au retour du prix à la moyenne (état à plat
+    au début de la plage [start, stop)).
+    Retourne (combinaisons (k x 2), sharpes).
+    """
+    windows = np.asarray(list(windows), dtype=int)
+    std_devs = np.asarray(list(std_devs), dtype=float)
+    combos = np.array([(w, k) for w in windows for k in std_devs], dtype=float).reshape(-1, 2)
+    _, _, rows = _fold_layout(len(sums), start, stop)
+    close = sums.close[rows, None, None]
+
+    sharpe = np.empty(len(combos))
+    per_window = max(1, MAX_CELLS // max(len(close) * len(std_devs), 1))
+
+    for first in range(0, len(windows), per_window):
+        w = windows[first:first + per_window]
+        sma = rolling_mean_matrix(sums, w, rows)
+        std = rolling_std_matrix(sums, w, rows)
+        lower = sma[:, :, None] - std[:, :, None] * std_devs[None, None, :]
+        signals = close < lower
+        if hold:
+            exits = np.broadcast_to(close >= sma[:, :, None], signals.shape)
+            signals = hold_positions(signals.reshape(len(close), -1), exits.reshape(len(close), -1))
+        signals = signals.reshape(len(close), -1)
+
+        col = first * len(std_devs)
+        sharpe[col:col + signals.shape[1]] = batch_sharpe(daily_returns, signals, periods_per_year, start, stop)
+
+    return combos, sharpe
+
+
+def bollinger_sharpe(sums: PriceSums, daily_returns, combos, start=0, stop=None, hold=False, step=1,
+                     periods_per_year=252):
+    """
+    Sharpe du retour à la moyenne pour une liste quelconque de combinaisons
+    (fenêtre, écarts-types) (k x 2) : chaque fenêtre distincte n'est calculée qu'une fois.
+    Avec hold et step > 1, la sortie n'est testée que sur les barres échantillonnées.
+    """
+    combos = np.asarray(combos, dtype=float).reshape(-1, 2)
+    _, _, rows = _fold_layout(len(sums), start, stop, step)
+    close = sums.close[rows, None]
+
+    unique, col = np.unique(combos[:, 0].astype(int), return_inverse=True)
+    sma = rolling_mean_matrix(sums, unique, rows)
+    std = rolling_std_matrix(sums, unique, rows)
+
+    sharpe = np.empty(len(combos))
+    for cols in _chunks(len(close), len(combos)):
+        idx = col[cols]
+        signals = close < sma[:, idx] - std[:, idx] * combos[cols, 1]
+        if hold:
+            signals = hold_positions(signals, close >= sma[:, idx])
+        sharpe[cols] = batch_sharpe(daily_returns, signals, periods_per_year, start, stop, step)
+
+    return sharpe
+
+
+def sweep(sums: PriceSums, daily_returns, strat_name, grid, start=0, stop=None, periods_per_year=252):
+    """
+    Balayage générique d'une stratégie de SingleAssetAnalyzer.
+    Retourne (liste de dicts de paramètres, sharpes annualisés sur periods_per_year).
+    """
+    if strat_name == "Momentum":
+        windows, sharpe = sweep_momentum(sums, daily_returns, grid["window"], start, stop,
+                                         periods_per_year=periods_per_year)
+        return [{"window": int(w)} for w in windows], sharpe
+
+    if strat_name == "Cross MMS":
+        pairs, sharpe = sweep_cross(sums, daily_returns, grid["short_w"], grid["long_w"], start, stop,
+                                    periods_per_year)
+        return [{"short_w": int(s), "long_w": int(l)} for s, l in pairs], sharpe
+
+    if strat_name == "Mean Reversion (BB)":
+        hold = bool(grid.get("hold", False))
+        combos, sharpe = sweep_bollinger(sums, daily_returns, grid["window"], grid["std_dev"], start, stop, hold,
+                                         periods_per_year)
+        extra = {"hold": True} if hold else {}
+        return [dict({"window": int(w), "std_dev": float(k)}, **extra) for w, k in combos], sharpe
+
+    raise ValueError(f"Stratégie inconnue : {strat_name}")
+
+
+def strategy_returns(sums: PriceSums, daily_returns, strat_name, params, start=0, stop=None):
+    """Rendements de la stratégie (un jeu de paramètres) sur les lignes [start, stop)."""
+    r = np.asarray(daily_returns, dtype=float)
+    stop, first, rows = _fold_layout(len(sums), start, stop)
+
+    if strat_name == "Momentum":
+        signal = sums.close[rows] > rolling_mean_matrix(sums, [params["window"]], rows)[:, 0]
+    elif strat_name == "Cross MMS":
+        mms = rolling_mean_matrix(sums, [params["short_w"], params["long_w"]], rows)
+        signal = mms[:, 0] > mms[:, 1]
+    elif strat_name == "Mean Reversion (BB)":
+        sma = rolling_mean_matrix(sums, [params["window"]], rows)[:, 0]
+        std = rolling_std_matrix(sums, [params["window"]], rows)[:, 0]
+        signal = sums.close[rows] < sma - std * params["std_dev"]
+        if params.get("hold", False):
+            signal = hold_positions(signal, sums.close[rows] >= sma)
+    else:
+        raise ValueError(f"Stratégie inconnue : {strat_name}")
+
+    rets = r[first + 1:stop + 1] * signal
+    return np.r_[np.zeros(first - start), rets]
+
+
+# -------------------------------------------------------------
+# WALK-FORWARD
+# -------------------------------------------------------------
+def walk_forward_folds(n_rows, train_size, test_size, anchored=False):
+    """
+    Découpage en folds (train_start, train_stop, test_start, test_stop) sur les
+    lignes de rendement. Fenêtre d'entraînement glissante, ou ancrée au début.
+    """
+    folds = []
+    test_start = train_size
+    while test_start < n_rows:
+        test_stop = min(test_start + test_size, n_rows)
+        train_start = 0 if anchored else test_start - train_size
+        folds.append((train_start, test_start, test_start, test_stop))
+        test_start = test_stop
+    return folds
+
+
+# Données partagées attachées une fois par processus de calcul
+_WORKER = {}
+
+
+def _init_worker(specs):
+    arrays = {}
+    for key, spec in specs.items():
+        _WORKER[key + "_shm"], arrays[key] = attach_array(spec)
+    _WORKER["sums"] = PriceSums(arrays["close"], arrays["s1"], arrays["s2"])
+    _WORKER["returns"] = arrays["returns"]
+
+
+def _run_fold(fold, strat_name, grid, periods_per_year, sums=None, returns=None):
+    """Optimise sur le train, puis applique les meilleurs paramètres au test."""
+    sums = sums if sums is not None else _WORKER["sums"]
+    returns = returns if returns is not None else _WORKER["returns"]
+    train_start, train_stop, test_start, test_stop = fold
+
+    params, sharpe = sweep(sums, returns, strat_name, grid, train_start, train_stop, periods_per_year)
+    best = int(np.argmax(sharpe))
+    oos = strategy_returns(sums, returns, strat_name, params[best], test_start, test_stop)
+
+    std = oos.std(ddof=1) if len(oos) > 1 else 0.0
+    oos_sharpe = oos.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+    return params[best], float(sharpe[best]), float(oos_sharpe), oos
+
+
+def walk_forward(close, daily_returns, strat_name, grid=None, train_size=756, test_size=126,
+                 anchored=False, max_workers=None, periods_per_year=252):
+    """
+    Optimisation walk-forward : chaque fold choisit ses paramètres sur son train
+    (balayage vectorisé) et les applique hors échantillon sur son test.
+    Les folds tournent en parallèle ; prix, sommes cumulées et rendements sont
+    calculés une fois et partagés sans copie (mémoire partagée).
+
+    Retourne (rendements hors échantillon concaténés, lignes couvertes, liste des folds).
+    """
+    grid = grid or DEFAULT_GRIDS[strat_name]
+    returns = np.asarray(daily_returns, dtype=float)
+    sums = PriceSums(close)
+    folds = walk_forward_folds(len(sums) - 1, train_size, test_size, anchored)
+    if not folds:
+        raise ValueError("Historique trop court pour la taille de train demandée.")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(folds) == 1:
+        results = [_run_fold(f, strat_name, grid, periods_per_year, sums, returns) for f in folds]
+    else:
+        shared = {"close": sums.close, "s1": sums.s1, "s2": sums.s2, "returns": returns}
+        blocks, specs = {}, {}
+        for key, arr in shared.items():
+            blocks[key], specs[key] = share_array(arr)
+        try:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(folds)),
+                                     initializer=_init_worker, initargs=(specs,)) as pool:
+                futures = [pool.submit(_run_fold, f, strat_name, grid, periods_per_year) for f in folds]
+                results = [f.result() for f in futures]
+        finally:
+            for shm in blocks.values():
+                release_array(shm)
+
+    report = []
+    for (train_start, train_stop, test_start, test_stop), (params, is_sharpe, oos_sharpe, _) in zip(folds, results):
+        report.append({
+            "train": (train_start, train_stop),
+            "test": (test_start, test_stop),
+            "params": params,
+            "in_sample_sharpe": is_sharpe,
+            "out_of_sample_sharpe": oos_sharpe,
+        })
+
+    oos_returns = np.concatenate([res[3] for res in results])
+    return oos_returns, slice(folds[0][2], folds[-1][3]), report
+
+
+# -------------------------------------------------------------
+# RECHERCHE ADAPTATIVE (successive halving + échantillonnage local)
+# -------------------------------------------------------------
+# Espaces de recherche : paramètre -> (min, max, pas), bornes des entrées de l'app
+SEARCH_SPACES = {
+    "Momentum": {"window": (5, 300, 1)},
+    "Cross MMS": {"short_w": (5, 100, 1), "long_w": (20, 300, 1)},
+    "Mean Reversion (BB)": {"window": (10, 100, 1), "std_dev": (1.0, 3.0, 0.1)},
+}
+# Lignes minimales du palier le plus grossier
+MIN_SEARCH_ROWS = 100
+
+
+def _values(levels, idx):
+    """Indices sur la grille (k x d) -> valeurs des paramètres (k x d)."""
+    return np.column_stack([levels[j][idx[:, j]] for j in range(len(levels))])
+
+
+def _valid(strat_name, values):
+    if strat_name == "Cross MMS":
+        return values[:, 0] < values[:, 1]
+    return np.ones(len(values), dtype=bool)
+
+
+def _evaluate(sums, daily_returns, strat_name, values, start, stop, step=1, hold=False, periods_per_year=252):
+    """Sharpe de chaque ligne de values (ordre des paramètres de l'espace)."""
+    if strat_name == "Momentum":
+        return sweep_momentum(sums, daily_returns, values[:, 0].astype(int), start, stop, step, periods_per_year)[1]
+    if strat_name == "Cross MMS":
+        return cross_sharpe(sums, daily_returns, values.astype(int), start, stop, step, periods_per_year)
+    if strat_name == "Mean Reversion (BB)":
+        return bollinger_sharpe(sums, daily_returns, values, start, stop, hold, step, periods_per_year)
+    raise ValueError(f"Stratégie inconnue : {strat_name}")
+
+
+def _sample(rng, strat_name, levels, n, exclude=(), centers=None, scale=0.0):
+    """
+    n candidats distincts (indices sur la grille) absents de exclude : tirés
+    uniformément, ou autour de centers (écart-type scale x taille de chaque dimension).
+    """
+    sizes = np.array([len(l) for l in levels])
+    seen = {tuple(row) for row in exclude}
+    out = []
+
+    for _ in range(20):
+        missing = n - len(out)
+        if missing <= 0:
+            break
+        if centers is None:
+            idx = rng.integers(0, sizes, size=(2 * missing, len(sizes)))
+        else:
+            parents = centers[rng.integers(0, len(centers), 2 * missing)]
+            jump = rng.standard_normal(parents.shape) * np.maximum(scale * sizes, 1.0)
+            idx = np.clip(np.rint(parents + jump).astype(int), 0, sizes - 1)
+
+        for row in idx[_valid(strat_name, _values(levels, idx))]:
+            key = tuple(row)
+            if key not in seen and len(out) < n:
+                seen.add(key)
+                out.append(row)
+
+    return np.array(out, dtype=int).reshape(-1, len(sizes))
+
+
+def adaptive_search(sums: PriceSums, daily_returns, strat_name, space=None, budget=60, eta=3,
+                    min_rows=MIN_SEARCH_ROWS, explore=0.3, start=0, stop=None, hold=False, seed=None,
+                    periods_per_year=252):
+    """
+    Recherche des paramètres d'une stratégie sur un grand espace, à budget fixé.
+
+    Successive halving : les candidats sont d'abord évalués sur une barre sur eta^k
+    de la plage [start, stop) (au moins min_rows lignes), seul le meilleur 1/eta
+    passe au palier suivant, plus dense ; le dernier palier utilise toutes les barres.
+    À chaque palier, une part `explore` des places est tirée autour des meilleurs
+    survivants : les régions prometteuses sont échantillonnées plus finement.
+
+    budget : coût total, en évaluations sur toute la plage (candidats x lignes / lignes) ;
+             à budget égal, une grille exhaustive n'évalue que `budget` candidats.
+             Si l'espace entier tient dans le budget, il est balayé exhaustivement.
+    space : {paramètre: (min, max, pas)}, SEARCH_SPACES[strat_name] par défaut
+    seed : graine ; mêmes données + même graine = même résultat
+    periods_per_year : annualisation des Sharpe (barres par an de l'intervalle)
+
+    Retourne (meilleurs paramètres, sharpe annualisé sur la plage, rapport par palier).
+    """
+    space = space or SEARCH_SPACES[strat_name]
+    names = list(space)
+    integer = [all(float(v).is_integer() for v in bounds) for bounds in space.values()]
+    levels = [np.round(np.arange(lo, hi + step / 2, step), 10) for lo, hi, step in space.values()]
+    sizes = np.array([len(l) for l in levels])
+    rng = np.random.default_rng(seed)
+
+    stop, _, _ = _fold_layout(len(sums), start, stop)
+    n_rows = stop - start
+    if n_rows < 2:
+        raise ValueError("Historique trop court pour la recherche.")
+
+    # Paliers : une barre sur eta^k, du plus grossier au complet (au moins deux paliers).
+    # Part du budget croissante avec le palier : les évaluations complètes départagent.
+    n_rungs = max(2, int(np.log(max(n_rows / min_rows, 1)) / np.log(eta)) + 1)
+    steps = [max(1, min(eta ** (n_rungs - 1 - k), n_rows // min_rows)) for k in range(n_rungs)]
+    weights = np.arange(1, n_rungs + 1) / (n_rungs * (n_rungs + 1) / 2)
+    counts = [max(1, int(budget * w * step)) for w, step in zip(weights, steps)]
+
+    if np.prod(sizes) <= budget:
+        # Espace plus petit que le budget : balayage exhaustif sur toutes les barres
+        grid = np.indices(sizes).reshape(len(sizes), -1).T
+        pool = grid[_valid(strat_name, _values(levels, grid))]
+        steps, counts = [1], [len(pool)]
+    else:
+        pool = _sample(rng, strat_name, levels, counts[0])
+
+    report = []
+    for k, (step, count) in enumerate(zip(steps, counts)):
+        if k > 0:
+            order = np.argsort(-scores, kind="stable")
+            n_local = int(round(explore * count))
+            keep = pool[order[:count - n_local]]
+            centers = keep[:max(1, -(-len(keep) // eta))]
+            local = _sample(rng, strat_name, levels, count - len(keep), pool, centers, 0.25 / eta ** k)
+            pool = np.vstack([keep, local])
+
+        scores = _evaluate(sums, daily_returns, strat_name, _values(levels, pool), start, stop, step, hold,
+                           periods_per_year)
+        best = int(np.argmax(scores))
+        report.append({
+            "step": step,
+            "candidates": len(pool),
+            "best": _values(levels, pool[best:best + 1])[0].tolist(),
+            "best_sharpe": float(scores[best]),
+        })
+
+    best = int(np.argmax(scores))
+    values = _values(levels, pool[best:best + 1])[0]
+    params = {name: int(v) if is_int else float(v) for name, v, is_int in zip(names, values, integer)}
+    if hold and strat_name == "Mean Reversion (BB)":
+        params["hold"] = True
+    return params, float(scores[best]), report
@@ -0,0 +1,41 @@
+# modules/utils.py
+
+import numpy as np
+from multiprocessing import shared_memory
+
+
+# ---------------------------------------------------------
+# Tableaux NumPy en mémoire partagée (entre processus)
+# ---------------------------------------------------------
+def share_array(arr: np.ndarray):
+    """
+    Copie un tableau dans un bloc de mémoire partagée.
+    Retourne (bloc, spec) : spec est la description légère (nom, forme, dtype)
+    à transmettre aux processus, le bloc reste à fermer/libérer par l'appelant.
+    """
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def attach_array(spec):
+    """
+    Ouvre un tableau partagé sans copie à partir de sa spec.
+    Retourne (bloc, tableau) : garder une référence au bloc tant que le tableau sert.
+    """
+    name, shape, dtype = spec
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 : les processus enfants partagent le resource_tracker du
+        # créateur, qui libère le bloc une seule fois (release_array)
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def release_array(shm):
+    """Ferme et libère un bloc créé par share_array."""
+    shm.close()
+    shm.unlink()
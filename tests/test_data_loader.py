@@ -0,0 +1,127 @@
+# tests/test_data_loader.py
+# Couche de récupération autour de Yahoo : yfinance ne lève pas d'exception sur
+# erreur réseau / 429 / symbole inconnu, il renvoie un tableau vide (yf.download simulé ici).
+
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+import yfinance as yf
+from yfinance import shared
+
+import modules.data_loader as data_loader
+from modules.data_loader import DataProvider, YahooProvider, ResilientProvider, get_history, load_store
+from modules.fetch import FetchError
+
+
+def _frame(symbols, n=5):
+    dates = pd.bdate_range("2024-01-01", periods=n)
+    columns = pd.MultiIndex.from_product([symbols, ["Open", "High", "Low", "Close", "Volume"]])
+    return pd.DataFrame(1.0, index=pd.Index(dates, name="Date"), columns=columns)
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    """yf.download simulé : renvoie state["result"] (DataFrame ou fonction des symboles)."""
+    state = {"calls": 0, "result": pd.DataFrame()}
+
+    def download(symbols, **kwargs):
+        state["calls"] += 1
+        result = state["result"]
+        return result(symbols) if callable(result) else result
+
+    monkeypatch.setattr(yf, "download", download)
+    monkeypatch.setattr(shared, "_ERRORS", {}, raising=False)
+    return state
+
+
+def test_empty_download_raises_retryable_error(yahoo):
+    with pytest.raises(FetchError) as info:
+        YahooProvider().download(["AAPL"], period="5d")
+    assert info.value.retryable
+
+
+def test_resilient_provider_retries_and_keeps_last_good_data(yahoo):
+    provider = ResilientProvider(YahooProvider(), attempts=3, base_delay=0.0, rate=1000, burst=1000)
+
+    yahoo["result"] = _frame(["AAPL"])
+    assert len(provider.download(["AAPL"], period="5d")["AAPL"]) == 5
+
+    # Panne : vide à chaque appel -> reprises, puis dernier résultat connu (pas {})
+    yahoo["result"] = pd.DataFrame()
+    yahoo["calls"] = 0
+    frames = provider.download(["AAPL"], period="5d")
+    assert yahoo["calls"] == 3
+    assert len(frames["AAPL"]) == 5
+    assert provider.stats["stale"] == 1
+
+
+def test_breaker_opens_on_empty_downloads(yahoo):
+    provider = ResilientProvider(YahooProvider(), attempts=1, base_delay=0.0, failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(FetchError):
+            provider.download(["AAPL"], period="5d")
+    assert provider.breaker.state == "open"
+
+
+def test_missing_symbol_falls_back_per_symbol(yahoo):
+    yahoo["result"] = lambda symbols: _frame([s for s in symbols if s != "BAD"])
+    provider = ResilientProvider(YahooProvider(), attempts=1, base_delay=0.0)
+
+    frames = provider.download(["AAPL", "BAD", "MSFT"], period="5d")
+    assert sorted(frames) == ["AAPL", "MSFT"]
+
+
+def test_unknown_symbol_reported_by_yfinance_is_not_retried(yahoo):
+    shared._ERRORS["BAD"] = "YFTzMissingError('$BAD: possibly delisted; no timezone found')"
+    with pytest.raises(FetchError) as info:
+        YahooProvider().download(["BAD"], period="5d")
+    assert info.value.status == 404 and not info.value.retryable
+
+
+class _ClampedProvider(DataProvider):
+    """Fournisseur qui, comme Yahoo en intraday, ne remonte pas au-delà de max_days."""
+
+    def __init__(self, max_days):
+        self.max_days = max_days
+        self.calls = []
+
+    def today(self):
+        return pd.Timestamp("2024-06-05")  # un mercredi
+
+    def download(self, symbols, period=None, start=None, interval="1d"):
+        self.calls.append({"period": period, "start": start})
+        first = self.today() - timedelta(days=self.max_days) if start is None else pd.Timestamp(start)
+        dates = pd.bdate_range(first, self.today())
+        frame = pd.DataFrame({"Date": dates, "Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1})
+        return {s: frame for s in symbols}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "STORE_DIR", str(tmp_path))
+    previous = data_loader.get_provider()
+    yield
+    data_loader.set_provider(previous)
+
+
+def test_clamped_download_records_first_bar_returned(store):
+    provider = _ClampedProvider(max_days=60)
+    data_loader.set_provider(provider)
+
+    df = get_history("AAPL", lookback_days=100, interval="5m")
+    _, meta = load_store("AAPL", "5m")
+    assert pd.Timestamp(meta["covered_from"]) == df["Date"].iloc[0] > provider.today() - timedelta(days=100)
+
+
+def test_daily_coverage_keeps_requested_start(store):
+    # Début demandé un samedi : la première barre est le lundi, le stock couvre pourtant la fenêtre
+    provider = _ClampedProvider(max_days=4)
+    data_loader.set_provider(provider)
+
+    get_history("AAPL", lookback_days=4)
+    _, meta = load_store("AAPL")
+    assert meta["covered_from"] == "2024-06-01"
+
+    get_history("AAPL", lookback_days=4)
+    assert provider.calls[-1]["start"] is not None  # seule la fin manquante est demandée
@@ -0,0 +1,35 @@
+# tests/test_indicators.py
+# Indicateurs mis en cache par empreinte des prix : l'appelant ne voit jamais son
+# DataFrame modifié.
+
+import numpy as np
+import pandas as pd
+
+from modules.strategy_single import clear_indicator_cache, compute_rsi, get_rsi
+
+
+def _prices():
+    rng = np.random.default_rng(2)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200)))
+    return pd.DataFrame({"Date": pd.bdate_range("2022-01-03", periods=len(close)), "Close": close})
+
+
+def test_compute_rsi_does_not_mutate_input():
+    clear_indicator_cache()
+    df = _prices()
+    before = df.copy()
+
+    out = compute_rsi(df, 14)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert list(out.columns) == ["Date", "Close", "RSI"]
+    pd.testing.assert_series_equal(out["RSI"], get_rsi(df, 14), check_names=False)
+
+
+def test_rsi_matches_rolling_formula():
+    df = _prices()
+    delta = df["Close"].diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = (-delta.clip(upper=0)).rolling(14).mean()
+    expected = 100 - 100 / (1 + gain / loss)
+    pd.testing.assert_series_equal(compute_rsi(df)["RSI"], expected, check_names=False)
@@ -0,0 +1,80 @@
+# tests/test_metrics.py
+# compute_metrics / compute_metrics_matrix (vectorisés) comparés à la formule
+# d'origine, calculée colonne par colonne avec pandas.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.strategy_single import (
+    compute_metrics,
+    compute_metrics_matrix,
+    strategy_bollinger,
+    strategy_rsi,
+    strategy_sma,
+)
+
+KEYS = ("Sharpe Ratio", "Volatility (ann.)", "Max Drawdown", "Sortino")
+
+
+def _baseline(curve: pd.Series, periods_per_year=252):
+    """Ancienne implémentation de compute_metrics (une courbe, pandas, non arrondie)."""
+    returns = curve.pct_change().dropna()
+    if returns.empty:
+        return dict.fromkeys(KEYS, 0.0)
+
+    ann = np.sqrt(periods_per_year)
+    std = returns.std()
+    sharpe = returns.mean() / std * ann if std > 0 else 0.0
+
+    downside_std = returns[returns < 0].std()
+    sortino = returns.mean() / downside_std * ann if downside_std > 0 else 0.0
+
+    cum_max = curve.cummax()
+    max_dd = ((curve - cum_max) / cum_max).min()
+
+    return {"Sharpe Ratio": sharpe, "Volatility (ann.)": std * ann, "Max Drawdown": max_dd, "Sortino": sortino}
+
+
+def _curves():
+    rng = np.random.default_rng(11)
+    n = 750
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.013, n)))
+    df = pd.DataFrame({"Date": pd.bdate_range("2020-01-01", periods=n), "Close": close})
+    return {
+        "close": pd.Series(close),
+        "sma": pd.Series(strategy_sma(df.copy(), 10, 40).equity),
+        "rsi": pd.Series(strategy_rsi(df.copy()).equity),
+        "bollinger_hold": pd.Series(strategy_bollinger(df.copy(), hold=True).equity),
+        "flat": pd.Series(np.ones(50)),
+        "one_loss": pd.Series([1.0, 1.01, 1.02, 0.99, 1.03]),
+        "two_bars": pd.Series([1.0, 1.05]),
+        "one_bar": pd.Series([1.0]),
+    }
+
+
+CURVES = _curves()
+
+
+@pytest.mark.parametrize("name", CURVES)
+@pytest.mark.parametrize("periods_per_year", [252, 365, 252 * 78])
+def test_compute_metrics_matches_baseline(name, periods_per_year):
+    curve = CURVES[name]
+    expected = _baseline(curve, periods_per_year)
+    got = compute_metrics(curve.to_frame("Strategy"), periods_per_year=periods_per_year)
+
+    assert set(got) == set(KEYS)
+    for key in KEYS:
+        assert got[key] == pytest.approx(round(expected[key], 3), abs=1e-3, nan_ok=True), key
+
+
+def test_compute_metrics_matrix_matches_baseline_unrounded():
+    long_curves = {name: c for name, c in CURVES.items() if len(c) == 750}
+    frame = pd.DataFrame(long_curves)
+    m = compute_metrics_matrix(frame)
+
+    for name, curve in long_curves.items():
+        expected = _baseline(curve)
+        for key in KEYS:
+            assert m.loc[name, key] == pytest.approx(expected[key], rel=1e-9, abs=1e-12), (name, key)
+        assert m.loc[name, "Total Return"] == pytest.approx(curve.iloc[-1] / curve.iloc[0] - 1, rel=1e-12)
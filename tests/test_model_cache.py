@@ -0,0 +1,76 @@
+# tests/test_model_cache.py
+# Réutilisation des modèles en cache : seules des données prolongées depuis la même
+# première barre réutilisent le modèle ; une fenêtre plus courte ou glissante est réajustée.
+# Forme des sorties de predict_future pour chaque modèle.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import modules.strategy_single as strategy_single
+from modules.model_cache import ModelCache
+from modules.strategy_single import SingleAssetAnalyzer
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ModelCache(str(tmp_path))
+    monkeypatch.setattr(strategy_single, "get_model_cache", lambda: cache)
+    return cache
+
+
+def _analyzer(close):
+    analyzer = SingleAssetAnalyzer("TEST", None, None)
+    analyzer.data = close.to_frame("Close")
+    return analyzer
+
+
+def _series(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    # Tendance qui change de pente : une régression sur une autre fenêtre donne une autre droite
+    trend = np.concatenate([np.linspace(100, 200, n // 2), np.linspace(200, 150, n - n // 2)])
+    close = trend + rng.normal(0, 1, n)
+    return pd.Series(close, index=pd.bdate_range("2020-01-01", periods=n), name="Close")
+
+
+def _predict(close, use_cache=True):
+    _, preds, _ = _analyzer(close).predict_future(10, "Linear Regression", use_cache=use_cache)
+    return preds
+
+
+def test_shorter_lookback_refits(cache):
+    close = _series()
+    _predict(close)
+    short = close.iloc[-300:]
+    np.testing.assert_allclose(_predict(short), _predict(short, use_cache=False))
+
+
+def test_sliding_window_refits(cache):
+    close = _series()
+    _predict(close.iloc[:400])
+    window = close.iloc[100:500]
+    np.testing.assert_allclose(_predict(window), _predict(window, use_cache=False))
+
+
+def test_extended_series_reuses_entry(cache):
+    close = _series().to_numpy()
+    dates = pd.bdate_range("2020-01-01", periods=len(close))
+    family = ("TEST", "1d", "Linear Regression", ())
+    cache.store(family, close[:500], "state", dates=dates[:500])
+
+    entry, n_new = cache.lookup(family, close, dates)
+    assert entry["state"] == "state" and n_new == len(close) - 500
+    # Même fin, début plus tardif : pas de réutilisation
+    assert cache.lookup(family, close[100:500], dates[100:500]) == (None, None)
+
+
+@pytest.mark.parametrize("model_type, rf_mode", [
+    ("Linear Regression", "direct"),
+    ("ARIMA", "direct"),
+    ("Machine Learning (RF)", "direct"),
+    ("Machine Learning (RF)", "recursive"),
+])
+def test_std_dev_is_one_value_per_horizon(model_type, rf_mode):
+    dates, preds, std_dev = _analyzer(_series(300)).predict_future(12, model_type, use_cache=False, rf_mode=rf_mode)
+    assert len(dates) == len(preds) == 12
+    assert np.shape(std_dev) == (12,) and np.all(np.asarray(std_dev) > 0)
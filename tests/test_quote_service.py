@@ -0,0 +1,76 @@
+# tests/test_quote_service.py
+# Service de cotations partagé, sur la source locale FakeQuoteSource (hors-ligne).
+
+import time
+
+import pytest
+
+from modules.quote_service import FakeQuoteSource, QuoteService
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def make(**kwargs):
+        source = FakeQuoteSource(latency=0.01, seed=0)
+        service = QuoteService(source=source, **kwargs).start()
+        services.append(service)
+        return service, source
+
+    yield make
+    for service in services:
+        service.stop()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_poll_fetches_all_symbols_in_one_request(make_service):
+    service, source = make_service(poll_interval=0.05)
+    symbols = ["AAPL", "MSFT", "GOOGL", "AMZN"]
+    service.subscribe(*symbols)
+
+    assert _wait_for(lambda: source.requests >= 3)
+    polls = source.requests
+    # Chaque requête porte tous les symboles suivis
+    assert all(abs(source.calls[s] - polls) <= 1 for s in symbols)
+    assert all(service.get_price(s) is not None for s in symbols)
+
+
+def test_subscription_expires_without_renewal(make_service):
+    service, source = make_service(poll_interval=0.05, subscription_ttl=0.2)
+    service.subscribe("AAPL")
+    assert service.subscriptions() == ["AAPL"]
+
+    assert _wait_for(lambda: not service.subscriptions())
+    time.sleep(0.1)
+    calls = source.calls["AAPL"]
+    time.sleep(0.2)
+    assert source.calls["AAPL"] == calls
+    # La dernière cotation reste lisible
+    assert service.snapshot()["AAPL"]["price"] > 0
+
+
+def test_unsubscribe_stops_polling(make_service):
+    service, source = make_service(poll_interval=0.05)
+    service.subscribe("AAPL", "MSFT")
+    assert _wait_for(lambda: source.requests >= 2)
+
+    service.unsubscribe("AAPL")
+    assert service.subscriptions() == ["MSFT"]
+    time.sleep(0.1)  # requête éventuellement partie avant le désabonnement
+    calls, requests = source.calls["AAPL"], source.requests
+    assert _wait_for(lambda: source.requests >= requests + 3)
+    assert source.calls["AAPL"] == calls
+
+
+def test_concurrent_requests_share_one_fetch(make_service):
+    service, source = make_service(poll_interval=60)
+    service.subscribe("AAPL")
+    assert service.get_price("AAPL", wait=1.0) is not None
+    assert source.requests == 1
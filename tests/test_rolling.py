@@ -0,0 +1,74 @@
+# tests/test_rolling.py
+# Métriques glissantes O(n) (modules/rolling.py) comparées à pandas .rolling().
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.rolling import (
+    align_benchmark,
+    rolling_beta,
+    rolling_drawdown,
+    rolling_max,
+    rolling_metrics,
+    rolling_sharpe,
+    rolling_volatility,
+)
+
+
+@pytest.fixture(scope="module")
+def curves():
+    rng = np.random.default_rng(5)
+    n = 600
+    returns = rng.normal(0.0004, 0.012, (n, 3))
+    returns[:, 2] *= 3  # volatilités différentes
+    dates = pd.bdate_range("2020-01-01", periods=n)
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates, columns=["a", "b", "c"])
+
+
+@pytest.mark.parametrize("window", [5, 63, 252])
+def test_rolling_volatility_matches_pandas(curves, window):
+    expected = curves.pct_change().rolling(window).std() * np.sqrt(252)
+    pd.testing.assert_frame_equal(rolling_volatility(curves, window), expected, rtol=1e-8)
+
+
+@pytest.mark.parametrize("window", [5, 63, 252])
+def test_rolling_sharpe_matches_pandas(curves, window):
+    r = curves.pct_change().rolling(window)
+    expected = r.mean() / r.std() * np.sqrt(365)
+    pd.testing.assert_frame_equal(rolling_sharpe(curves, window, periods_per_year=365), expected, rtol=1e-7)
+
+
+@pytest.mark.parametrize("window", [1, 7, 63, 600, 1000])
+def test_rolling_max_matches_pandas(curves, window):
+    x = curves.to_numpy().copy()
+    x[10:20, 1] = np.nan
+    expected = pd.DataFrame(x).rolling(window, min_periods=1).max().to_numpy()
+    np.testing.assert_array_equal(rolling_max(x, window), expected)
+
+
+def test_rolling_drawdown_matches_pandas(curves):
+    expected = curves / curves.rolling(63, min_periods=1).max() - 1
+    pd.testing.assert_frame_equal(rolling_drawdown(curves, 63), expected)
+    pd.testing.assert_frame_equal(rolling_drawdown(curves), curves / curves.cummax() - 1)
+
+
+def test_rolling_beta_matches_pandas(curves):
+    bench = curves["a"] * 0.5 + curves["b"] * 0.5
+    r, rb = curves.pct_change(), bench.pct_change()
+    expected = r.rolling(63).cov(rb).div(rb.rolling(63).var(), axis=0)
+    pd.testing.assert_frame_equal(rolling_beta(curves, bench, 63), expected, rtol=1e-7)
+
+
+def test_aligned_benchmark_gives_beta_on_weekend_bars(curves):
+    # Courbe crypto (7 jours sur 7) contre un indice coté en semaine seulement
+    crypto = pd.Series(np.r_[curves["a"].to_numpy(), curves["b"].to_numpy()][:700],
+                       index=pd.date_range("2020-01-01", periods=700, freq="D"))
+    index_closes = crypto[crypto.index.dayofweek < 5] * 2
+
+    bench = align_benchmark(index_closes, crypto.index)
+    assert bench.notna().all()
+    assert bench[crypto.index.dayofweek == 6].equals(bench.shift(2)[crypto.index.dayofweek == 6])
+
+    beta = rolling_metrics(crypto, 63, benchmark=bench)["Beta"]
+    assert beta.iloc[100:].notna().all().all()
@@ -0,0 +1,65 @@
+# tests/test_shared_cache.py
+# Cache de DataFrames sur fichiers Arrow mappés : vues sans copie, chargements fusionnés.
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.shared_cache import SharedFrameCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedFrameCache(str(tmp_path))
+
+
+def _frame(n=500):
+    return pd.DataFrame({
+        "Date": pd.bdate_range("2020-01-01", periods=n),
+        "Close": np.linspace(100, 110, n),
+        "Volume": np.arange(n, dtype="int64"),
+    })
+
+
+def test_get_returns_read_only_views_on_the_mapped_file(cache):
+    cache.put("AAPL", _frame())
+    df = cache.get("AAPL")
+    table = cache.get_table("AAPL")
+
+    for column in df.columns:
+        values = df[column].to_numpy()
+        mapped = table.column(column).chunk(0).to_numpy(zero_copy_only=False)
+        assert np.shares_memory(values, mapped), column
+        assert not values.flags.writeable
+    pd.testing.assert_frame_equal(df, _frame(), check_dtype=False)
+
+
+def test_concurrent_misses_share_one_load(cache):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return _frame()
+
+    results = [None] * 8
+
+    def worker(i):
+        results[i] = cache.get_or_load("AAPL", loader)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(results))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(len(df) == 500 for df in results)
+
+
+def test_empty_results_are_not_cached(cache):
+    assert cache.get_or_load("AAPL", pd.DataFrame).empty
+    assert cache.get("AAPL") is None
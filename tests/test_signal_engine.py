@@ -0,0 +1,41 @@
+# tests/test_signal_engine.py
+# Moteur de signaux : stops et backtest, utilisés par les stratégies et l'analyseur.
+
+import numpy as np
+import pandas as pd
+
+from modules.signal_engine import apply_stops, backtest, hold_positions
+from modules.strategy_single import SingleAssetAnalyzer
+
+
+def test_hold_positions_until_exit():
+    entry = np.array([0, 1, 0, 0, 0, 1, 0], dtype=bool)
+    exit_ = np.array([0, 0, 0, 1, 0, 0, 0], dtype=bool)
+    assert hold_positions(entry, exit_).tolist() == [0, 1, 1, 0, 0, 1, 1]
+
+
+def test_stop_loss_stays_flat_until_signal_changes():
+    close = np.array([100, 100, 97, 94, 96, 98, 98, 99], dtype=float)
+    signal = np.array([0, 1, 1, 1, 1, 1, 0, 1])
+    assert apply_stops(close, signal, stop_loss=0.05).tolist() == [0, 1, 1, 0, 0, 0, 0, 1]
+
+
+def test_backtest_costs_and_turnover():
+    close = np.array([100, 101, 102, 101, 103], dtype=float)
+    result = backtest(close, np.array([1, 1, 0, 1, 1]), cost_bps=10)
+    assert result["position"].tolist() == [0, 1, 1, 0, 1]
+    assert result["turnover"] == 3 and result["trades"] == 3
+    expected = np.cumprod(1 + np.array([0, 0.01 - 1e-3, 1 / 101, -1e-3, 2 / 101 - 1e-3]))
+    np.testing.assert_allclose(result["equity"], expected)
+
+
+def test_run_strategy_take_profit():
+    close = pd.Series(np.r_[np.linspace(100, 130, 60), np.full(40, 100.0)],
+                      index=pd.bdate_range("2024-01-01", periods=100), name="Close")
+    analyzer = SingleAssetAnalyzer("TEST", None, None)
+    analyzer.load_frame(close.to_frame())
+
+    # Long pendant la hausse : sans sortie, la chute finale est subie
+    curve, _ = analyzer.run_strategy("Cross MMS", short_w=2, long_w=10)
+    exited, _ = analyzer.run_strategy("Cross MMS", short_w=2, long_w=10, take_profit=0.1)
+    assert curve.iloc[-1] < analyzer.initial_investment < exited.iloc[-1]
@@ -0,0 +1,62 @@
+# tests/test_streaming.py
+# Stratégies en flux : une série intégrée barre par barre doit donner les mêmes
+# positions et la même courbe equity que la stratégie calculée sur tout l'historique.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.strategy_single import (
+    StreamingBollinger,
+    StreamingGoldenCross,
+    StreamingMACD,
+    StreamingRSI,
+    StreamingSMA,
+    compute_metrics,
+    strategy_bollinger,
+    strategy_golden_cross,
+    strategy_macd,
+    strategy_rsi,
+    strategy_sma,
+)
+
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.015, 1200)))
+    return pd.DataFrame({"Date": pd.bdate_range("2019-01-01", periods=len(close)), "Close": close})
+
+
+CASES = [
+    (StreamingSMA, {"short": 20, "long": 50}, strategy_sma),
+    (StreamingSMA, {"short": 5, "long": 30}, strategy_sma),
+    (StreamingRSI, {"window": 14}, strategy_rsi),
+    (StreamingMACD, {}, strategy_macd),
+    (StreamingBollinger, {"window": 20, "num_std": 2}, strategy_bollinger),
+    (StreamingBollinger, {"window": 10, "num_std": 1.5}, strategy_bollinger),
+    (StreamingGoldenCross, {}, strategy_golden_cross),
+]
+
+
+@pytest.mark.parametrize("stream_cls, params, batch", CASES)
+def test_streaming_matches_batch(prices, stream_cls, params, batch):
+    expected = batch(prices.copy(), **params)
+
+    strat = stream_cls(**params)
+    states = [strat.update(close) for close in prices["Close"]]
+    position = np.array([s["Position"] for s in states])
+    equity = np.array([s["Strategy"] for s in states])
+
+    np.testing.assert_array_equal(position, np.asarray(expected.position))
+    np.testing.assert_allclose(equity, np.asarray(expected.equity), rtol=1e-10)
+    assert strat.metrics() == compute_metrics(expected)
+
+
+def test_sync_only_reads_new_bars(prices):
+    strat = StreamingSMA.from_history(prices.iloc[:1000], short=20, long=50)
+    strat.sync(prices)
+    strat.sync(prices)  # aucune barre nouvelle
+    expected = strategy_sma(prices.copy(), short=20, long=50)
+    assert strat.n_bars == len(prices)
+    assert strat.equity == pytest.approx(float(expected.equity[-1]), rel=1e-10)
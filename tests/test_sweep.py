@@ -0,0 +1,96 @@
+# tests/test_sweep.py
+# Balayages vectorisés (modules/sweep.py) : mêmes Sharpe et mêmes gagnants qu'une
+# boucle naïve sur run_strategy + compute_metrics, la référence de find_best_params.
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.strategy_single import SingleAssetAnalyzer
+from modules.sweep import PriceSums, adaptive_search, sweep_bollinger, sweep_cross, sweep_momentum
+
+GRIDS = {
+    "Momentum": {"window": [5, 10, 20, 40, 60]},
+    "Cross MMS": {"short_w": [5, 10, 20], "long_w": [30, 50, 80]},
+    "Mean Reversion (BB)": {"window": [10, 20, 30], "std_dev": [1.0, 1.5, 2.0]},
+}
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, 900)))
+    analyzer = SingleAssetAnalyzer("TEST", None, None)
+    analyzer.load_frame(pd.DataFrame({"Date": pd.bdate_range("2021-01-01", periods=len(close)), "Close": close}))
+    return analyzer
+
+
+def _brute_force(analyzer, strat_name, **extra):
+    """{paramètres: Sharpe non arrondi} par exécution complète de chaque combinaison."""
+    grid = GRIDS[strat_name]
+    out = {}
+    for values in itertools.product(*grid.values()):
+        params = dict(zip(grid, values))
+        if strat_name == "Cross MMS" and params["short_w"] >= params["long_w"]:
+            continue
+        _, returns = analyzer.run_strategy(strat_name, **params, **extra)
+        out[values] = analyzer.compute_metrics(returns)["Raw_Sharpe"]
+    return out
+
+
+def _best(scores):
+    return max(scores, key=scores.get)
+
+
+@pytest.fixture(scope="module")
+def sums(analyzer):
+    return PriceSums(analyzer.data["Close"].to_numpy(dtype=float))
+
+
+def test_momentum_sweep_matches_brute_force(analyzer, sums):
+    expected = _brute_force(analyzer, "Momentum")
+    windows, sharpe = sweep_momentum(sums, analyzer.daily_returns.to_numpy(), GRIDS["Momentum"]["window"])
+    np.testing.assert_allclose(sharpe, [expected[(w,)] for w in windows], rtol=1e-9, atol=1e-12)
+
+
+def test_cross_sweep_matches_brute_force(analyzer, sums):
+    expected = _brute_force(analyzer, "Cross MMS")
+    grid = GRIDS["Cross MMS"]
+    pairs, sharpe = sweep_cross(sums, analyzer.daily_returns.to_numpy(), grid["short_w"], grid["long_w"])
+    np.testing.assert_allclose(sharpe, [expected[tuple(p)] for p in pairs], rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("hold", [False, True])
+def test_bollinger_sweep_matches_brute_force(analyzer, sums, hold):
+    expected = _brute_force(analyzer, "Mean Reversion (BB)", hold=hold)
+    grid = GRIDS["Mean Reversion (BB)"]
+    combos, sharpe = sweep_bollinger(sums, analyzer.daily_returns.to_numpy(), grid["window"], grid["std_dev"],
+                                     hold=hold)
+    np.testing.assert_allclose(sharpe, [expected[(int(w), s)] for w, s in combos], rtol=1e-9, atol=1e-12)
+
+
+def test_find_best_params_matches_brute_force(analyzer):
+    analyzer.find_best_params(
+        momentum_windows=GRIDS["Momentum"]["window"],
+        cross_short=GRIDS["Cross MMS"]["short_w"], cross_long=GRIDS["Cross MMS"]["long_w"],
+        bb_windows=GRIDS["Mean Reversion (BB)"]["window"], bb_std_devs=GRIDS["Mean Reversion (BB)"]["std_dev"],
+    )
+    for strat_name, grid in GRIDS.items():
+        assert tuple(analyzer.best_params[strat_name][k] for k in grid) == _best(_brute_force(analyzer, strat_name))
+
+
+def test_adaptive_search_sharpe_matches_run_strategy(analyzer, sums):
+    params, sharpe, _ = adaptive_search(sums, analyzer.daily_returns.to_numpy(), "Cross MMS", budget=30, seed=1)
+    _, returns = analyzer.run_strategy("Cross MMS", **params)
+    assert sharpe == pytest.approx(analyzer.compute_metrics(returns)["Raw_Sharpe"], rel=1e-9)
+
+
+def test_optimize_annualizes_on_the_analyzer_interval(analyzer):
+    hourly = SingleAssetAnalyzer("TEST", None, None, interval="1h")
+    hourly.load_frame(analyzer.data)
+    params, sharpe, report = hourly.optimize("Momentum", budget=20, seed=0)
+    _, returns = hourly.run_strategy("Momentum", **params)
+    assert sharpe == pytest.approx(hourly.compute_metrics(returns)["Raw_Sharpe"], rel=1e-9)
+    assert report[-1]["best_sharpe"] == pytest.approx(sharpe)